@@ -0,0 +1,416 @@
+# alerts.py — Saved searches, checked against every new article
+# ================================================================
+# Standing queries like
+#     retail media AND (hire OR appoints)
+#     "The Trade Desk" -podcast
+# raise an ALERT whenever a new article matches them — for prospecting and
+# newsletter research. Alerts are listed at /admin/alerts and exported as
+# JSON or NDJSON.
+#
+# WHY NOT JUST RUN EVERY QUERY AFTER EACH FETCH?
+# That's queries × articles work, and it grows with both. This does it the
+# other way round (a "percolator"): the QUERIES are indexed, and each new
+# article looks up the few queries that could possibly match it.
+#
+# Every query has ANCHOR words: at least one of them must be in an article
+# for the query to match. "retail media AND (hire OR appoints)" needs
+# "retail" (or "media") — and "hire" or "appoints" — so anchoring it on
+# {"hire", "appoints"} or on {"retail"} is enough. We keep the smallest set.
+# The index maps each anchor word to its queries. For an article we split
+# the text into words once (like prospects.py), collect the queries listed
+# under those words, and evaluate only those. Queries with nothing to anchor
+# on (only NOT ...) are checked against everything — there are few.
+#
+# QUERY SYNTAX (case doesn't matter; whole words, like prospects.py):
+#   word word        both words (AND is implied)
+#   "a phrase"       the words next to each other, in order
+#   a AND b, a OR b  OR binds looser: a b OR c = (a AND b) OR c
+#   NOT a, -a        must not contain a (also -"a phrase", -(a OR b))
+#   ( ... )          grouping
+#
+# New articles are checked after every fetch (feed_parser.after_ingest),
+# walking the table by id from where the last check stopped — so a check
+# that failed is caught up next time. A new saved search only sees articles
+# that arrive after it; run "backfill" to check recent ones too.
+#
+# TO USE:
+#   python alerts.py add "TTD hires" '"The Trade Desk" AND (hires OR appoints)'
+#   python alerts.py list
+#   python alerts.py test 'retail media AND (hire OR appoints)'
+#   python alerts.py backfill 3 14          # search 3 over the last 14 days
+#   python alerts.py pause 3 | resume 3 | remove 3
+#   python alerts.py export alerts.ndjson   # new alerts since the last export (.json for one array)
+
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+
+from database import (
+    get_articles_after_id, get_max_article_id, iter_articles_by_date_range, get_state,
+    set_state, add_saved_search, get_saved_searches, get_active_saved_searches,
+    set_saved_search_active, delete_saved_search, record_alerts, get_alerts,
+)
+from prospects import tokenize
+
+
+BATCH_SIZE = 500      # New articles checked per read
+EXPORT_BATCH = 1000   # Alerts read at a time while exporting
+
+# Quoted phrases, parentheses (either may start with "-"), or runs of anything else
+TOKEN_RE = re.compile(r'-?"[^"]*"?|-?\(|\)|[^\s()"]+')
+
+
+# --- PARSING ---
+# A query becomes a small tree of tuples:
+#   ("word", "hire")   ("phrase", ("trade", "desk"))
+#   ("and", [...])     ("or", [...])     ("not", node)
+
+def parse_query(text):
+    """
+    Parses a saved search into its tree. Raises ValueError if it can't be
+    read (unbalanced parentheses, an operator with nothing after it, no words).
+    """
+    tokens = TOKEN_RE.findall(text)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def operator(token):
+        return token.upper() if token and token.upper() in ("AND", "OR", "NOT") else None
+
+    def parse_or():
+        children = [parse_and()]
+        while operator(peek()) == "OR":
+            take()
+            children.append(parse_and())
+        children = [child for child in children if child is not None]
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def parse_and():
+        children = [parse_unary()]
+        while peek() not in (None, ")") and operator(peek()) != "OR":
+            if operator(peek()) == "AND":
+                take()
+            children.append(parse_unary())
+        children = [child for child in children if child is not None]
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def parse_unary():
+        token = peek()
+        if token is None or token == ")" or operator(token) in ("AND", "OR"):
+            raise ValueError(f"expected a word after {tokens[position - 1] if position else 'the start'}")
+        if token == "-":
+            raise ValueError("nothing to exclude after - (write -word, with no space)")
+        if operator(token) == "NOT" or (token.startswith("-") and len(token) > 1):
+            take()
+            if operator(token) != "NOT":
+                tokens.insert(position, token[1:])
+            node = parse_unary()
+            if node is None:
+                raise ValueError(f"nothing to exclude after {token}")
+            return ("not", node)
+        take()
+        if token == "(":
+            node = parse_or()
+            if take_if(")") is None:
+                raise ValueError("missing )")
+            return node
+        words = tuple(tokenize(token.strip('"')))
+        if not words:
+            return None  # punctuation only
+        if len(words) == 1:
+            return ("word", words[0])
+        return ("phrase", words)
+
+    def take_if(token):
+        return take() if peek() == token else None
+
+    tree = parse_or() if tokens else None
+    if position < len(tokens):
+        raise ValueError(f"unexpected {tokens[position]}")
+    if tree is None:
+        raise ValueError("a saved search needs at least one word")
+    return tree
+
+
+def anchors(node):
+    """
+    Words at least one of which every matching article contains — or None
+    if there's no such set (the query can match without any given word).
+    """
+    kind = node[0]
+    if kind == "word":
+        return {node[1]}
+    if kind == "phrase":
+        return {max(node[1], key=len)}  # one word is enough; longer ones are rarer
+    if kind == "not":
+        return None
+    found = [anchors(child) for child in node[1]]
+    if kind == "and":
+        # Any one child's anchors will do: the smallest set, longest words
+        usable = [words for words in found if words]
+        if not usable:
+            return None
+        return min(usable, key=lambda words: (len(words), -min(map(len, words))))
+    if any(words is None for words in found):  # "or"
+        return None
+    return set().union(*found)
+
+
+def matches(node, words, positions):
+    """Whether an article (its word list, and {word: [positions]}) matches a query tree."""
+    kind = node[0]
+    if kind == "word":
+        return node[1] in positions
+    if kind == "phrase":
+        phrase = list(node[1])
+        return any(words[start:start + len(phrase)] == phrase
+                   for start in positions.get(phrase[0], ()))
+    if kind == "not":
+        return not matches(node[1], words, positions)
+    if kind == "and":
+        return all(matches(child, words, positions) for child in node[1])
+    return any(matches(child, words, positions) for child in node[1])
+
+
+# --- THE PERCOLATOR ---
+
+class Percolator:
+    """Saved searches, indexed by their anchor words."""
+
+    def __init__(self, searches):
+        """
+        Parameters:
+            searches (list): dicts with id and query. Queries that don't
+                parse are left out (and listed in self.errors).
+        """
+        self.trees = {}
+        self.index = {}       # anchor word → [search ids]
+        self.unanchored = []  # searches checked against every article
+        self.errors = {}
+        for search in searches:
+            try:
+                tree = parse_query(search["query"])
+            except ValueError as e:
+                self.errors[search["id"]] = str(e)
+                continue
+            self.trees[search["id"]] = tree
+            words = anchors(tree)
+            if words is None:
+                self.unanchored.append(search["id"])
+            else:
+                for word in words:
+                    self.index.setdefault(word, []).append(search["id"])
+        self.checked = 0  # queries evaluated so far (to see how few it takes)
+
+    def __len__(self):
+        return len(self.trees)
+
+    def match(self, title, description):
+        """Returns the ids of the saved searches an article matches, sorted."""
+        words = tokenize(f"{title or ''} {description or ''}")
+        positions = {}
+        for position, word in enumerate(words):
+            positions.setdefault(word, []).append(position)
+
+        candidates = set(self.unanchored)
+        for word in positions:
+            candidates.update(self.index.get(word, ()))
+        self.checked += len(candidates)
+        return sorted(search_id for search_id in candidates
+                      if matches(self.trees[search_id], words, positions))
+
+
+# --- CACHED PERCOLATOR ---
+# Rebuilt only when the active saved searches change.
+_percolator = None
+_percolator_key = None
+
+
+def get_percolator():
+    """Returns the Percolator for the active saved searches."""
+    global _percolator, _percolator_key
+
+    searches = get_active_saved_searches()
+    key = tuple((search["id"], search["query"]) for search in searches)
+    if _percolator is None or key != _percolator_key:
+        _percolator = Percolator(searches)
+        _percolator_key = key
+    return _percolator
+
+
+def _alert(search_id, article):
+    return {"search_id": search_id, "article_id": article["id"], "title": article["title"],
+            "link": article["link"], "source_name": article["source_name"],
+            "published_date": article["published_date"]}
+
+
+def check_new_articles(new_articles=None):
+    """
+    Checks every article saved since the last check against the active
+    saved searches and records an alert for each match.
+    (new_articles is ignored — progress is tracked in app_state, so articles
+    from a check that failed are picked up next time.)
+
+    Returns:
+        int: how many new alerts were recorded
+    """
+    percolator = get_percolator()
+    last_id = get_state("alerts_last_id")
+    if last_id is None or not len(percolator):
+        # Nothing to check against (yet): just keep up, so a search
+        # saved later isn't flooded with the whole archive
+        set_state("alerts_last_id", get_max_article_id())
+        return 0
+
+    last_id = int(last_id)
+    checked_before = percolator.checked
+    articles_checked = 0
+    new_alerts = 0
+    while True:
+        articles = get_articles_after_id(last_id, limit=BATCH_SIZE)
+        if not articles:
+            break
+        found = [_alert(search_id, article) for article in articles
+                 for search_id in percolator.match(article.title, article.description)]
+        new_alerts += record_alerts(found)
+        articles_checked += len(articles)
+        last_id = articles[-1].id
+        set_state("alerts_last_id", last_id)
+
+    if articles_checked:
+        per_article = (percolator.checked - checked_before) / articles_checked
+        print(f"  Alerts: {new_alerts} new from {articles_checked} articles "
+              f"({per_article:.1f} of {len(percolator)} saved searches checked per article)")
+    return new_alerts
+
+
+def backfill_search(search_id, days=7):
+    """Checks one saved search against the articles of the last `days` days. Returns new alerts."""
+    search = next((s for s in get_saved_searches() if s["id"] == search_id), None)
+    if search is None:
+        raise ValueError(f"no saved search {search_id}")
+    percolator = Percolator([search])
+    if percolator.errors:
+        raise ValueError(percolator.errors[search_id])
+
+    start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    end = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    found = []
+    new_alerts = 0
+    for article in iter_articles_by_date_range(start, end, full=True):
+        if percolator.match(article.title, article.description):
+            found.append(_alert(search_id, article))
+        if len(found) >= BATCH_SIZE:
+            new_alerts += record_alerts(found)
+            found = []
+    return new_alerts + record_alerts(found)
+
+
+# --- EXPORT ---
+
+def iter_alerts(after_id=0, search_id=None):
+    """Yields alerts after after_id, oldest first, a batch at a time."""
+    while True:
+        batch = get_alerts(search_id=search_id, after_id=after_id, limit=EXPORT_BATCH,
+                           newest_first=False)
+        yield from batch
+        if len(batch) < EXPORT_BATCH:
+            return
+        after_id = batch[-1]["id"]
+
+
+def to_ndjson(alerts):
+    """Yields one JSON line per alert (for streaming responses and files)."""
+    for alert in alerts:
+        yield json.dumps(alert, ensure_ascii=False) + "\n"
+
+
+def export_alerts(path):
+    """
+    Writes the alerts raised since the last export to path — NDJSON (one
+    object per line) or, if path ends in .json, one JSON array — then moves
+    the bookmark.
+
+    Returns:
+        int: how many alerts were exported
+    """
+    last_id = int(get_state("alerts_export_last_id", 0))
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            alerts = list(iter_alerts(last_id))
+            json.dump(alerts, f, ensure_ascii=False, indent=1)
+            count, last_id = len(alerts), alerts[-1]["id"] if alerts else last_id
+        else:
+            for alert in iter_alerts(last_id):
+                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+                count, last_id = count + 1, alert["id"]
+
+    set_state("alerts_export_last_id", last_id)
+    print(f"Exported {count} alerts to {path}")
+    return count
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    from database import init_db
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    args = sys.argv[2:]
+    init_db()
+
+    if command == "add" and len(args) == 2:
+        try:
+            parse_query(args[1])
+        except ValueError as e:
+            print(f"Can't read that query: {e}")
+            sys.exit(1)
+        print(f"Saved search {add_saved_search(args[0], args[1])}: {args[0]}")
+    elif command == "list":
+        searches = get_saved_searches()
+        if not searches:
+            print("No saved searches yet.")
+        for s in searches:
+            state = "" if s["active"] else "  (paused)"
+            print(f"  [{s['id']}] {s['name']}: {s['query']}  — {s['alerts']} alerts{state}")
+    elif command == "test" and args:
+        tree = parse_query(args[0])
+        print(f"Parsed:  {tree}")
+        print(f"Anchors: {sorted(anchors(tree)) if anchors(tree) else 'none (checked against every article)'}")
+        percolator = Percolator([{"id": 0, "query": args[0]}])
+        recent = get_articles_after_id(max(0, get_max_article_id() - 1000), limit=1000)
+        hits = [a for a in recent if percolator.match(a.title, a.description)]
+        print(f"Matches {len(hits)} of the last {len(recent)} articles:")
+        for article in hits[-10:]:
+            print(f"  {(article.published_date or '')[:10]}  {article.title}")
+    elif command == "backfill" and args:
+        days = int(args[1]) if len(args) > 1 else 7
+        print(f"Backfilled: {backfill_search(int(args[0]), days)} new alerts")
+    elif command in ("pause", "resume") and args:
+        if not set_saved_search_active(int(args[0]), command == "resume"):
+            print(f"No saved search {args[0]}")
+    elif command == "remove" and args:
+        if not delete_saved_search(int(args[0])):
+            print(f"No saved search {args[0]}")
+    elif command == "export" and args:
+        export_alerts(args[0])
+    else:
+        print("Usage:")
+        print('  python alerts.py add NAME QUERY')
+        print("  python alerts.py list")
+        print("  python alerts.py test QUERY")
+        print("  python alerts.py backfill ID [DAYS]")
+        print("  python alerts.py pause|resume|remove ID")
+        print("  python alerts.py export alerts.ndjson|alerts.json")
@@ -14,18 +14,58 @@
 # 1. Install dependencies: pip install flask feedparser
 # 2. Run: python app.py
 # 3. Open browser: http://localhost:5000
+# (In production, run wsgi.py with gunicorn instead — see that file.)
 
-from flask import Flask, render_template, request
+import hmac
+import mimetypes
+import os
+import re
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+from flask import (Flask, Response, render_template, request, send_file, url_for, abort, jsonify,
+                   redirect)
 from database import (
-    init_db, get_latest_articles, search_articles,
-    get_article_count, get_category_counts, get_source_counts
+    init_db, get_latest_articles, faceted_search, SEARCH_FACETS, get_article,
+    get_article_count, get_category_counts, get_source_counts,
+    get_articles_in_id_range, get_max_article_id, get_trend_series, TREND_GROUPS,
+    TREND_MAX_DAYS, get_related_articles,
 )
-from feed_parser import fetch_all_feeds
-from config import APP_NAME, APP_TAGLINE, CATEGORIES, DEBUG
+from config import (APP_NAME, APP_TAGLINE, CATEGORIES, DEBUG, SQL_PROFILE, LIVE_URL, LIVE_PORT,
+                    ADMIN_TOKEN)
+from assets import DIST_DIR, IMMUTABLE_CACHE, is_current, load_manifest, pick_encoding
+from outbound import OUTPUT_DIR, generated_path
+from suggest import get_suggestions
 
 # --- CREATE THE FLASK APP ---
 # This creates the application object that handles all web requests
 app = Flask(__name__)
+# Where pages connect for live updates (live.py) — empty = off
+app.config["LIVE_URL"] = LIVE_URL
+
+# --- SQL PROFILING (off unless SQL_PROFILE is set in config.py) ---
+# In debug mode, adds a per-request query summary and a /debug/sql page.
+if SQL_PROFILE:
+    from sql_profiler import init_app
+    init_app(app, debug=DEBUG)
+
+
+# --- SHORT-LIVED CACHE FOR SITE-WIDE COUNTS ---
+# Category/source totals only change when feeds are fetched (once an hour),
+# but they're shown on every page. Re-using them for a minute saves a query
+# per page view — the load test (benchmarks/load_test.py) showed it was the
+# slowest part of most pages on a big database.
+COUNTS_CACHE_SECONDS = 60
+_counts_cache = {}
+
+
+def cached(fn):
+    """Calls fn() at most once per COUNTS_CACHE_SECONDS (per process)."""
+    now = time.monotonic()
+    hit = _counts_cache.get(fn.__name__)
+    if hit is None or now - hit[0] > COUNTS_CACHE_SECONDS:
+        hit = _counts_cache[fn.__name__] = (now, fn())
+    return hit[1]
 
 
 # --- CONTEXT PROCESSOR ---
@@ -37,8 +77,70 @@ def inject_globals():
         "app_name": APP_NAME,
         "app_tagline": APP_TAGLINE,
         "categories": CATEGORIES,
-        "category_counts": get_category_counts(),
+        "category_counts": cached(get_category_counts),
+    }
+
+
+# --- ASSET URLS ---
+# Templates call asset_url('css/style.css') instead of url_for('static', ...).
+# After "python assets.py" it points at the fingerprinted, minified copy
+# (served by the /assets route below); before that, at the plain file.
+# In DEBUG a file edited since the last build is served plain, so changes
+# show up without re-running assets.py.
+@app.template_global()
+def asset_url(filename):
+    built_name = load_manifest().get(filename)
+    if built_name and (not DEBUG or is_current(filename, built_name)):
+        return url_for("asset", filename=built_name)
+    return url_for("static", filename=filename)
+
+
+def live_url(newest, **filters):
+    """
+    The live-updates URL for a page (None when they're off). newest is the
+    newest article id the page shows, so anything saved between rendering
+    and connecting is sent too.
+    """
+    if not app.config["LIVE_URL"]:
+        return None
+    params = {key: value for key, value in filters.items() if value}
+    params["last_event_id"] = newest
+    return f"{app.config['LIVE_URL']}?{urlencode(params)}"
+
+
+FACET_TITLES = {"category": "Topic", "type": "Type", "source": "Source", "week": "Week"}
+FACET_SOURCES = 10  # Sources listed in the search facets (the most matches first)
+
+
+def facet_links(query, filters, facets):
+    """
+    The search page's facets, ready to render: every value with its count
+    and the URL that picks it (or, if it's picked already, drops it).
+    """
+    labels = {
+        "category": lambda value: CATEGORIES.get(value, {}).get("display_name", value),
+        "type": lambda value: value.capitalize(),
+        "source": lambda value: value,
+        "week": lambda value: f"Week of {value}",
     }
+    groups = []
+    for name in SEARCH_FACETS:
+        counts = facets[name]
+        if name == "source":
+            picked = [item for item in counts if item[0] == filters.get(name)]
+            counts = counts[:FACET_SOURCES] + [item for item in picked
+                                               if item not in counts[:FACET_SOURCES]]
+        values = []
+        for value, count in counts:
+            active = filters.get(name) == value
+            chosen = {key: v for key, v in filters.items() if key != name}
+            if not active:
+                chosen[name] = value
+            values.append({"label": labels[name](value), "count": count, "active": active,
+                           "url": url_for("search", q=query, **chosen)})
+        if values:
+            groups.append({"title": FACET_TITLES[name], "values": values})
+    return groups
 
 
 # ============================================================
@@ -67,6 +169,7 @@ def index():
         news=news,
         podcasts=podcasts,
         total_articles=total_articles,
+        live_url=live_url(max((a.id for a in news), default=0), type="news"),
         page_title="Home"
     )
 
@@ -93,10 +196,32 @@ def category(category_name):
         articles=articles,
         category_name=category_name,
         display_name=display_name,
+        live_url=live_url(max((a.id for a in articles), default=0), category=category_name),
         page_title=display_name,
     )
 
 
+@app.route("/article/<int:article_id>")
+def article(article_id):
+    """
+    ARTICLE PAGE — one article's summary, with a link out to the source.
+    
+    URL: http://localhost:5000/article/123
+    
+    These are the pages listed in sitemap.xml and linked from our RSS feeds.
+    """
+    article_data = get_article(article_id)
+    if article_data is None:
+        abort(404)
+
+    return render_template(
+        "article.html",
+        article=article_data,
+        related=get_related_articles(article_id),
+        page_title=article_data["title"],
+    )
+
+
 @app.route("/podcasts")
 def podcasts():
     """
@@ -113,6 +238,42 @@ def podcasts():
     )
 
 
+# How many articles each archive page holds
+ARCHIVE_PAGE_SIZE = 50
+
+
+@app.route("/archive")
+@app.route("/archive/<int:page>")
+def archive(page=None):
+    """
+    ARCHIVE — every article ever saved, 50 per page.
+    
+    URL: http://localhost:5000/archive      (newest page)
+    URL: http://localhost:5000/archive/3    (articles 101-150)
+    
+    Page numbers follow article ids, so page 3 always holds the same
+    articles — new ones only ever land on the newest page. That keeps
+    old pages cacheable (and lets the static export skip them).
+    """
+    last_page = max(1, -(-get_max_article_id() // ARCHIVE_PAGE_SIZE))
+    if page is None:
+        page = last_page
+    if page < 1 or page > last_page:
+        abort(404)
+
+    start = (page - 1) * ARCHIVE_PAGE_SIZE + 1
+    articles = get_articles_in_id_range(start, start + ARCHIVE_PAGE_SIZE)
+    articles.reverse()  # newest first on the page
+
+    return render_template(
+        "archive.html",
+        articles=articles,
+        page=page,
+        last_page=last_page,
+        page_title=f"Archive — page {page}",
+    )
+
+
 @app.route("/search")
 def search():
     """
@@ -122,17 +283,35 @@ def search():
     
     request.args.get("q") gets the search term from the URL.
     The ?q=privacy part is called a "query parameter."
+
+    Narrowed down with more of them — the facets link to these:
+    /search?q=privacy&category=ctv&type=news&source=Digiday&week=2026-10-12
     """
     query = request.args.get("q", "").strip()
+    filters = {name: request.args.get(name, "").strip() for name in SEARCH_FACETS}
+    filters = {name: value for name, value in filters.items() if value}
     results = []
+    total = 0
+    facets = []
+    did_you_mean = []
 
     if query:
-        results = search_articles(query, limit=30)
+        found = faceted_search(query, filters, limit=30)
+        results, total = found["articles"], found["total"]
+        facets = facet_links(query, filters, found["facets"])
+        if not total and not filters:
+            # Probably a typo ("Tradedesk") — offer the closest known terms
+            did_you_mean = [s["text"] for s in get_suggestions(query, limit=3)
+                            if s["text"].lower() != query.lower()]
 
     return render_template(
         "search.html",
         query=query,
         results=results,
+        total=total,
+        facets=facets,
+        filtered=bool(filters),
+        did_you_mean=did_you_mean,
         page_title=f"Search: {query}" if query else "Search",
     )
 
@@ -144,8 +323,8 @@ def about():
     
     URL: http://localhost:5000/about
     """
-    source_counts = get_source_counts()
-    total = get_article_count()
+    source_counts = cached(get_source_counts)
+    total = cached(get_article_count)
 
     return render_template(
         "about.html",
@@ -155,6 +334,290 @@ def about():
     )
 
 
+@app.route("/assets/<path:filename>")
+def asset(filename):
+    """
+    FINGERPRINTED CSS/JS — built by assets.py.
+    
+    The file name changes whenever the content does, so browsers may keep
+    it for a year without asking again. We send the brotli or gzip copy
+    made at build time if the browser accepts it.
+    """
+    path = os.path.abspath(os.path.join(DIST_DIR, filename))
+    if not path.startswith(DIST_DIR + os.sep) or not os.path.isfile(path):
+        abort(404)
+
+    send_path, encoding = pick_encoding(path, request.headers.get("Accept-Encoding"))
+    response = send_file(
+        send_path,
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        conditional=True,
+        etag=True,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE
+    return response
+
+
+# ============================================================
+# OUTBOUND FEEDS & SITEMAP — pre-built files from outbound.py
+# ============================================================
+
+def send_generated(relative_path, mimetype):
+    """
+    Sends a file built by outbound.py.
+    conditional=True makes Flask answer "304 Not Modified" when the reader's
+    ETag / Last-Modified still match, so most polls cost almost nothing.
+    """
+    response = send_file(generated_path(relative_path), mimetype=mimetype,
+                         conditional=True, etag=True)
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return response
+
+
+@app.route("/feed.xml")
+def rss_feed():
+    """RSS feed of the latest articles across all topics."""
+    return send_generated("feed.xml", "application/rss+xml")
+
+
+@app.route("/atom.xml")
+def atom_feed():
+    """Atom version of the all-topics feed."""
+    return send_generated("atom.xml", "application/atom+xml")
+
+
+@app.route("/category/<category_name>/feed.xml")
+def category_rss_feed(category_name):
+    """RSS feed for one topic, e.g. /category/privacy/feed.xml"""
+    if category_name not in CATEGORIES:
+        abort(404)
+    return send_generated(f"category/{category_name}.xml", "application/rss+xml")
+
+
+@app.route("/category/<category_name>/atom.xml")
+def category_atom_feed(category_name):
+    """Atom feed for one topic."""
+    if category_name not in CATEGORIES:
+        abort(404)
+    return send_generated(f"category/{category_name}.atom.xml", "application/atom+xml")
+
+
+@app.route("/sitemap.xml")
+def sitemap_index():
+    """Sitemap index — points crawlers at each sitemap shard."""
+    return send_generated("sitemap.xml", "application/xml")
+
+
+@app.route("/sitemaps/<name>")
+def sitemap_shard(name):
+    """One sitemap shard: pages.xml or articles-<n>.xml"""
+    if not re.fullmatch(r"pages\.xml|articles-\d+\.xml", name):
+        abort(404)
+    generated_path("sitemap.xml")  # builds everything on the very first request
+    if not os.path.exists(os.path.join(OUTPUT_DIR, "sitemaps", name)):
+        abort(404)
+    return send_generated(f"sitemaps/{name}", "application/xml")
+
+
+# ============================================================
+# TRENDS API — JSON for the Chart.js dashboard
+# ============================================================
+
+@app.route("/api/trends")
+def api_trends():
+    """
+    Article volume over time, one line per category (or source).
+    
+    URL: /api/trends?days=30&group_by=category&granularity=auto
+         /api/trends?start=2026-01-01&end=2026-03-31&group_by=source_name&category=privacy
+    
+    Returns {"labels": [...], "series": {name: [counts...]}} where every
+    series lines up with labels — pass it straight to Chart.js datasets.
+    Reads the rollup tables, so it costs the same for 10 articles or 10 million.
+    """
+    try:
+        end = date.fromisoformat(request.args.get("end") or date.today().isoformat())
+        days = min(max(request.args.get("days", 7, type=int), 1), TREND_MAX_DAYS)
+        start = date.fromisoformat(request.args.get("start") or
+                                   (end - timedelta(days=days - 1)).isoformat())
+        # Anyone can call this: a range that's backwards or too long is refused
+        # (get_trend_series also counts long ranges per day, never per hour)
+        if end < start or (end - start).days >= TREND_MAX_DAYS:
+            raise ValueError
+        group_by = request.args.get("group_by", "category")
+        granularity = request.args.get("granularity", "auto")
+        if group_by not in TREND_GROUPS or granularity not in ("auto", "hour", "day"):
+            raise ValueError
+        data = get_trend_series(
+            start.isoformat(), end.isoformat(),
+            group_by=group_by,
+            granularity=granularity,
+            category=request.args.get("category"),
+            source_type=request.args.get("type"),
+            max_points=min(max(request.args.get("points", 120, type=int), 1), 1000),
+        )
+    except ValueError:
+        abort(400)
+
+    response = jsonify(data)
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+# ============================================================
+# SEARCH SUGGESTIONS — JSON for the search boxes (main.js)
+# ============================================================
+
+@app.route("/api/suggest")
+def api_suggest():
+    """
+    Search-as-you-type: terms worth searching for, typos forgiven.
+    
+    URL: /api/suggest?q=dubleverif
+    
+    Returns {"query": ..., "suggestions": [{"text", "kind", "url"}, ...]}.
+    Answered from an in-memory index (suggest.py) — no database query.
+    """
+    query = request.args.get("q", "").strip()[:100]
+    suggestions = []
+    for s in get_suggestions(query):
+        if s["kind"] == "category":
+            url = url_for("category", category_name=s["extra"])
+        else:
+            url = url_for("search", q=s["text"])
+        suggestions.append({"text": s["text"], "kind": s["kind"], "url": url})
+
+    response = jsonify({"query": query, "suggestions": suggestions})
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+# ============================================================
+# WEBSUB CALLBACK — where hubs push feed updates (websub.py)
+# ============================================================
+
+@app.route("/websub/<callback_id>", methods=["GET", "POST"])
+def websub_callback(callback_id):
+    """
+    GET: a hub checking we asked to subscribe — answered with its challenge.
+    POST: new entries from a feed we subscribed to, parsed and saved in
+    the background (the hub only waits for the 202).
+    """
+    # Imported here so web workers only load it when a hub calls
+    from websub import verify_intent, receive_push
+
+    if request.method == "GET":
+        status, body = verify_intent(callback_id, request.args)
+        return body, status, {"Content-Type": "text/plain"}
+    headers = {name.lower(): value for name, value in request.headers.items()}
+    return "", receive_push(callback_id, request.get_data(), headers)
+
+
+def require_admin():
+    """
+    Stops the request unless it may see admin pages: the ADMIN_TOKEN as
+    the password (HTTP Basic auth, any user name) — or, with no token set,
+    only while DEBUG is on AND only from this machine. (DEBUG ships on and
+    the dev server listens on every interface, so otherwise anyone on the
+    network could edit saved searches.) A request relayed by a proxy on
+    this machine carries X-Forwarded-For, and isn't local.
+    """
+    if not ADMIN_TOKEN:
+        local = (request.remote_addr in ("127.0.0.1", "::1")
+                 and "X-Forwarded-For" not in request.headers)
+        if not DEBUG or not local:
+            abort(404)
+        return
+    auth = request.authorization
+    if not auth or not hmac.compare_digest((auth.password or "").encode(), ADMIN_TOKEN.encode()):
+        abort(Response("Admin password required\n", 401,
+                       {"WWW-Authenticate": 'Basic realm="AdTech Pulse admin"'}))
+
+
+def require_same_site():
+    """
+    Stops a form POST that didn't come from one of our own pages. Browsers
+    send the admin password (and, in DEBUG, need none) with a form posted
+    from ANY site — its Origin (or Referer) header shows where it came from.
+    """
+    source = request.headers.get("Origin") or request.headers.get("Referer")
+    if not source or urlsplit(source).netloc != request.host:
+        abort(403)
+
+
+@app.route("/admin/alerts", methods=["GET", "POST"])
+def admin_alerts():
+    """
+    SAVED SEARCHES & ALERTS (private) — add, pause or remove saved searches
+    and see what they caught. ?search=ID shows one search's alerts.
+    """
+    require_admin()
+    # Imported here: alerts.py brings in the prospect matcher, which only
+    # the ingester needs (see benchmarks/import_budget.py)
+    from alerts import parse_query
+    from database import (add_saved_search, delete_saved_search, get_alerts,
+                          get_saved_searches, set_saved_search_active)
+
+    error = None
+    if request.method == "POST":
+        require_same_site()
+        action = request.form.get("action")
+        search_id = request.form.get("search_id", type=int)
+        if action == "add":
+            name = request.form.get("name", "").strip()
+            query = request.form.get("query", "").strip()
+            try:
+                parse_query(query)
+                add_saved_search(name or query, query)
+            except ValueError as e:
+                error = f"Can't read that query: {e}"
+        elif action in ("pause", "resume") and search_id:
+            set_saved_search_active(search_id, action == "resume")
+        elif action == "remove" and search_id:
+            delete_saved_search(search_id)
+        if error is None:
+            return redirect(url_for("admin_alerts"))
+
+    search_id = request.args.get("search", type=int)
+    return render_template(
+        "alerts.html",
+        searches=get_saved_searches(),
+        alerts=get_alerts(search_id=search_id, limit=100),
+        search_id=search_id,
+        error=error,
+        form=request.form,
+        page_title="Alerts",
+    ), 400 if error else 200
+
+
+@app.route("/admin/alerts.<fmt>")
+def admin_alerts_export(fmt):
+    """
+    ALERTS EXPORT — every alert, oldest first, as JSON (one array) or NDJSON
+    (one object per line). Streamed, so it can be any size.
+    ?search=ID for one saved search; ?after=ALERT_ID for only newer ones.
+    """
+    require_admin()
+    if fmt not in ("json", "ndjson"):
+        abort(404)
+    from alerts import iter_alerts, to_ndjson
+
+    alerts = iter_alerts(after_id=request.args.get("after", 0, type=int),
+                         search_id=request.args.get("search", type=int))
+    if fmt == "ndjson":
+        return Response(to_ndjson(alerts), mimetype="application/x-ndjson")
+
+    def json_array():
+        yield "["
+        for i, line in enumerate(to_ndjson(alerts)):
+            yield ("," if i else "") + line
+        yield "]\n"
+    return Response(json_array(), mimetype="application/json")
+
+
 @app.route("/refresh")
 def refresh_feeds():
     """
@@ -165,6 +628,10 @@ def refresh_feeds():
     In production, you'd run this on a schedule (cron job or APScheduler).
     This route lets you trigger it manually for testing.
     """
+    # Imported here, not at the top: loading feedparser and the feed list
+    # is only worth it when someone actually refreshes. Every other page
+    # starts faster and uses less memory without it.
+    from feed_parser import fetch_all_feeds
     result = fetch_all_feeds()
 
     return render_template(
@@ -179,19 +646,32 @@ def refresh_feeds():
 # ============================================================
 
 if __name__ == "__main__":
-    # Initialize the database (creates tables if they don't exist)
+    # Initialize the database (creates tables if they don't exist yet —
+    # after the first run this is just a quick version check)
     init_db()
 
-    # Fetch feeds on startup so you have content immediately
-    print("Fetching initial content...")
-    fetch_all_feeds()
+    # Live updates for open pages (in production, run live.py on its own)
+    if not app.config["LIVE_URL"]:
+        from live import start_in_thread
+        start_in_thread(port=LIVE_PORT)
+        app.config["LIVE_URL"] = f"http://localhost:{LIVE_PORT}/live"
+
+    # Fetch feeds in the background so the site is up immediately.
+    # New content shows up as soon as each batch is saved.
+    # (For production, use wsgi.py with gunicorn instead — see that file.)
+    from scheduler import start_background_ingest
+    if start_background_ingest():
+        print("Fetching feeds in the background...")
 
     # Start the web server
-    # debug=True means it auto-reloads when you change code
+    # debug=True shows errors in the browser. The auto-reloader stays off:
+    # it would run all of the above in a second, watcher process, which
+    # would then hold the ingest lock and the live port for good.
+    # Restart by hand after changing code.
     # host="0.0.0.0" makes it accessible on your network
     print(f"\n{'='*50}")
     print(f"{APP_NAME} is running!")
     print(f"Open http://localhost:5000 in your browser")
     print(f"{'='*50}\n")
 
-    app.run(debug=DEBUG, host="0.0.0.0", port=5000)
+    app.run(debug=DEBUG, host="0.0.0.0", port=5000, use_reloader=False)
@@ -0,0 +1,176 @@
+# assets.py — Build step for CSS/JS: minify, fingerprint, precompress
+# =====================================================================
+# Browsers cache CSS and JS files, but only as long as we tell them to —
+# and if we say "keep it for a year", they'd never see our changes.
+#
+# The fix is to put a FINGERPRINT (a hash of the file's contents) in the
+# file name: style.css becomes style.3f2a9c81d0e4.css. Change one character
+# and the name changes, so browsers fetch the new file. The old name never
+# changes content, so it's safe to cache for a year ("immutable").
+#
+# This script also:
+# - MINIFIES each file (strips comments and extra whitespace)
+# - PRE-COMPRESSES it with gzip (and brotli, if installed), so the server
+#   just picks the right file instead of compressing on every request
+#
+# Output goes to static/dist/ with a manifest.json mapping original names
+# to fingerprinted ones. Templates use asset_url('css/style.css'); if the
+# build hasn't been run, that falls back to the plain static file — and so
+# does a file edited since the last build, while DEBUG is on.
+#
+# TO RUN (after editing CSS/JS, and as part of every deploy):
+#   python assets.py
+
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# Files to build, relative to static/
+ASSETS = ["css/style.css", "js/main.js"]
+
+# How long browsers may cache fingerprinted files: one year
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def minify_css(text):
+    """Strips comments and whitespace that browsers don't need."""
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{}:;,>])\s*", r"\1", text)
+    text = text.replace(";}", "}")
+    return text.strip()
+
+
+def minify_js(text):
+    """
+    A deliberately cautious JS minifier: removes block comments, whole-line
+    // comments, indentation and blank lines. It never touches code inside
+    a line, so strings and regexes can't be broken.
+    """
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("//"):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def fingerprinted_name(filename, content):
+    """css/style.css + content → css/style.<12-char hash>.css"""
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{digest}{ext}"
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def _minified(filename):
+    """Returns (source text, minified bytes) of one file in static/."""
+    with open(os.path.join(STATIC_DIR, filename), encoding="utf-8") as f:
+        source = f.read()
+    minify = MINIFIERS.get(os.path.splitext(filename)[1], lambda text: text)
+    return source, minify(source).encode("utf-8")
+
+
+def build():
+    """Builds every file in ASSETS into static/dist/ and writes the manifest."""
+    manifest = {}
+    for filename in ASSETS:
+        source, content = _minified(filename)
+        output_name = fingerprinted_name(filename, content)
+        output_path = os.path.join(DIST_DIR, output_name)
+
+        _write(output_path, content)
+        # mtime=0 keeps the .gz byte-for-byte identical between builds
+        _write(output_path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(output_path + ".br", brotli.compress(content, quality=11))
+
+        manifest[filename] = output_name
+        print(f"  {filename}: {len(source.encode('utf-8'))} → {len(content)} bytes → {output_name}")
+
+    _write(MANIFEST_PATH, json.dumps(manifest, indent=2).encode("utf-8"))
+    print(f"Wrote {MANIFEST_PATH}")
+    return manifest
+
+
+# --- USED BY THE WEB APP ---
+
+_manifest = None
+
+
+def load_manifest():
+    """Reads static/dist/manifest.json once per process ({} if not built)."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH, encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+_source_names = {}  # filename → (mtime, fingerprinted name of the file as it is now)
+
+
+def is_current(filename, built_name):
+    """
+    True if built_name was built from static/<filename> as it is now —
+    False once the file has been edited since the last build. Only
+    re-minifies a file when its modification time changes.
+    """
+    try:
+        mtime = os.stat(os.path.join(STATIC_DIR, filename)).st_mtime_ns
+    except OSError:
+        return True  # no source to compare with: the build is all there is
+    cached = _source_names.get(filename)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, fingerprinted_name(filename, _minified(filename)[1]))
+        _source_names[filename] = cached
+    return cached[1] == built_name
+
+
+def pick_encoding(path, accept_encoding):
+    """
+    Chooses the best precompressed file the browser accepts.
+
+    Returns:
+        tuple: (path_to_send, content_encoding or None)
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.lower())
+
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if encoding in accepted and os.path.exists(path + suffix):
+            return path + suffix, encoding
+    return path, None
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    print("Building static assets...")
+    build()
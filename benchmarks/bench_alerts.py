@@ -0,0 +1,90 @@
+# benchmarks/bench_alerts.py — How fast are saved searches checked?
+# ===================================================================
+# Makes up a few thousand saved searches from words in real headlines
+# ("word word", "word AND (word OR word)", '"two words" -word'...), then
+# checks the newest articles against all of them twice:
+#
+#   - every query against every article (what we'd do without alerts.py)
+#   - the percolator: only the queries anchored on the article's words
+#
+# Both must find exactly the same matches. Prints time per article and
+# how many queries each approach evaluated per article.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/bench_alerts.py
+#   ADTECH_PULSE_DB=fixture.db python benchmarks/bench_alerts.py --searches 20000 --articles 2000
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alerts
+from config import STOP_WORDS
+from database import get_articles_after_id, get_max_article_id
+
+
+def make_searches(articles, count, rng):
+    """Queries built from headline words, in the shapes people write."""
+    vocabulary = sorted({word for article in articles for word in alerts.tokenize(article.title)
+                         if len(word) > 3 and word not in STOP_WORDS})
+    shapes = ["{a}", "{a} {b}", "{a} AND ({b} OR {c})", '"{a} {b}"', "{a} -{b}",
+              "{a} OR {b}", '"{a} {b}" AND ({c} OR {d})']
+    searches = []
+    for search_id in range(1, count + 1):
+        words = dict(zip("abcd", rng.sample(vocabulary, 4)))
+        searches.append({"id": search_id, "query": rng.choice(shapes).format(**words)})
+    return searches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Saved search (percolator) benchmark")
+    parser.add_argument("--searches", type=int, default=5000)
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    articles = get_articles_after_id(max(0, get_max_article_id() - args.articles),
+                                     limit=args.articles)
+    if not articles:
+        print("No articles — point ADTECH_PULSE_DB at a database with some.")
+        sys.exit(1)
+    searches = make_searches(articles, args.searches, random.Random(args.seed))
+
+    start = time.perf_counter()
+    percolator = alerts.Percolator(searches)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    found = [percolator.match(a.title, a.description) for a in articles]
+    percolate_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    expected = []
+    for article in articles:
+        words = alerts.tokenize(f"{article.title or ''} {article.description or ''}")
+        positions = {}
+        for position, word in enumerate(words):
+            positions.setdefault(word, []).append(position)
+        expected.append([search_id for search_id, tree in percolator.trees.items()
+                         if alerts.matches(tree, words, positions)])
+    brute_ms = (time.perf_counter() - start) * 1000
+
+    count = len(articles)
+    print(f"{len(percolator)} saved searches, {count} articles, "
+          f"{sum(map(len, found))} matches (index built in {build_ms:.0f} ms)")
+    print(f"  every query:  {brute_ms / count:8.3f} ms/article  "
+          f"({len(percolator)} queries checked per article)")
+    print(f"  percolator:   {percolate_ms / count:8.3f} ms/article  "
+          f"({percolator.checked / count:.1f} queries checked per article)")
+    if found != expected:
+        print("FAIL: the percolator and the full check disagree")
+        sys.exit(1)
+    print(f"OK: same matches, {brute_ms / max(percolate_ms, 0.001):.0f}x faster")
+
+
+if __name__ == "__main__":
+    main()
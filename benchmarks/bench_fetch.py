@@ -0,0 +1,144 @@
+# benchmarks/bench_fetch.py — Feed downloads: plain urllib vs. the keep-alive client
+# ==================================================================================
+# Starts local feed servers laid out like our real sources — one server per
+# host in sources.py, with that host's number of feeds — and downloads every
+# feed several times over with 8 threads, in two ways:
+#   1. "urllib": a new connection per feed, as feed_parser.py used to do
+#   2. "client": fetch_client.py (keep-alive pool) with feeds interleaved by
+#      host the way pipeline.py queues them
+# and prints the wall time, connections opened and bytes on the wire.
+#
+# Real servers are far away: every new https connection costs a TCP and a
+# TLS handshake (2–3 round trips). --handshake-ms adds that delay to each new
+# connection on the local servers so the test reflects it.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/bench_fetch.py --handshake-ms 60 --rounds 3
+
+import argparse
+import gzip
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parse import make_synthetic_feed
+from fetch_client import FetchClient
+from pipeline import interleave_by_host
+from sources import ALL_FEEDS
+
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.bytes_sent = 0
+
+    def add(self, connections=0, bytes_sent=0):
+        with self.lock:
+            self.connections += connections
+            self.bytes_sent += bytes_sent
+
+
+def make_handler(bodies, counters, handshake_seconds):
+    class FeedHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive unless the client says otherwise
+
+        def setup(self):
+            super().setup()
+            counters.add(connections=1)
+            time.sleep(handshake_seconds)  # stands in for TCP + TLS round trips
+
+        def do_GET(self):
+            body = bodies[self.path]
+            headers = {"Content-Type": "application/rss+xml"}
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, mtime=0)
+                headers["Content-Encoding"] = "gzip"
+            self.send_response(200)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            counters.add(bytes_sent=len(body))
+
+        def log_message(self, *args):
+            pass
+
+    return FeedHandler
+
+
+def start_servers(handshake_seconds, counters):
+    """One local server per real host; returns (feeds pointing at them, servers)."""
+    by_host = {}
+    for feed_info in ALL_FEEDS:
+        by_host.setdefault(urlsplit(feed_info["url"]).hostname, []).append(feed_info)
+
+    feeds, servers = [], []
+    for host_number, host_feeds in enumerate(by_host.values()):
+        bodies = {f"/feed/{i}": make_synthetic_feed(host_number * 10 + i) for i in range(len(host_feeds))}
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(bodies, counters, handshake_seconds))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        for i, feed_info in enumerate(host_feeds):
+            feeds.append(dict(feed_info, url=f"http://127.0.0.1:{server.server_port}/feed/{i}"))
+    return feeds, servers
+
+
+def urllib_download(url):
+    """The old download_feed(): a fresh connection every time."""
+    request = urllib.request.Request(url, headers={"User-Agent": "bench", "Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(request, timeout=15) as response:
+        body = response.read()
+        if response.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+    return body
+
+
+def run(label, download, feeds, rounds, counters):
+    counters.connections = counters.bytes_sent = 0
+    start = time.perf_counter()
+    body_bytes = 0
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(rounds):
+            body_bytes += sum(len(body) for body in pool.map(download, [f["url"] for f in feeds]))
+    seconds = time.perf_counter() - start
+    print(f"  {label:<8} {seconds:>7.2f} s   {counters.connections:>4} connections   "
+          f"{counters.bytes_sent / 1e6:>6.2f} MB on the wire ({body_bytes / 1e6:.2f} MB of XML)")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed download benchmark")
+    parser.add_argument("--handshake-ms", type=float, default=60,
+                        help="delay added to every new connection")
+    parser.add_argument("--rounds", type=int, default=3, help="times each feed is downloaded")
+    args = parser.parse_args()
+
+    counters = Counters()
+    feeds, servers = start_servers(args.handshake_ms / 1000, counters)
+    hosts = len(servers)
+    print(f"{len(feeds)} feeds on {hosts} hosts, {args.rounds} rounds, "
+          f"{args.handshake_ms:.0f} ms per new connection")
+
+    old = run("urllib", urllib_download, feeds, args.rounds, counters)
+    client = FetchClient("bench")
+    new = run("client", lambda url: client.get(url).body, interleave_by_host(feeds),
+              args.rounds, counters)
+    print(f"  client is {old / new:.1f}x faster")
+
+    client.close()
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_listing.py — Memory and time for list pages and full-table walks
+# ================================================================================
+# Fills a temporary database with articles that have long descriptions (like
+# real trade press) and compares:
+#   1. the homepage query the old way (SELECT * → dicts) vs. get_latest_articles()
+#      (only the listing columns, description cut in SQL → Article records)
+#   2. walking every article as one big list vs. iter_articles()
+# and prints the time and the peak Python memory (tracemalloc) for each.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/bench_listing.py --articles 50000
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+def fill(count):
+    """Writes count articles straight into a fresh database (no writer thread needed)."""
+    conn = sqlite3.connect(database.DB_PATH)
+    body = "Programmatic retail media measurement and privacy news. " * 40
+    conn.executemany("""
+        INSERT INTO articles (title, link, description, source_name, source_type,
+                              category, published_date, fetched_date, audio_url)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(f"Story {i}", f"https://example.com/{i}", body, f"Source {i % 40}",
+           "podcast" if i % 10 == 0 else "news", "adtech",
+           f"2026-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00",
+           "2026-10-01T00:00:00", "https://example.com/audio.mp3")
+          for i in range(count)])
+    conn.commit()
+    conn.close()
+
+
+def old_latest(limit):
+    conn = database.get_connection()
+    rows = conn.execute("SELECT * FROM articles WHERE source_type = ? "
+                        "ORDER BY published_date DESC LIMIT ?", ("news", limit)).fetchall()
+    articles = [dict(row) for row in rows]
+    conn.close()
+    return articles
+
+
+def old_walk():
+    conn = database.get_connection()
+    articles = [dict(row) for row in conn.execute("SELECT * FROM articles ORDER BY id")]
+    conn.close()
+    return sum(len(a["title"]) for a in articles)
+
+
+def new_walk():
+    return sum(len(a.title) for a in database.iter_articles())
+
+
+def measure(label, fn, repeat=1):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    seconds = (time.perf_counter() - start) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<38} {seconds * 1000:>9.2f} ms   peak {peak / 1024:>9.0f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listing query memory/time benchmark")
+    parser.add_argument("--articles", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        database.init_db()
+        fill(args.articles)
+        print(f"{args.articles} articles")
+
+        print("Homepage (20 news + 5 podcasts):")
+        measure("SELECT * → dicts", lambda: (old_latest(20), old_latest(5)), repeat=200)
+        measure("get_latest_articles()", lambda: (
+            database.get_latest_articles(limit=20, source_type="news"),
+            database.get_latest_articles(limit=5, source_type="podcast"),
+        ), repeat=200)
+
+        print("Walk every article:")
+        measure("list of dicts", old_walk)
+        measure("iter_articles()", new_walk)
+
+
+if __name__ == "__main__":
+    main()
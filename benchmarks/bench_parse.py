@@ -0,0 +1,112 @@
+# benchmarks/bench_parse.py — How fast does the parse stage scale with cores?
+# ===========================================================================
+# Runs parse_feed_body() over a corpus of feed files with 1, 2, 4... parser
+# processes and prints entries parsed per second plus the speedup over one
+# process. Parsing is CPU-bound, so on an N-core machine the speedup should
+# climb close to N.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/bench_parse.py                   # synthetic corpus
+#   python benchmarks/bench_parse.py --corpus feeds/   # a folder of .xml files
+#   python benchmarks/bench_parse.py --snapshots       # feeds we've really downloaded
+#   python benchmarks/bench_parse.py --json results.json
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_parser import parse_feed_body
+
+
+FEED_INFO = {"name": "Benchmark Feed", "url": "", "category": "adtech", "content_type": "news"}
+
+WORDS = ("programmatic retail media ctv measurement privacy cookie publisher "
+         "agency brand campaign auction bid identity streaming attention "
+         "clean room platform creative budget launch raises hires").split()
+
+
+def make_synthetic_feed(feed_number, entries=50):
+    """Builds one RSS document with HTML-heavy descriptions, like real trade press."""
+    items = []
+    for i in range(entries):
+        words = " ".join(WORDS[(feed_number + i + j) % len(WORDS)] for j in range(60))
+        items.append(f"""
+    <item>
+      <title>Story {feed_number}-{i}: {words[:80]}</title>
+      <link>https://example.com/{feed_number}/{i}</link>
+      <pubDate>Mon, 0{1 + i % 9} Jun 2026 1{i % 10}:00:00 GMT</pubDate>
+      <description><![CDATA[<p>{words}</p><p><a href="https://example.com">More</a> &amp; <b>{words}</b></p>]]></description>
+    </item>""")
+    return (f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed {feed_number}</title>
+<link>https://example.com</link><description>Synthetic</description>{''.join(items)}
+</channel></rss>""").encode("utf-8")
+
+
+def load_corpus(path):
+    """Reads every file in a folder as a raw feed body."""
+    bodies = []
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), "rb") as f:
+            bodies.append(f.read())
+    return bodies
+
+
+def _parse_one(body):
+    articles, _ = parse_feed_body(FEED_INFO, body)
+    return len(articles)
+
+
+def run(bodies, workers):
+    """Parses every body with the given number of processes; returns (entries, seconds)."""
+    start = time.perf_counter()
+    if workers == 1:
+        entries = sum(_parse_one(b) for b in bodies)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            entries = sum(pool.map(_parse_one, bodies, chunksize=2))
+    return entries, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse-stage throughput benchmark")
+    parser.add_argument("--corpus", help="folder of raw feed files (default: synthetic)")
+    parser.add_argument("--snapshots", action="store_true",
+                        help="use the stored feed snapshots (snapshots.py) as the corpus")
+    parser.add_argument("--feeds", type=int, default=64, help="synthetic feeds to generate")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    if args.snapshots:
+        import snapshots
+        bodies = [body for _, body in snapshots.iter_bodies()]
+    elif args.corpus:
+        bodies = load_corpus(args.corpus)
+    else:
+        bodies = [make_synthetic_feed(n) for n in range(args.feeds)]
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i <= cores], cores})
+
+    print(f"Corpus: {len(bodies)} feeds, {sum(map(len, bodies)) / 1e6:.1f} MB, {cores} cores")
+    results = []
+    baseline = None
+    for workers in worker_counts:
+        entries, seconds = run(bodies, workers)
+        rate = entries / seconds
+        baseline = baseline or rate
+        results.append({"workers": workers, "entries": entries, "seconds": round(seconds, 3),
+                        "entries_per_sec": round(rate, 1), "speedup": round(rate / baseline, 2)})
+        print(f"  {workers:>3} workers: {rate:>9.0f} entries/s  speedup {rate / baseline:.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"cores": cores, "feeds": len(bodies), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_suggest.py — How fast are search suggestions?
+# ================================================================
+# Builds the suggestion index (suggest.py) from the database, then times
+# lookups for what people really type: prefixes of headline words, source
+# names and topics, plus the same with a typo (a letter dropped, doubled or
+# swapped). Prints build time, index size and memory, and p50/p99/max
+# lookup time — the target is well under 5 ms per keystroke.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/bench_suggest.py
+#   ADTECH_PULSE_DB=fixture.db python benchmarks/bench_suggest.py --queries 20000
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import suggest
+
+
+def typo(word, rng):
+    """One random slip: a letter dropped, doubled or swapped with the next."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    slip = rng.choice(("drop", "double", "swap"))
+    if slip == "drop":
+        return word[:i] + word[i + 1:]
+    if slip == "double":
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def make_queries(index, count, rng):
+    """Half prefixes of known terms (as if mid-word), half full terms with a typo."""
+    texts = [entry[0] for entry in index._terms.values()]
+    queries = []
+    for _ in range(count):
+        text = rng.choice(texts)
+        if rng.random() < 0.5:
+            queries.append(text[:rng.randint(2, max(2, len(text)))])
+        else:
+            queries.append(typo(text, rng))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search suggestion benchmark")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = suggest.get_index()
+    build_seconds = time.perf_counter() - start
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    print(f"Built index: {len(index):,} terms in {build_seconds:.2f}s, ~{memory_mb:.1f} MB")
+
+    rng = random.Random(args.seed)
+    queries = make_queries(index, args.queries, rng)
+    latencies = []
+    found = 0
+    for query in queries:
+        start = time.perf_counter()
+        found += bool(index.suggest(query))
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    ms = lambda pct: latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))] * 1000
+    print(f"{len(queries):,} lookups: p50 {ms(50):.2f} ms   p99 {ms(99):.2f} ms   "
+          f"max {latencies[-1] * 1000:.2f} ms   ({found / len(queries):.0%} had suggestions)")
+
+
+if __name__ == "__main__":
+    main()
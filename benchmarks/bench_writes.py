@@ -0,0 +1,83 @@
+# benchmarks/bench_writes.py — Concurrent writers: own connections vs. the writer thread
+# =====================================================================================
+# Simulates ingestion, backfills and /refresh all writing at once: several
+# threads each save many small rows. Runs it twice —
+#   1. "direct": every write opens its own connection and commits (the old way)
+#   2. "writer": every write goes through database.write() (db_writer.py)
+# — and prints rows/second plus how many writes failed with "database is locked".
+#
+# TO RUN (from the project folder):
+#   python benchmarks/bench_writes.py --threads 8 --writes 500
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+def _direct_save(article):
+    # Short busy timeout, like a web request that can't wait forever
+    conn = sqlite3.connect(database.DB_PATH, timeout=1)
+    try:
+        database._insert_article(conn.cursor(), article)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _writer_save(article):
+    database.write(database._insert_article, article)
+
+
+def run(mode, threads, writes):
+    save = _direct_save if mode == "direct" else _writer_save
+    locked = 0
+    lock = threading.Lock()
+
+    def worker(n):
+        nonlocal locked
+        for i in range(writes):
+            article = {"title": f"T{n}-{i}", "link": f"https://example.com/{mode}/{n}/{i}",
+                       "published_date": "2026-06-01 00:00:00"}
+            try:
+                save(article)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                with lock:
+                    locked += 1
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    seconds = time.perf_counter() - start
+    total = threads * writes
+    print(f"  {mode:>6}: {total / seconds:>8.0f} writes/s   {locked} 'database is locked' errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent write benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=300, help="writes per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        database.init_db()
+        print(f"{args.threads} threads × {args.writes} writes")
+        for mode in ("direct", "writer"):
+            run(mode, args.threads, args.writes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/check_query_plans.py — Make sure the busy queries use their indexes
+# ===============================================================================
+# Fills a temporary database with many articles, then calls the functions
+# behind our busiest pages (latest news, latest by type and by category,
+# counts, search + facets, article + related, archive, trends) with the SQL
+# profiler capturing every statement they run and SQLite's EXPLAIN QUERY
+# PLAN for each.
+#
+# It FAILS if any of them reads the whole of a big table (articles,
+# article_entities, related_articles): a "SCAN articles" in the plan. The
+# one exception is walking an index in order for an ORDER BY ... LIMIT,
+# which stops after LIMIT rows.
+#
+# It exits with status 1 on failure, so it can run as a CI check.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/check_query_plans.py --articles 50000
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import sql_profiler
+
+
+# Tables that grow with every ingest — reading all of them is never OK
+BIG_TABLES = {"articles", "article_entities", "related_articles"}
+
+HOT_CALLS = [
+    ("latest (homepage)", lambda: database.get_latest_articles(limit=20)),
+    ("latest news", lambda: database.get_latest_articles(limit=20, source_type="news")),
+    ("latest podcasts", lambda: database.get_latest_articles(limit=5, source_type="podcast")),
+    ("latest in category", lambda: database.get_latest_articles(limit=30, category="privacy")),
+    ("category counts", database.get_category_counts),
+    ("source counts", database.get_source_counts),
+    ("article count", database.get_article_count),
+    ("search (common word)", lambda: database.search_articles("retail", limit=30)),
+    ("search (rare word)", lambda: database.search_articles("story 12345", limit=30)),
+    ("search facets (all match)", lambda: database.faceted_search("retail", limit=30)),
+    ("search facets (filtered)", lambda: database.faceted_search(
+        "retail", {"category": "privacy", "week": "2026-03-09"}, limit=30)),
+    ("article page", lambda: database.get_article(1234)),
+    ("related articles", lambda: database.get_related_articles(1234)),
+    ("archive page", lambda: database.get_articles_in_id_range(1001, 1051)),
+    ("trends (30 days)", lambda: database.get_trend_series("2026-09-01", "2026-09-30")),
+]
+
+CATEGORY_NAMES = ["privacy", "ctv", "retail_media", "programmatic", "measurement", "adtech"]
+
+
+def fill(count):
+    """Writes count articles straight into the database, then builds the rollups."""
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.executemany("""
+        INSERT INTO articles (title, link, description, source_name, source_type,
+                              category, published_date, fetched_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(f"Story {i} about {CATEGORY_NAMES[i % 6]}", f"https://example.com/{i}",
+           "Retail media and measurement news for the ad industry.",
+           f"Source {i % 40}", "podcast" if i % 10 == 0 else "news", CATEGORY_NAMES[i % 6],
+           f"2026-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00", "2026-10-01T00:00:00")
+          for i in range(count)])
+    database._rebuild_rollups(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def aliases(sql):
+    """{'a': 'articles', 'articles': 'articles', ...} for the big tables a statement names."""
+    names = {table: table for table in BIG_TABLES}
+    for table, alias in re.findall(r"\b(articles|article_entities|related_articles)\s+(?:AS\s+)?(\w+)",
+                                   sql, re.I):
+        if alias.upper() not in ("WHERE", "ORDER", "GROUP", "JOIN", "ON", "LIMIT", "SET"):
+            names[alias] = table
+    return names
+
+
+def problems(sql, plan):
+    """Plan lines that mean a full read of a big table."""
+    tables = aliases(sql)
+    top_n = re.search(r"\bORDER BY\b.*\bLIMIT\b", sql, re.I | re.S) is not None
+    bad = []
+    for line in plan:
+        match = re.match(r"SCAN (\w+)(.*)", line)
+        if not match or match.group(1) not in tables:
+            continue
+        if top_n and "INDEX" in match.group(2):
+            continue  # index walked in order, stops at LIMIT
+        bad.append(line)
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plan check for the busiest queries")
+    parser.add_argument("--articles", type=int, default=50000)
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "plans.db")
+        database.init_db()
+        fill(args.articles)
+        database.SQL_PROFILE = True  # every connection from here on is profiled
+
+        print(f"{args.articles} articles")
+        for label, call in HOT_CALLS:
+            with sql_profiler.capture_plans() as statements:
+                start = time.perf_counter()
+                call()
+                ms = (time.perf_counter() - start) * 1000
+            bad = [line for sql, _, plan in statements for line in problems(sql, plan)]
+            print(f"  {'FAIL' if bad else 'ok':<5} {label:<22} {ms:>8.2f} ms")
+            for sql, _, plan in statements:
+                for line in plan:
+                    print(f"          {line}")
+            for line in bad:
+                print(f"        ✗ full table read: {line}")
+            failures += bool(bad)
+
+    if failures:
+        print(f"FAIL: {failures} hot quer{'y' if failures == 1 else 'ies'} read a whole table")
+        sys.exit(1)
+    print("OK: every hot query uses an index")
+
+
+if __name__ == "__main__":
+    main()
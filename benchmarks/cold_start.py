@@ -0,0 +1,61 @@
+# benchmarks/cold_start.py — How long until a fresh server answers its first request?
+# ==================================================================================
+# Starts the production entry point (python wsgi.py) as a new process and
+# times how long it takes until the first byte of the homepage comes back —
+# "time to first byte" after a cold start. Uses whatever database is already
+# in the project folder, just like a deploy restart would.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/cold_start.py --runs 5
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_byte(port, timeout=120):
+    """Launches wsgi.py and returns seconds until "/" sends its first byte."""
+    env = dict(os.environ, PORT=str(port))
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "wsgi.py"], cwd=PROJECT_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=timeout) as s:
+                    s.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                    if s.recv(1):
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("server never answered")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time-to-first-byte")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = [time_to_first_byte(free_port()) for _ in range(args.runs)]
+    for i, seconds in enumerate(timings, 1):
+        print(f"  run {i}: {seconds * 1000:.0f} ms")
+    print(f"Median time to first byte: {statistics.median(timings) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/import_budget.py — Keep web workers from loading the ingestion stack
+# ==============================================================================
+# Every web worker imports app.py (or wsgi.py) when it starts. Anything those
+# imports drag in costs startup time and memory in EVERY worker. The feed
+# fetcher (feedparser, the feed list, the pipeline) is only needed by /refresh
+# and the background fetcher, so it must stay out of that path.
+#
+# This script runs "python -X importtime -c 'import wsgi'" in a fresh process and:
+#   1. FAILS if any ingestion module got imported
+#   2. FAILS if the total import time is over the budget
+#   3. Prints the slowest imports and the worker's memory (RSS), compared
+#      with a process that also loads the ingestion stack
+#
+# It exits with status 1 on failure, so it can run as a CI check.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/import_budget.py --budget-ms 400
+
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a web worker must never import at startup
+INGEST_MODULES = {"feedparser", "feed_parser", "fetch_client", "sources", "pipeline", "prospects",
+                  "snapshots", "websub", "alerts"}
+
+RSS_SNIPPET = "import resource, sys; {imports}; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+
+def import_profile(module):
+    """Returns {module_name: cumulative_microseconds} for importing one module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        env=dict(os.environ, ADTECH_PULSE_INGEST="0"),
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        timings[name] = int(cumulative_us)
+    return timings
+
+
+def peak_rss_kb(imports):
+    """Peak memory (KB on Linux) of a fresh process after running the imports."""
+    result = subprocess.run(
+        [sys.executable, "-c", RSS_SNIPPET.format(imports=imports)],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        env=dict(os.environ, ADTECH_PULSE_INGEST="0"),
+    )
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web worker import-time budget")
+    parser.add_argument("--module", default="app", help="entry module to profile")
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    args = parser.parse_args()
+
+    timings = import_profile(args.module)
+    total_ms = timings.get(args.module, 0) / 1000
+    leaked = sorted(INGEST_MODULES & set(timings))
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports:")
+    for name, us in sorted(timings.items(), key=lambda item: -item[1])[:8]:
+        print(f"  {us / 1000:>7.1f} ms  {name}")
+
+    web_rss = peak_rss_kb(f"import {args.module}")
+    full_rss = peak_rss_kb(f"import {args.module}; import feed_parser, pipeline")
+    print(f"Worker RSS: {web_rss / 1024:.1f} MB "
+          f"(with ingestion stack: {full_rss / 1024:.1f} MB, saves {(full_rss - web_rss) / 1024:.1f} MB)")
+
+    failed = False
+    if leaked:
+        print(f"FAIL: web path imported ingestion modules: {', '.join(leaked)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# benchmarks/load_test.py — How fast are the pages under load?
+# =============================================================
+# Starts the site on a database (usually a big one from make_fixture_db.py),
+# then has several simulated visitors request pages as fast as they can for
+# a while, following a MIX of routes — by default mostly the homepage, topic
+# pages and searches. At the end it prints, for each route:
+#   requests/second, and the 50th/95th/99th percentile response time
+#   (p95 = 95% of requests were at least this fast)
+#
+# Results can be saved as JSON; pass an earlier file as --baseline and the
+# run FAILS (exit status 1) if any route's p95 got more than --tolerance slower.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/make_fixture_db.py --articles 2000000 --out fixture.db
+#   python benchmarks/load_test.py --db fixture.db --concurrency 16 --duration 60 \
+#       --json results-today.json --baseline results-last-week.json
+#
+#   python benchmarks/load_test.py --url http://localhost:8000   # an already running server
+#
+# MIX FORMAT: "route=weight,route=weight". Routes may use {category}, {word}
+# and {id}, filled in at random for each request:
+#   --mix "/=40,/category/{category}=25,/search?q={word}=25,/about=10"
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from config import CATEGORIES
+
+
+DEFAULT_MIX = "/=40,/category/{category}=25,/search?q={word}=25,/about=10"
+
+SEARCH_WORDS = sorted({word for settings in CATEGORIES.values() for word in settings["keywords"]}
+                      | {"trade desk", "walmart", "netflix", "cookie", "budget", "q3 results"})
+
+
+def parse_mix(text):
+    """'/=40,/about=10' → [('/', 40.0), ('/about', 10.0)]"""
+    mix = []
+    for part in text.split(","):
+        route, _, weight = part.strip().rpartition("=")
+        mix.append((route, float(weight)))
+    return mix
+
+
+def fill_route(route, rng, max_id):
+    return route.format(
+        category=rng.choice(list(CATEGORIES)),
+        word=quote(rng.choice(SEARCH_WORDS)),
+        id=rng.randint(1, max(max_id, 1)),
+    )
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors, byte_count, seconds):
+    latencies = sorted(latencies)
+    ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / seconds, 1),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+        "mean_ms": ms(sum(latencies) / len(latencies) if latencies else None),
+        "kb_per_request": round(byte_count / len(latencies) / 1024, 1) if latencies else None,
+    }
+
+
+# ============================================================
+# THE SERVER
+# ============================================================
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path, gunicorn_workers):
+    """Runs the site on db_path in a separate process; returns (process, base_url)."""
+    port = free_port()
+    env = dict(os.environ, ADTECH_PULSE_DB=os.path.abspath(db_path),
+               ADTECH_PULSE_INGEST="0", PORT=str(port))
+    if gunicorn_workers:
+        command = [sys.executable, "-m", "gunicorn", "-w", str(gunicorn_workers),
+                   "-b", f"127.0.0.1:{port}", "wsgi:app"]
+    else:
+        command = [sys.executable, "wsgi.py"]
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Server exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    sys.exit("Server didn't start within 30 seconds")
+
+
+# ============================================================
+# THE VISITORS
+# ============================================================
+
+def run_load(base_url, mix, concurrency, duration, warmup, max_id, seed):
+    """Runs the visitors; returns {route: [latencies], ...}, errors and bytes per route."""
+    target = urlsplit(base_url)
+    routes = [route for route, _ in mix]
+    weights = [weight for _, weight in mix]
+    results = {route: {"latencies": [], "errors": 0, "bytes": 0} for route in routes}
+    lock = threading.Lock()
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+
+    def visitor(n):
+        rng = random.Random(seed + n)
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        mine = {route: {"latencies": [], "errors": 0, "bytes": 0} for route in routes}
+        while True:
+            route = rng.choices(routes, weights)[0]
+            path = fill_route(route, rng, max_id)
+            start = time.monotonic()
+            if start >= stop_at:
+                break
+            try:
+                conn.request("GET", path, headers={"Accept-Encoding": "gzip, br"})
+                response = conn.getresponse()
+                body = response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                body, ok = b"", False
+            if start < measure_from:
+                continue  # warming up: caches, connections, first imports
+            if ok:
+                mine[route]["latencies"].append(time.monotonic() - start)
+                mine[route]["bytes"] += len(body)
+            else:
+                mine[route]["errors"] += 1
+        conn.close()
+        with lock:
+            for route, data in mine.items():
+                results[route]["latencies"].extend(data["latencies"])
+                results[route]["errors"] += data["errors"]
+                results[route]["bytes"] += data["bytes"]
+
+    threads = [threading.Thread(target=visitor, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def article_count_and_max_id(db_path):
+    conn = sqlite3.connect(db_path)
+    count, max_id = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM articles").fetchone()
+    conn.close()
+    return count, max_id
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """Routes whose p95 got more than tolerance slower than in the baseline."""
+    slower = []
+    for route, now in report["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before or not before.get("p95_ms") or not now.get("p95_ms"):
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            slower.append((route, before["p95_ms"], now["p95_ms"]))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the web pages")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--db", help="start the site on this database file")
+    target.add_argument("--url", help="test an already running server instead")
+    parser.add_argument("--gunicorn-workers", type=int, default=0,
+                        help="serve with gunicorn and this many workers (default: python wsgi.py)")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds to measure")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds before measuring")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p95 slowdown vs. the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    process = None
+    articles, max_id = (None, 1000)
+    if args.db:
+        articles, max_id = article_count_and_max_id(args.db)
+        process, base_url = start_server(args.db, args.gunicorn_workers)
+    else:
+        base_url = args.url.rstrip("/")
+
+    print(f"Load test: {base_url}, {args.concurrency} visitors, {args.duration:.0f}s"
+          + (f", {articles:,} articles" if articles is not None else ""))
+    try:
+        results = run_load(base_url, mix, args.concurrency, args.duration, args.warmup,
+                           max_id, args.seed)
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "target": args.url or os.path.basename(args.db),
+        "articles": articles,
+        "server": f"gunicorn -w {args.gunicorn_workers}" if args.gunicorn_workers else "wsgi.py",
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": args.mix,
+        "routes": {route: summarize(data["latencies"], data["errors"], data["bytes"], args.duration)
+                   for route, data in results.items()},
+    }
+    everything = [latency for data in results.values() for latency in data["latencies"]]
+    report["total"] = summarize(everything, sum(d["errors"] for d in results.values()),
+                                sum(d["bytes"] for d in results.values()), args.duration)
+
+    print(f"{'route':<28} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for route, stats in list(report["routes"].items()) + [("TOTAL", report["total"])]:
+        print(f"{route:<28} {stats['rps']:>8.1f} {stats['p50_ms'] or 0:>8.1f} "
+              f"{stats['p95_ms'] or 0:>8.1f} {stats['p99_ms'] or 0:>8.1f} {stats['errors']:>7}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = compare(report, json.load(f), args.tolerance)
+        for route, before, now in slower:
+            print(f"REGRESSION {route}: p95 {before:.1f} ms → {now:.1f} ms")
+        if slower:
+            sys.exit(1)
+        print(f"OK: no route's p95 is more than {args.tolerance:.0%} slower than the baseline")
+
+
+if __name__ == "__main__":
+    main()
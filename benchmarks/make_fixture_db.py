@@ -0,0 +1,153 @@
+# benchmarks/make_fixture_db.py — Build a big, realistic database for load tests
+# ==============================================================================
+# Fills a fresh database file with millions of made-up articles that look
+# like a year of our real feeds: every source in sources.py (with its real
+# type and usual category), headlines and summaries built from each
+# category's keywords, dates spread over the period with more posts on
+# weekdays and in working hours, and a podcast duration for episodes.
+# The output is the same every time for the same --seed.
+#
+# The search index and trend rollups are built at the end, the same way
+# init_db() builds them for an existing database.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/make_fixture_db.py --articles 2000000 --out fixture.db
+#   ADTECH_PULSE_DB=fixture.db python wsgi.py     # serve it
+#   python benchmarks/load_test.py --db fixture.db
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CATEGORIES
+from sources import ALL_FEEDS
+
+
+BATCH = 20000  # Rows per INSERT batch
+
+COMPANIES = ["The Trade Desk", "Google", "Amazon Ads", "Magnite", "PubMatic", "Criteo",
+             "Roku", "Netflix", "Walmart Connect", "Instacart", "DoubleVerify", "IAS",
+             "LiveRamp", "Yahoo DSP", "Meta", "Disney", "Comcast", "Uber", "Kroger", "Nielsen"]
+VERBS = ["launches", "expands", "rethinks", "bets on", "doubles down on", "tests",
+         "reports growth in", "faces questions over", "partners on", "cuts back on"]
+FILLER = ("marketers advertisers budgets quarter growth industry data partners platform "
+          "buyers sellers audience inventory pricing outcomes strategy report survey "
+          "executives deal announced rollout pilot results analysts").split()
+# More posts on weekdays, and between 8:00 and 20:00 UTC
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 8, 9, 9, 9, 8, 8, 9, 9, 8, 7, 5, 4, 3, 2, 1, 1]
+DAY_WEIGHTS = [10, 10, 10, 10, 9, 4, 3]
+
+
+def make_rows(count, start, days, rng):
+    """Yields article tuples in the same column order as the INSERT below."""
+    feeds = ALL_FEEDS
+    category_names = list(CATEGORIES)
+    # Big trade sites post far more than a niche podcast
+    feed_weights = list(accumulate(rng.uniform(0.2, 3.0) for _ in feeds))
+    hour_weights = list(accumulate(HOUR_WEIGHTS))
+    day_choices = [d for d in range(days)
+                   for _ in range(DAY_WEIGHTS[(start + timedelta(days=d)).weekday()])]
+
+    for i in range(count):
+        feed = rng.choices(feeds, cum_weights=feed_weights)[0]
+        # Most posts land in the feed's own category, some in another
+        category = feed["category"] if rng.random() < 0.7 else rng.choice(category_names)
+        keywords = CATEGORIES[category]["keywords"]
+        company = rng.choice(COMPANIES)
+        topic = rng.choice(keywords)
+
+        title = f"{company} {rng.choice(VERBS)} {topic}"
+        if rng.random() < 0.5:
+            title += f" as {rng.choice(keywords)} {rng.choice(FILLER)} shift"
+        words = [rng.choice(FILLER if rng.random() < 0.7 else keywords)
+                 for _ in range(rng.randint(25, 90))]
+        description = f"{company} {rng.choice(VERBS)} {topic}. " + " ".join(words).capitalize() + "."
+
+        moment = start + timedelta(days=rng.choice(day_choices),
+                                   hours=rng.choices(range(24), cum_weights=hour_weights)[0],
+                                   minutes=rng.randrange(60), seconds=rng.randrange(60))
+        published = moment.strftime("%Y-%m-%d %H:%M:%S")
+        fetched = (moment + timedelta(minutes=rng.randrange(5, 65))).isoformat(timespec="seconds")
+
+        is_podcast = feed["content_type"] == "podcast"
+        yield (
+            title, f"https://fixture.example/{feed['content_type']}/{i}", description,
+            feed["name"], feed["content_type"], category, published, fetched,
+            f"https://fixture.example/audio/{i}.mp3" if is_podcast else None,
+            f"{rng.randint(15, 75)}:{rng.randrange(60):02d}" if is_podcast else None,
+        )
+
+
+def build(path, count, days, seed):
+    import database
+
+    if os.path.exists(path):
+        sys.exit(f"{path} already exists — pick another --out or delete it first")
+    database.DB_PATH = path
+    database.init_db()
+
+    conn = sqlite3.connect(path)
+    # Speed over safety: if this crashes, just delete the file and run it again
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")  # 256 MB
+
+    # Loading first and indexing once at the end is much faster than
+    # updating the search index row by row, so the triggers are set aside
+    # (and put back exactly as init_db() made them).
+    triggers = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'articles'"
+    ).fetchall()
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+
+    rng = random.Random(seed)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    rows = make_rows(count, start, days, rng)
+    began = time.perf_counter()
+    done = 0
+    while done < count:
+        batch = [row for _, row in zip(range(BATCH), rows)]
+        conn.executemany("""
+            INSERT INTO articles (title, link, description, source_name, source_type,
+                                  category, published_date, fetched_date, audio_url, audio_duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+        conn.commit()
+        done += len(batch)
+        rate = done / (time.perf_counter() - began)
+        print(f"\r  {done:>10,} / {count:,} articles  ({rate:,.0f}/s)", end="", flush=True)
+    print()
+
+    print("  Building rollups...")
+    database._rebuild_rollups(conn.cursor())
+    if triggers:
+        print("  Building search index...")
+        conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+        for _, sql in triggers:
+            conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+    size = os.path.getsize(path) / 1e6
+    print(f"Wrote {path}: {count:,} articles, {size:,.0f} MB in {time.perf_counter() - began:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic database for load tests")
+    parser.add_argument("--articles", type=int, default=2000000)
+    parser.add_argument("--days", type=int, default=365, help="spread articles over this many days")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="fixture.db")
+    args = parser.parse_args()
+    build(args.out, args.articles, args.days, args.seed)
+
+
+if __name__ == "__main__":
+    main()
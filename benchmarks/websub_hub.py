@@ -0,0 +1,245 @@
+# benchmarks/websub_hub.py — A stand-in WebSub hub, to try push locally
+# ======================================================================
+# Real hubs (WordPress, Superfeedr, Google's pubsubhubbub) can only call a
+# site with a public address. This is a tiny hub that runs on your machine
+# and behaves like one:
+#
+#   POST /              subscribe / unsubscribe (form: hub.mode, hub.topic,
+#                       hub.callback, hub.secret, hub.lease_seconds). Checks
+#                       intent — GETs the callback with a challenge and
+#                       expects it echoed back — then answers 202.
+#   POST /publish?topic=<url>
+#                       sends the request body to every subscriber of that
+#                       topic, signed with X-Hub-Signature: sha256=<HMAC>.
+#
+# "check" runs the whole flow end to end against a throwaway database: the
+# site (app.py) on a local port, a feed that names this hub, subscribing,
+# verification, a signed push being saved, a badly signed one ignored, and
+# polling taking over once the lease lapses. Exits 1 if anything fails.
+#
+# TO RUN (from the project folder):
+#   python benchmarks/websub_hub.py check
+#   python benchmarks/websub_hub.py serve --port 8765   # then point a feed's hub at it
+
+import argparse
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Hub:
+    """Subscriptions by topic: {topic: {callback: secret}}."""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+
+    def verify_and_store(self, form):
+        """Checks intent with the subscriber, then (un)subscribes it."""
+        mode, topic, callback = form["hub.mode"], form["hub.topic"], form["hub.callback"]
+        challenge = secrets.token_hex(8)
+        query = {"hub.mode": mode, "hub.topic": topic, "hub.challenge": challenge}
+        if mode == "subscribe":
+            query["hub.lease_seconds"] = form.get("hub.lease_seconds", "86400")
+        separator = "&" if "?" in callback else "?"
+        try:
+            with urllib.request.urlopen(callback + separator + urllib.parse.urlencode(query),
+                                        timeout=10) as response:
+                confirmed = response.status == 200 and response.read().decode() == challenge
+        except Exception:
+            confirmed = False
+        with self.lock:
+            subscribers = self.subscriptions.setdefault(topic, {})
+            if confirmed and mode == "subscribe":
+                subscribers[callback] = form.get("hub.secret", "")
+            elif confirmed:
+                subscribers.pop(callback, None)
+        print(f"  hub: {mode} {topic} → {'confirmed' if confirmed else 'NOT confirmed'}")
+
+    def publish(self, topic, body, content_type="application/rss+xml"):
+        """Delivers body to every subscriber of topic. Returns their status codes."""
+        with self.lock:
+            subscribers = dict(self.subscriptions.get(topic, {}))
+        statuses = []
+        for callback, secret in subscribers.items():
+            headers = {"Content-Type": content_type}
+            if secret:
+                digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+                headers["X-Hub-Signature"] = f"sha256={digest}"
+            request = urllib.request.Request(callback, data=body, headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    statuses.append(response.status)
+            except urllib.error.HTTPError as e:
+                statuses.append(e.code)
+        return statuses
+
+
+def make_server(hub, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            url = urllib.parse.urlsplit(self.path)
+            if url.path == "/publish":
+                topic = urllib.parse.parse_qs(url.query).get("topic", [""])[0]
+                statuses = hub.publish(topic, body, self.headers.get("Content-Type") or
+                                       "application/rss+xml")
+                self._reply(200, f"delivered: {statuses}\n")
+                return
+            form = {k: v[0] for k, v in urllib.parse.parse_qs(body.decode()).items()}
+            if form.get("hub.mode") not in ("subscribe", "unsubscribe") or \
+                    not form.get("hub.topic") or not form.get("hub.callback"):
+                self._reply(400, "hub.mode, hub.topic and hub.callback are required\n")
+                return
+            # Verify before even answering: the earliest a real hub's check
+            # can arrive, so a subscriber that only records its request once
+            # the 202 is back fails here
+            hub.verify_and_store(form)
+            self._reply(202, "")
+
+        def _reply(self, status, text):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(text)))
+            self.end_headers()
+            self.wfile.write(text.encode())
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+def sample_feed(topic, hub_url, titles):
+    items = "".join(
+        f"<item><title>{title}</title><link>https://example.com/{i}-{int(time.time() * 1000)}</link>"
+        f"<description>{title} — pushed.</description></item>"
+        for i, title in enumerate(titles))
+    return (f'<?xml version="1.0"?><rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">'
+            f'<channel><title>Test</title><link>https://example.com/</link>'
+            f'<atom:link rel="hub" href="{hub_url}"/><atom:link rel="self" href="{topic}"/>'
+            f'{items}</channel></rss>').encode()
+
+
+def wait_for(condition, seconds=10):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def check():
+    """End-to-end run against a throwaway database. Returns True if it all worked."""
+    tmp = tempfile.mkdtemp()
+    hub_server = make_server(Hub(), 0)
+    hub_url = f"http://127.0.0.1:{hub_server.server_port}/"
+
+    # The site's port has to be known before config.py is imported
+    from werkzeug.serving import make_server as make_wsgi_server
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    site_port = probe.getsockname()[1]
+    probe.close()
+    os.environ.update(ADTECH_PULSE_DB=os.path.join(tmp, "websub.db"), ADTECH_PULSE_INGEST="0",
+                      ADTECH_PULSE_WEBSUB="1",
+                      ADTECH_PULSE_WEBSUB_CALLBACK=f"http://127.0.0.1:{site_port}")
+    sys.path.insert(0, PROJECT_DIR)
+
+    import database
+    import feed_parser
+    import snapshots
+    import websub
+    from app import app
+    from sources import ALL_FEEDS
+
+    database.init_db()
+    snapshots.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    feed_parser.after_ingest = lambda new_articles: None  # no outbound feeds / related index
+    site = make_wsgi_server("127.0.0.1", site_port, app, threaded=True)
+    for server in (hub_server, site):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    feed = ALL_FEEDS[0]
+    topic = feed["url"]
+    results = []
+
+    def step(name, ok):
+        results.append(ok)
+        print(f"  {'ok  ' if ok else 'FAIL'}  {name}")
+
+    # 1. Discovery: parsing the feed finds the hub
+    _, stats = feed_parser.parse_feed_body(feed, sample_feed(topic, hub_url, ["First"]))
+    step("hub discovered while parsing", stats.get("websub") == (hub_url, topic))
+    websub.record_discovered([(feed["url"], *stats["websub"])])
+
+    # 2. Subscribe → the hub verifies intent against /websub/<id>
+    report = websub.maintain()
+    active = lambda: database.get_websub_subscriptions()[0]["state"] == "active"
+    step("subscribed and verified", report["subscribe"] == 1 and wait_for(active))
+    step("feed left out of polling", feed not in websub.polled_feeds(ALL_FEEDS))
+
+    # 3. A signed push is saved within moments
+    before = database.get_max_article_id()
+    started = time.perf_counter()
+    body = sample_feed(topic, hub_url, ["Pushed story one", "Pushed story two"])
+    request = urllib.request.Request(f"{hub_url}publish?topic={urllib.parse.quote(topic)}",
+                                     data=body, headers={"Content-Type": "application/rss+xml"})
+    urllib.request.urlopen(request, timeout=10).read()
+    saved = wait_for(lambda: database.get_max_article_id() >= before + 2)
+    step(f"signed push saved ({(time.perf_counter() - started) * 1000:.0f} ms)", saved)
+
+    # 4. A push with the wrong signature is acknowledged but ignored
+    subscription = database.get_websub_subscriptions()[0]
+    bad = urllib.request.Request(websub.callback_url(subscription),
+                                 data=sample_feed(topic, hub_url, ["Forged"]),
+                                 headers={"X-Hub-Signature": "sha256=" + "0" * 64})
+    status = urllib.request.urlopen(bad, timeout=10).status
+    time.sleep(0.5)
+    step("badly signed push ignored", status == 202 and
+         database.get_max_article_id() == before + 2)
+
+    # 5. The lease lapses → polling takes the feed back
+    lapsed = (datetime.now() - timedelta(minutes=1)).isoformat()
+    database.update_websub_subscription(feed["url"], expires_at=lapsed)
+    step("polled again after the lease lapses", feed in websub.polled_feeds(ALL_FEEDS))
+
+    hub_server.shutdown()
+    site.shutdown()
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in WebSub hub")
+    parser.add_argument("command", choices=("serve", "check"))
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = make_server(Hub(), args.port)
+        print(f"Stand-in hub on http://127.0.0.1:{args.port}/ (Ctrl+C to stop)")
+        server.serve_forever()
+    else:
+        print("WebSub end-to-end check:")
+        ok = check()
+        print("OK" if ok else "FAILED")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
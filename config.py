@@ -1,19 +1,11 @@
-# config.py — Feed URLs and application settings
-# ================================================
-# AdTech Pulse (working title) — Complete Feed Configuration
+# config.py — Application settings
+# ==================================
+# AdTech Pulse (working title) — settings, topic categories and keywords.
 # Last updated: February 18, 2026
 #
-# FEED TIERS:
-#   Tier 1 = Core industry news (high volume, high signal)
-#   Tier 2 = Vendor/platform blogs (prospect research + product launches)
-#   Tier 3 = Niche verticals (retail media, measurement)
-#
-# SOCIAL/COMMUNITY FEEDS:
-#   Reddit = Unfiltered practitioner opinions, real questions
-#   Bluesky = Real-time industry reaction, hot takes from key voices
-#   Mastodon = Privacy/open-web crowd, technical ad tech discussion
-#   Hacker News = Tech-forward perspective on ad tech
-#   Substack = Deep-dive analysis from independent writers
+# The feed URLs themselves live in sources.py.
+
+import os
 
 # --- APPLICATION SETTINGS ---
 APP_NAME = "AdTech Pulse"
@@ -23,355 +15,67 @@ DEBUG = True  # Set to False when deploying to production
 # --- HOW OFTEN TO PULL FEEDS (in minutes) ---
 FETCH_INTERVAL = 60  # Pull new content every 60 minutes
 
+# --- PUBLIC SITE ADDRESS ---
+# Used for absolute links in the outbound RSS/Atom feeds and sitemap.
+# Change this to your real domain when you deploy.
+SITE_URL = "http://localhost:5000"
+
+# --- LIVE UPDATES (see live.py) ---
+# Open pages get new articles pushed to them (server-sent events) by
+# live.py, which listens on LIVE_PORT. LIVE_URL is where browsers connect:
+# e.g. "/live" when a proxy forwards that path to it. Empty = off
+# (python app.py turns it on for development).
+LIVE_PORT = int(os.environ.get("ADTECH_PULSE_LIVE_PORT", 8001))
+LIVE_URL = os.environ.get("ADTECH_PULSE_LIVE_URL", "")
+
+# --- WEBSUB PUSH (see websub.py) ---
+# Feeds that name a WebSub hub can have it push new entries to us within
+# seconds, instead of us polling them. The hub has to reach this site at
+# WEBSUB_CALLBACK_BASE, so it stays off until the site has a public address.
+WEBSUB_ENABLED = os.environ.get("ADTECH_PULSE_WEBSUB") == "1"
+WEBSUB_CALLBACK_BASE = os.environ.get("ADTECH_PULSE_WEBSUB_CALLBACK", SITE_URL)  # hubs call <this>/websub/<id>
+WEBSUB_LEASE_SECONDS = 10 * 24 * 3600    # Lease we ask hubs for (they may pick another)
+
+# --- SQL PROFILING (see sql_profiler.py) ---
+# Times every database query and logs slow ones with their query plan.
+# Leave off in production; turn on here or with ADTECH_PULSE_SQL_PROFILE=1.
+SQL_PROFILE = os.environ.get("ADTECH_PULSE_SQL_PROFILE") == "1"
+SLOW_QUERY_MS = 50  # Queries slower than this are logged
+
 # --- ARTICLE RETENTION ---
 RETENTION_DAYS = 7  # Keep articles for 7 days minimum for trend analysis
 
+# --- MONTHLY PARTITIONS (see partitions.py) ---
+# Months older than this move out of the live database into read-only
+# files in partitions/, one per month. The current month never moves.
+ARCHIVE_AFTER_MONTHS = 6
 
-# =============================================================
-# NEWS RSS FEEDS (24 sources)
-# =============================================================
-NEWS_FEEDS = [
-    # =====================
-    # TIER 1 — Core Industry News (9 sources)
-    # =====================
-    {
-        "name": "AdExchanger",
-        "url": "https://www.adexchanger.com/feed/",
-        "category": "programmatic"
-    },
-    {
-        "name": "Digiday",
-        "url": "https://digiday.com/feed/",
-        "category": "media"
-    },
-    {
-        "name": "AdWeek",
-        "url": "https://www.adweek.com/feed/",
-        "category": "advertising"
-    },
-    {
-        "name": "AdWeek Ad Tech",
-        "url": "https://adweek.com/category/ad-tech/feed",
-        "category": "adtech"
-    },
-    {
-        "name": "AdTech Daily",
-        "url": "https://adtechdaily.com/feed",
-        "category": "adtech"
-    },
-    {
-        "name": "VideoWeek",
-        "url": "https://videoweek.com/feed",
-        "category": "ctv"
-    },
-    {
-        "name": "ExchangeWire",
-        "url": "https://feeds.feedburner.com/Exchangewirecom",
-        "category": "adtech"
-    },
-    {
-        "name": "Marketing Dive — MarTech",
-        "url": "https://marketingdive.com/topic/marketing-technology/feed",
-        "category": "adtech"
-    },
-    {
-        "name": "TechCrunch Ad Tech",
-        "url": "https://techcrunch.com/tag/advertising-tech/feed",
-        "category": "adtech"
-    },
-
-    # =====================
-    # TIER 2 — Vendor & Platform Blogs (10 sources)
-    # Great for understanding prospect companies
-    # =====================
-    {
-        "name": "Basis Technologies",
-        "url": "https://basis.com/blog/feed",
-        "category": "programmatic"
-    },
-    {
-        "name": "Clearcode",
-        "url": "https://clearcode.cc/feed",
-        "category": "adtech"
-    },
-    {
-        "name": "OpenX",
-        "url": "https://blog.openx.com/feed",
-        "category": "programmatic"
-    },
-    {
-        "name": "Magnite",
-        "url": "https://magnite.com/blog/feed",
-        "category": "ctv"
-    },
-    {
-        "name": "Index Exchange",
-        "url": "https://indexexchange.com/blog/feed",
-        "category": "programmatic"
-    },
-    {
-        "name": "Prebid",
-        "url": "https://prebid.org/feed",
-        "category": "programmatic"
-    },
-    {
-        "name": "Equativ",
-        "url": "https://equativ.com/feed",
-        "category": "programmatic"
-    },
-    {
-        "name": "MNTN",
-        "url": "https://mountain.com/blog/feed",
-        "category": "ctv"
-    },
-    {
-        "name": "MediaRadar",
-        "url": "https://mediaradar.com/blog/rss.xml",
-        "category": "measurement"
-    },
-    {
-        "name": "Verve Group",
-        "url": "https://verve.com/feed",
-        "category": "privacy"
-    },
-
-    # =====================
-    # TIER 3 — Retail Media & Niche (5 sources)
-    # =====================
-    {
-        "name": "Retail TouchPoints",
-        "url": "https://retailtouchpoints.com/feed",
-        "category": "retail_media"
-    },
-    {
-        "name": "Tinuiti",
-        "url": "https://tinuiti.com/feed",
-        "category": "retail_media"
-    },
-    {
-        "name": "More About Advertising",
-        "url": "https://moreaboutadvertising.com/feed",
-        "category": "advertising"
-    },
-    {
-        "name": "Adtech Today",
-        "url": "https://adtechtoday.com/feed",
-        "category": "adtech"
-    },
-]
+# --- RELATED ARTICLES (see related.py) ---
+RELATED_COUNT = 5   # "More on this topic" links per article
+RELATED_DAYS = 90   # Only articles this recent are matched against; older ones leave the index
 
 
 # =============================================================
-# PODCAST RSS FEEDS (8 sources)
+# FEED SOURCES — now in sources.py
 # =============================================================
-PODCAST_FEEDS = [
-    # =====================
-    # TIER 1 — Must-Listen for Ad Tech (5 sources)
-    # =====================
-    {
-        "name": "AdExchanger Talks",
-        "url": "https://feeds.megaphone.fm/adexchanger",
-        "category": "programmatic"
-    },
-    {
-        "name": "Marketecture",
-        "url": "https://feeds.megaphone.fm/EAATE3740759293",
-        "category": "adtech"
-    },
-    {
-        "name": "The MadTech Podcast",
-        "url": "https://audioboom.com/channels/4976875.rss",
-        "category": "adtech"
-    },
-    {
-        "name": "Paleo Ad Tech",
-        "url": "https://paleoadtech.com/category/podcast/feed/",
-        "category": "adtech"
-    },
-    {
-        "name": "AdTechGod Pod",
-        "url": "https://feeds.buzzsprout.com/2057436.rss",
-        "category": "adtech"
-    },
+# The feed lists (NEWS_FEEDS, PODCAST_FEEDS, ... ALL_FEEDS) moved to
+# sources.py so web pages don't load them. Older code that still does
+# "from config import ALL_FEEDS" gets them from there, on first use.
+_SOURCE_LISTS = {"NEWS_FEEDS", "PODCAST_FEEDS", "REDDIT_FEEDS", "BLUESKY_FEEDS",
+                 "MASTODON_FEEDS", "HACKERNEWS_FEEDS", "SUBSTACK_FEEDS", "ALL_FEEDS"}
 
-    # =====================
-    # TIER 2 — Niche & Valuable (3 sources)
-    # =====================
-    {
-        "name": "The CTV Podcast",
-        "url": "https://feeds.acast.com/public/shows/the-ctv-podcast",
-        "category": "ctv"
-    },
-    {
-        "name": "Retail Media Breakfast Club",
-        "url": "https://feeds.transistor.fm/retail-media-breakfast-club",
-        "category": "retail_media"
-    },
-    {
-        "name": "The Garage (Albertsons)",
-        "url": "https://feeds.acast.com/public/shows/624489e813888000165b50f5",
-        "category": "retail_media"
-    },
-]
-
-
-# =============================================================
-# SOCIAL / COMMUNITY FEEDS
-# =============================================================
-# These pull from social platforms via RSS.
-# content_type field helps the UI distinguish social posts from articles.
-
-# --- REDDIT ---
-# Native RSS: add .rss to any subreddit URL
-# Using /top/?t=week to get highest-signal posts, not noise
-REDDIT_FEEDS = [
-    {
-        "name": "r/adops",
-        "url": "https://www.reddit.com/r/adops/top/.rss?t=week",
-        "category": "adtech",
-        "content_type": "reddit"
-    },
-    {
-        "name": "r/adtech",
-        "url": "https://www.reddit.com/r/adtech/top/.rss?t=week",
-        "category": "adtech",
-        "content_type": "reddit"
-    },
-    {
-        "name": "r/programmatic",
-        "url": "https://www.reddit.com/r/programmatic/top/.rss?t=week",
-        "category": "programmatic",
-        "content_type": "reddit"
-    },
-    {
-        "name": "r/digital_marketing",
-        "url": "https://www.reddit.com/r/digital_marketing/top/.rss?t=week",
-        "category": "advertising",
-        "content_type": "reddit"
-    },
-    {
-        "name": "r/PPC",
-        "url": "https://www.reddit.com/r/PPC/top/.rss?t=week",
-        "category": "programmatic",
-        "content_type": "reddit"
-    },
-]
 
-# --- BLUESKY ---
-# Method: prepend openrss.org/ to any bsky.app profile URL
-# These are verified Bluesky handles found via search
-BLUESKY_FEEDS = [
-    # --- Publications ---
-    {
-        "name": "AdExchanger (Bluesky)",
-        "url": "https://openrss.org/bsky.app/profile/adexchanger.com",
-        "category": "programmatic",
-        "content_type": "bluesky"
-    },
-    {
-        "name": "AdWeek (Bluesky)",
-        "url": "https://openrss.org/bsky.app/profile/adweek.bsky.social",
-        "category": "advertising",
-        "content_type": "bluesky"
-    },
-    {
-        "name": "PPC Land (Bluesky)",
-        "url": "https://openrss.org/bsky.app/profile/ppc.land",
-        "category": "programmatic",
-        "content_type": "bluesky"
-    },
-
-    # --- Key Voices ---
-    {
-        "name": "Ari Paparo (Bluesky)",
-        "url": "https://openrss.org/bsky.app/profile/aripaparo.com",
-        "category": "adtech",
-        "content_type": "bluesky"
-    },
-    {
-        "name": "AdTechGod (Bluesky)",
-        "url": "https://openrss.org/bsky.app/profile/adtechgod.com",
-        "category": "adtech",
-        "content_type": "bluesky"
-    },
-
-    # --- Digiday Reporters ---
-    {
-        "name": "Kimeko McCoy — Digiday (Bluesky)",
-        "url": "https://openrss.org/bsky.app/profile/kimekom.bsky.social",
-        "category": "media",
-        "content_type": "bluesky"
-    },
-    {
-        "name": "Krystal Scanlon — Digiday (Bluesky)",
-        "url": "https://openrss.org/bsky.app/profile/krystalscanlon.bsky.social",
-        "category": "media",
-        "content_type": "bluesky"
-    },
-]
-
-# --- MASTODON ---
-# Method: append .rss to any Mastodon profile URL
-# Ad tech / privacy / open-web crowd lives here
-MASTODON_FEEDS = [
-    # Add Mastodon profiles as you discover them:
-    # {
-    #     "name": "Person Name (Mastodon)",
-    #     "url": "https://mastodon.social/@username.rss",
-    #     "category": "privacy",
-    #     "content_type": "mastodon"
-    # },
-]
-
-# --- HACKER NEWS ---
-# Filtered by keyword — only ad tech relevant posts
-HACKERNEWS_FEEDS = [
-    {
-        "name": "Hacker News — Ad Tech",
-        "url": "https://hnrss.org/newest?q=adtech+OR+advertising+OR+programmatic",
-        "category": "adtech",
-        "content_type": "hackernews"
-    },
-]
-
-# --- SUBSTACK NEWSLETTERS ---
-# Format: substackname.substack.com/feed
-SUBSTACK_FEEDS = [
-    {
-        "name": "Marketecture Newsletter",
-        "url": "https://marketecture.substack.com/feed",
-        "category": "adtech",
-        "content_type": "substack"
-    },
-    # Add more Substacks as you find them:
-    # {
-    #     "name": "Newsletter Name",
-    #     "url": "https://name.substack.com/feed",
-    #     "category": "adtech",
-    #     "content_type": "substack"
-    # },
-]
-
-
-# =============================================================
-# MASTER FEED LIST — Combine all sources for the feed parser
-# =============================================================
-# The feed parser iterates over this single list.
-# content_type defaults to "news" or "podcast" for legacy feeds.
-ALL_FEEDS = (
-    [dict(f, content_type="news") for f in NEWS_FEEDS]
-    + [dict(f, content_type="podcast") for f in PODCAST_FEEDS]
-    + REDDIT_FEEDS
-    + BLUESKY_FEEDS
-    + MASTODON_FEEDS
-    + HACKERNEWS_FEEDS
-    + SUBSTACK_FEEDS
-)
+def __getattr__(name):
+    if name in _SOURCE_LISTS:
+        import sources
+        return getattr(sources, name)
+    raise AttributeError(f"module 'config' has no attribute {name!r}")
 
 
 # =============================================================
 # CATEGORIES — Topic tags for auto-classification
 # =============================================================
+# Changing keywords? Saved articles get re-tagged automatically (recategorize.py).
 CATEGORIES = {
     "programmatic": {
         "display_name": "Programmatic",
@@ -432,6 +136,36 @@ CATEGORIES = {
 }
 
 
+# =============================================================
+# PROSPECTING — Company tagging and trigger events (private layer)
+# =============================================================
+# The prospect list is a plain text file, one company per line.
+# Aliases go on the same line separated by "|", for example:
+#   The Trade Desk | Trade Desk | TTD
+# Lines starting with # are ignored. The real list stays private
+# (it's in .gitignore) — copy prospects.example.txt to get started.
+PROSPECT_LIST_PATH = "prospects.txt"
+
+# Admin pages (/admin/alerts — saved searches and their alerts) ask for
+# this as the password (any user name). Without it they only work while
+# DEBUG is on, and only from this machine (localhost), i.e. in development.
+ADMIN_TOKEN = os.environ.get("ADTECH_PULSE_ADMIN_TOKEN", "")
+
+# Phrases that flag an article as an outreach trigger.
+# Matching is case-insensitive and on whole words only.
+TRIGGER_KEYWORDS = {
+    "funding": ["raises", "raised", "funding", "funding round", "series a", "series b",
+                "series c", "seed round", "investment", "acquires", "acquisition",
+                "acquired", "merger", "ipo"],
+    "hire": ["hires", "hired", "appoints", "appointed", "names", "named",
+             "joins", "promoted", "promotes", "new ceo", "new cmo", "chief"],
+    "rfp": ["rfp", "request for proposal", "agency review", "media review",
+            "account review", "pitch", "seeking agency"],
+    "launch": ["launches", "launched", "unveils", "introduces", "rolls out",
+               "debuts", "announces", "now available", "new product"],
+}
+
+
 # =============================================================
 # STOP WORDS — Ignore when analyzing trending topics
 # =============================================================
@@ -9,13 +9,43 @@
 # - Each "row" is one article/episode
 # - Each "column" is a piece of info (title, link, date, etc.)
 # - SQL is the language used to talk to the database
+# - READS open their own short-lived connection; WRITES are all handed to
+#   one writer thread (see write() below and db_writer.py)
+# - Months older than ARCHIVE_AFTER_MONTHS move out to read-only files in
+#   partitions/ (see MONTHLY PARTITIONS below); the read functions look
+#   there too, so callers never need to know where an article lives
 
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import shutil
 import sqlite3
-from datetime import datetime
+import urllib.parse
+from datetime import datetime, timedelta
+from config import TRIGGER_KEYWORDS, SQL_PROFILE, ARCHIVE_AFTER_MONTHS
 
 
 # --- DATABASE FILE PATH ---
-DB_PATH = "adtech_pulse.db"
+# ADTECH_PULSE_DB points a run at another file (e.g. a load-test fixture)
+DB_PATH = os.environ.get("ADTECH_PULSE_DB", "adtech_pulse.db")
+
+# --- SCHEMA VERSION ---
+# Bump this whenever init_db() gains a new table, column or index.
+# It's stored inside the database file, so init_db() can tell in one tiny
+# query that everything is already set up and skip the rest.
+SCHEMA_VERSION = 10
+
+
+def connection_class():
+    """sqlite3.Connection, or the timing version when SQL_PROFILE is on."""
+    if SQL_PROFILE:
+        from sql_profiler import ProfiledConnection
+        return ProfiledConnection
+    return sqlite3.Connection
 
 
 def get_connection():
@@ -26,17 +56,215 @@ def get_connection():
     Think of this like opening a spreadsheet file — you need to open it
     before you can read or write data.
     """
-    conn = sqlite3.connect(DB_PATH)
+    # uri=True lets partition files be ATTACHed read-only (see _in_partitions)
+    conn = sqlite3.connect(DB_PATH, factory=connection_class(), uri=True)
     # This line makes query results return as dictionaries instead of tuples
     # So you can access data like row["title"] instead of row[0]
     conn.row_factory = sqlite3.Row
     return conn
 
 
+# ============================================================
+# ARTICLE RECORDS — what the read functions return
+# ============================================================
+
+# Every column of the articles table, in table order
+ARTICLE_COLUMNS = (
+    "id", "title", "link", "description", "source_name", "source_type", "category",
+    "published_date", "fetched_date", "audio_url", "audio_duration",
+    "sentiment_score", "is_trending",
+)
+
+# Templates never show more than this much of a description on a list page
+# (cards cut at 150–300 characters). One extra character is kept so
+# `description|length > 300` still knows whether to add "...".
+PREVIEW_CHARS = 300
+
+# Pages that list articles only need these columns, so that's all we read —
+# the full description, audio URL and sentiment stay in the database.
+LISTING_COLUMNS = (
+    "id, title, link, "
+    f"substr(description, 1, {PREVIEW_CHARS + 1}) AS description, "
+    "source_name, source_type, category, published_date, fetched_date, audio_duration"
+)
+FULL_COLUMNS = ", ".join(ARTICLE_COLUMNS)
+
+
+class Article:
+    """
+    One row from the articles table.
+
+    Much smaller than a dict (no per-row hash table — __slots__ gives each
+    record fixed attribute slots), and it reads both ways:
+        article.title        ← templates
+        article["title"]     ← older code written for dicts
+    Columns a query didn't select simply aren't there (article.get() → None).
+    """
+    __slots__ = ARTICLE_COLUMNS
+
+    def __init__(self, **columns):
+        for name, value in columns.items():
+            setattr(self, name, value)
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name, value):
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return hasattr(self, name)
+
+    def get(self, name, default=None):
+        return getattr(self, name, default) if name in self.__slots__ else default
+
+    def keys(self):
+        return [name for name in self.__slots__ if hasattr(self, name)]
+
+    def __repr__(self):
+        return f"<Article {self.get('id')}: {self.get('title')!r}>"
+
+
+_column_names = {}
+
+
+def article_factory(cursor, row):
+    """sqlite3 row factory that builds Article records straight from each row tuple."""
+    names = _column_names.get(cursor.description)
+    if names is None:
+        names = _column_names[cursor.description] = tuple(d[0] for d in cursor.description)
+    article = Article.__new__(Article)
+    for name, value in zip(names, row):
+        setattr(article, name, value)
+    return article
+
+
+def _article_cursor(conn):
+    cursor = conn.cursor()
+    cursor.row_factory = article_factory
+    return cursor
+
+
+def write(job, *args):
+    """
+    Runs a write job on the single writer thread and waits for its result.
+    
+    ALL writes go through here instead of opening their own connection.
+    SQLite only allows one writer at a time, so letting one thread do every
+    write (see db_writer.py) means "database is locked" can't happen between
+    our own threads — and small writes get committed together, which is faster.
+    
+    Parameters:
+        job (function): takes a cursor first, e.g. job(cursor, *args)
+    """
+    # Imported on first write — most web requests only read
+    from db_writer import get_writer
+    return get_writer(DB_PATH, connection_class()).submit(job, *args).result()
+
+
+# ============================================================
+# MONTHLY PARTITIONS — where older articles live
+# ============================================================
+# The live database file (DB_PATH) takes every write and holds the recent
+# months. Once a month is older than ARCHIVE_AFTER_MONTHS, archive_month()
+# copies its articles (with their search index and prospect tags) into
+# partitions/YYYY-MM.db and removes them from the live file. A partition
+# file is never written again; the partitions table lists them, with the
+# range of article ids each one holds.
+#
+# The read functions below keep their old signatures and route by
+# themselves: they read the live file first and ATTACH a partition only
+# when the ids or dates they need are in it. The homepage, topic pages and
+# article pages for recent stories never open one.
+#
+# A month is the month of its trend bucket (published date, or fetch date
+# when the published date can't be read), so an archived month and its
+# rollups always cover the same articles.
+
+def partition_dir():
+    """partitions/ next to the database file."""
+    return os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "partitions")
+
+
+def _online_partitions(conn, where="", params=()):
+    """Catalog rows of the partitions queries can read (not compressed), newest month first."""
+    return conn.execute(f"""
+        SELECT month, file, min_id, max_id FROM partitions
+        WHERE state = 'online' {where}
+        ORDER BY month DESC
+    """, params).fetchall()
+
+
+def _in_partitions(conn, partitions, query, params, cursor_factory=_article_cursor):
+    """
+    Runs query("part") in each partition in turn and yields its rows.
+
+    Each file is ATTACHed read-only as "part" just for its own query and
+    detached again before the rows are handed over, so however many months
+    are archived, only one is ever attached (SQLite allows ten at a time).
+    """
+    for partition in partitions:
+        path = os.path.join(partition_dir(), partition["file"])
+        # immutable=1: the file never changes, so SQLite skips locking it
+        uri = f"file:{urllib.parse.quote(path)}?mode=ro&immutable=1"
+        conn.execute("ATTACH DATABASE ? AS part", (uri,))
+        try:
+            rows = cursor_factory(conn).execute(query("part"), params).fetchall()
+        finally:
+            conn.execute("DETACH DATABASE part")
+        yield rows
+
+
+def _newest_first(conn, partitions, query, params, rows, limit):
+    """
+    Tops up a newest-first page read from the live file with rows from the
+    partitions (newest month first), only while the page isn't full yet.
+    """
+    if len(rows) >= limit:
+        return rows
+    rows = list(rows)
+    for found in _in_partitions(conn, partitions, query, params):
+        rows += found
+        if len(rows) >= limit:
+            break  # older months can't have anything newer than this one
+    rows.sort(key=lambda row: row["published_date"] or "", reverse=True)
+    return rows[:limit]
+
+
+_NO_END = 2 ** 63 - 1  # past the largest possible id
+
+
+def _next_by_id(conn, query, after_id, end_id, limit, cursor_factory=_article_cursor,
+                archived=True):
+    """
+    The first `limit` rows with after_id < id < end_id, oldest first, from
+    the live file and (unless archived=False) whichever partitions hold ids
+    in that range.
+    query(db) takes (after_id, end_id, limit) and returns rows ordered by id.
+    """
+    end_id = _NO_END if end_id is None else end_id
+    rows = cursor_factory(conn).execute(query("main"), (after_id, end_id, limit)).fetchall()
+    if not archived:
+        return rows
+    partitions = _online_partitions(conn, "AND max_id > ? AND min_id < ?", (after_id, end_id))
+    for partition in sorted(partitions, key=lambda p: p["min_id"]):
+        if len(rows) >= limit and partition["min_id"] > rows[-1]["id"]:
+            break  # every id in this partition (and later ones) comes after the batch
+        found = next(_in_partitions(conn, [partition], query, (after_id, end_id, limit),
+                                    cursor_factory))
+        rows = sorted(rows + found, key=lambda row: row["id"])[:limit]
+    return rows
+
+
 def init_db():
     """
     Creates the database tables if they don't exist yet.
-    Run this once when you first start the app.
+    Safe to run on every startup, from every web worker at once: if the
+    schema is already current it returns almost immediately, and otherwise
+    only the first caller does the work while the others wait their turn.
     
     SQL BREAKDOWN:
     - CREATE TABLE IF NOT EXISTS = make a new table (skip if it already exists)
@@ -48,6 +276,24 @@ def init_db():
     conn = get_connection()
     cursor = conn.cursor()
 
+    # Fast path: the schema is already up to date
+    if cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        conn.close()
+        return
+
+    # --- WAL MODE ---
+    # "Write-Ahead Logging" lets pages keep reading while new articles are
+    # being written. It's saved in the database file, so setting it once is enough.
+    cursor.execute("PRAGMA journal_mode=WAL")
+
+    # Take the write lock before checking again — if several workers start
+    # together, the others wait here and then find the work already done.
+    cursor.execute("BEGIN IMMEDIATE")
+    if cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        conn.rollback()
+        conn.close()
+        return
+
     # --- ARTICLES TABLE ---
     # Stores both news articles AND podcast episodes
     cursor.execute("""
@@ -74,15 +320,288 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_published 
         ON articles(published_date DESC)
     """)
+    # "Latest in a category / of a type" pages filter on one column and sort
+    # by date. With both in one index, SQLite reads the newest matching rows
+    # straight off the index and stops at LIMIT — no sorting step.
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_category_published 
+        ON articles(category, published_date DESC)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_type_published 
+        ON articles(source_type, published_date DESC)
+    """)
+    # The single-column versions they replace (older databases)
+    cursor.execute("DROP INDEX IF EXISTS idx_category")
+    cursor.execute("DROP INDEX IF EXISTS idx_source_type")
+
+    # --- FULL-TEXT SEARCH INDEX ---
+    # LIKE '%privacy%' has to read every article. An FTS5 index maps each
+    # word to the articles containing it, so search only reads the matches.
+    # content='articles' means it doesn't store a second copy of the text;
+    # the triggers keep it in step with the articles table.
+    # (Some SQLite builds lack FTS5 — then search falls back to LIKE.)
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts
+            USING fts5(title, description, content='articles', content_rowid='id')
+        """)
+    except sqlite3.OperationalError:
+        pass
+    else:
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update
+            AFTER UPDATE OF title, description ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO articles_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        # Index the articles that were saved before the search index existed
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 4:
+            cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+    # --- ARTICLE ENTITIES TABLE (prospecting layer) ---
+    # One row per (article, company, trigger) match found at ingest.
+    # trigger_type is '' when the company is mentioned without a trigger event.
+    # published_date is copied from the article so "mentions of X this month"
+    # never has to touch the big articles table to filter by date.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS article_entities (
+            article_id INTEGER NOT NULL,
+            entity TEXT NOT NULL,
+            trigger_type TEXT NOT NULL DEFAULT '',
+            published_date TEXT,
+            PRIMARY KEY (article_id, entity, trigger_type)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entities_entity_date
+        ON article_entities(entity, published_date)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entities_trigger
+        ON article_entities(trigger_type, article_id)
+    """)
+
+    # --- APP STATE TABLE ---
+    # A tiny key/value store for bookmarks like "last exported article id"
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS app_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+
+    # --- MONTHLY PARTITIONS ---
+    # One row per month that has moved out to its own file in partitions/
+    # (see archive_month). min_id/max_id let a lookup by id skip every file
+    # that can't hold it. state is 'online', or 'compressed' while the file
+    # is gzipped (queries skip it until it's restored).
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS partitions (
+            month TEXT PRIMARY KEY,
+            file TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'online',
+            articles INTEGER NOT NULL,
+            min_id INTEGER NOT NULL,
+            max_id INTEGER NOT NULL,
+            archived_at TEXT
+        )
+    """)
+    # The links of archived articles (as 64-bit hashes — see _link_hash), so
+    # a feed that still lists an old story doesn't get it saved a second time
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS archived_links (
+            link_hash INTEGER PRIMARY KEY
+        )
+    """)
+
+    # --- TREND ROLLUPS ---
+    # Article counts per hour and per day, for each category / source.
+    # They're updated as each article is saved, so a trends chart reads a
+    # few hundred small rows instead of counting through every article.
+    # WITHOUT ROWID stores rows in primary key order — bucket first — so a
+    # date range is one contiguous read.
+    for table in ("rollup_hourly", "rollup_daily"):
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket TEXT NOT NULL,
+                category TEXT NOT NULL,
+                source_type TEXT NOT NULL,
+                source_name TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, category, source_type, source_name)
+            ) WITHOUT ROWID
+        """)
+
+    # Databases created before the rollups existed: fill them in once
+    if cursor.execute("PRAGMA user_version").fetchone()[0] < 3:
+        _rebuild_rollups(cursor)
+
+    # --- FEED SNAPSHOTS ---
+    # Every distinct feed body we've downloaded is kept (compressed) in
+    # snapshots/, named by its SHA-256 hash — see snapshots.py. This table
+    # is the history: which body each feed served, and when it first did.
+    # The newest row per feed is that feed's "latest snapshot".
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS feed_snapshots (
+            id INTEGER PRIMARY KEY,
+            feed_url TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            fetched_at TEXT NOT NULL,
+            size INTEGER,
+            source_name TEXT,
+            category TEXT,
+            content_type TEXT,
+            http_content_type TEXT
+        )
+    """)
+    # http_content_type is the response's Content-Type header: some feeds
+    # name their charset only there, and a re-parse needs it to decode the
+    # body the same way. Tables from before it existed get the column here.
+    snapshot_columns = {row[1] for row in cursor.execute("PRAGMA table_info(feed_snapshots)")}
+    if "http_content_type" not in snapshot_columns:
+        cursor.execute("ALTER TABLE feed_snapshots ADD COLUMN http_content_type TEXT")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_snapshots_feed
+        ON feed_snapshots(feed_url, id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_snapshots_fetched
+        ON feed_snapshots(fetched_at)
+    """)
+
+    # --- WEBSUB SUBSCRIPTIONS ---
+    # One row per feed that names a WebSub hub (see websub.py): where to
+    # subscribe, the secret the hub signs pushes with, and the state of our
+    # lease — 'new' → 'pending' (asked) → 'active' (hub confirmed, until
+    # expires_at). callback_id is the random part of our callback URL.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS websub_subscriptions (
+            feed_url TEXT PRIMARY KEY,
+            hub TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            callback_id TEXT UNIQUE NOT NULL,
+            secret TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'new',
+            lease_seconds INTEGER,
+            expires_at TEXT,
+            requested_at TEXT,
+            verified_at TEXT,
+            last_push_at TEXT
+        )
+    """)
+
+    # --- RELATED ARTICLES ---
+    # related.py keeps a TF-IDF "inverted index" of recent articles:
+    # article_terms lists, for each word, the articles that use it and how
+    # much (term frequency); term_stats says in how many articles each word
+    # appears (for the IDF part); term_docs has one row per indexed article.
+    # When an article is saved, its closest matches are worked out once and
+    # stored in related_articles — so an article page is one indexed lookup.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS article_terms (
+            term TEXT NOT NULL,
+            article_id INTEGER NOT NULL,
+            weight REAL NOT NULL,
+            PRIMARY KEY (term, article_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_article_terms_article
+        ON article_terms(article_id)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS term_stats (
+            term TEXT PRIMARY KEY,
+            df INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS term_docs (
+            article_id INTEGER PRIMARY KEY,
+            published_date TEXT,
+            norm REAL NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_term_docs_published
+        ON term_docs(published_date)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS related_articles (
+            article_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            related_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (article_id, rank)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_related_related
+        ON related_articles(related_id)
+    """)
+    # Whenever an article is deleted (e.g. by a retention clean-up), it
+    # leaves the index and every related list with it. (Archiving a month
+    # deletes too, but puts the related lists back — see _archive_month.)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_related_delete AFTER DELETE ON articles BEGIN
+            DELETE FROM related_articles WHERE article_id = old.id OR related_id = old.id;
+            UPDATE term_stats SET df = df - 1
+            WHERE term IN (SELECT term FROM article_terms WHERE article_id = old.id);
+            DELETE FROM article_terms WHERE article_id = old.id;
+            DELETE FROM term_docs WHERE article_id = old.id;
+        END
+    """)
+
+    # --- SAVED SEARCHES & ALERTS ---
+    # Standing queries ("retail media AND (hire OR appoints)") that every new
+    # article is checked against (see alerts.py). Each match is an alert; it
+    # keeps the article's title, link, source and date, so alerts still read
+    # the same after the article moves to a partition or is retired.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS saved_searches (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            query TEXT NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_category 
-        ON articles(category)
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY,
+            search_id INTEGER NOT NULL,
+            article_id INTEGER NOT NULL,
+            title TEXT,
+            link TEXT,
+            source_name TEXT,
+            published_date TEXT,
+            created_at TEXT NOT NULL,
+            UNIQUE (search_id, article_id)
+        )
     """)
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_source_type 
-        ON articles(source_type)
+        CREATE INDEX IF NOT EXISTS idx_alerts_search
+        ON alerts(search_id, id)
     """)
 
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()  # Save changes
     conn.close()   # Close the connection
     print("Database initialized successfully!")
@@ -104,48 +623,82 @@ def save_article(article_data):
                 "category": "privacy",
                 "published_date": "2026-02-16",
                 "audio_url": None,
-                "audio_duration": None
+                "audio_duration": None,
+                "entities": [("The Trade Desk", "launch")]   # optional
             }
+        When the article is new, its database id is written back into
+        article_data["id"] and any "entities" matches are saved with it.
     
     Returns:
         bool: True if saved, False if it already existed
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     try:
-        # INSERT OR IGNORE = try to add it, but if the link already exists, skip it
-        cursor.execute("""
-            INSERT OR IGNORE INTO articles 
-            (title, link, description, source_name, source_type, category, 
-             published_date, fetched_date, audio_url, audio_duration)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            article_data.get("title", ""),
-            article_data.get("link", ""),
-            article_data.get("description", ""),
-            article_data.get("source_name", ""),
-            article_data.get("source_type", "news"),
-            article_data.get("category", "general"),
-            article_data.get("published_date", ""),
-            datetime.now().isoformat(),
-            article_data.get("audio_url"),
-            article_data.get("audio_duration"),
-        ))
-        conn.commit()
-        # rowcount tells us if a row was actually inserted (1) or skipped (0)
-        saved = cursor.rowcount > 0
-        return saved
+        return write(_insert_article, article_data)
 
     except Exception as e:
         print(f"Error saving article: {e}")
         return False
 
-    finally:
-        conn.close()
+
+def save_articles(articles):
+    """
+    Saves a batch of articles in ONE transaction.
+    Same rules as save_article(), but committing once per batch instead of
+    once per article is what makes bulk ingest fast — each commit has to
+    wait for the disk.
+
+    Parameters:
+        articles (list): article_data dicts (see save_article)
+
+    Returns:
+        list: the articles that were actually new (each now has an "id")
+    """
+    return write(_insert_articles, articles)
+
+
+def _insert_articles(cursor, articles):
+    """Write job: inserts a batch of articles, returns the ones that were new."""
+    return [a for a in articles if _insert_article(cursor, a)]
+
+
+def _insert_article(cursor, article_data):
+    """Inserts one article (plus its entity matches and trend counts) using an open cursor."""
+    fetched_date = datetime.now().isoformat()
+    # Already saved once and since archived to a partition file
+    if cursor.execute("SELECT 1 FROM archived_links WHERE link_hash = ?",
+                      (_link_hash(article_data.get("link", "")),)).fetchone():
+        return False
+    # INSERT OR IGNORE = try to add it, but if the link already exists, skip it
+    cursor.execute("""
+        INSERT OR IGNORE INTO articles 
+        (title, link, description, source_name, source_type, category, 
+         published_date, fetched_date, audio_url, audio_duration)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        article_data.get("title", ""),
+        article_data.get("link", ""),
+        article_data.get("description", ""),
+        article_data.get("source_name", ""),
+        article_data.get("source_type", "news"),
+        article_data.get("category", "general"),
+        article_data.get("published_date", ""),
+        fetched_date,
+        article_data.get("audio_url"),
+        article_data.get("audio_duration"),
+    ))
+    # rowcount tells us if a row was actually inserted (1) or skipped (0)
+    saved = cursor.rowcount > 0
+    if saved:
+        article_data["id"] = cursor.lastrowid
+        _insert_entities(
+            cursor, article_data["id"],
+            article_data.get("entities"), article_data.get("published_date", ""),
+        )
+        _bump_rollups(cursor, dict(article_data, fetched_date=fetched_date), 1)
+    return saved
 
 
-def get_latest_articles(limit=20, source_type=None, category=None):
+def get_latest_articles(limit=20, source_type=None, category=None, full=False):
     """
     Gets the most recent articles from the database.
     
@@ -153,90 +706,408 @@ def get_latest_articles(limit=20, source_type=None, category=None):
         limit (int): How many articles to return (default 20)
         source_type (str): Filter by 'news' or 'podcast' (optional)
         category (str): Filter by category like 'privacy' (optional)
+        full (bool): every column and the whole description, instead of
+            just what a list page shows (LISTING_COLUMNS)
     
     Returns:
-        list: A list of article dictionaries
+        list: A list of Article records
     
     SQL BREAKDOWN:
-    - SELECT * = get all columns
+    - SELECT id, title, ... = get only the columns we need
     - FROM articles = from the articles table
     - WHERE = filter conditions
     - ORDER BY = sort results (DESC = newest first)
     - LIMIT = only return this many results
     """
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _article_cursor(conn)
 
     # Build the query dynamically based on filters
-    query = "SELECT * FROM articles WHERE 1=1"
+    # (db is "main" for the live file, "part" for an archived month)
+    filters = ""
     params = []
 
     if source_type:
-        query += " AND source_type = ?"
+        filters += " AND source_type = ?"
         params.append(source_type)
 
     if category:
-        query += " AND category = ?"
+        filters += " AND category = ?"
         params.append(category)
 
-    query += " ORDER BY published_date DESC LIMIT ?"
     params.append(limit)
 
-    cursor.execute(query, params)
-    articles = [dict(row) for row in cursor.fetchall()]
+    def query(db):
+        return (f"SELECT {FULL_COLUMNS if full else LISTING_COLUMNS} FROM {db}.articles "
+                f"WHERE 1=1{filters} ORDER BY published_date DESC LIMIT ?")
+
+    cursor.execute(query("main"), params)
+    # Archived months are only read if the live file can't fill the page
+    articles = _newest_first(conn, _online_partitions(conn), query, params,
+                             cursor.fetchall(), limit)
     conn.close()
     return articles
 
 
 def search_articles(search_term, limit=20):
     """
-    Searches articles by title or description.
+    Searches articles by title or description, newest first.
+    
+    Uses the full-text index (articles_fts): every word typed must appear,
+    and the last one can be the start of a word — "retail med" finds
+    "Retail Media Networks". Only the matching articles are read.
     
-    The LIKE operator with % wildcards means "contains this text anywhere"
-    So '%privacy%' matches "New privacy rules" and "The future of privacy"
+    If this SQLite has no FTS5, falls back to LIKE with % wildcards
+    ("contains this text anywhere"), which reads every article.
+    """
+    words = re.findall(r"\w+", search_term.lower())
+    if not words:
+        return []
+    # Each word quoted, so nothing the user types is read as FTS syntax
+    match = " ".join(f'"{word}"' for word in words) + "*"
+
+    def fts_query(db):
+        return f"""
+            SELECT {LISTING_COLUMNS} FROM {db}.articles
+            WHERE id IN (SELECT rowid FROM {db}.articles_fts WHERE articles_fts MATCH ?)
+            ORDER BY published_date DESC
+            LIMIT ?
+        """
+
+    def like_query(db):
+        return f"""
+            SELECT {LISTING_COLUMNS} FROM {db}.articles 
+            WHERE title LIKE ? OR description LIKE ?
+            ORDER BY published_date DESC 
+            LIMIT ?
+        """
+
+    conn = get_connection()
+    cursor = _article_cursor(conn)
+    query, params = fts_query, (match, limit)
+    try:
+        cursor.execute(query("main"), params)
+    except sqlite3.OperationalError:
+        query, params = like_query, (f"%{search_term}%", f"%{search_term}%", limit)
+        cursor.execute(query("main"), params)
+
+    articles = _newest_first(conn, _online_partitions(conn), query, params,
+                             cursor.fetchall(), limit)
+    conn.close()
+    return articles
+
+
+# Search filters (URL parameter → what it narrows), in the order they're shown
+SEARCH_FACETS = ("category", "type", "source", "week")
+FACET_WEEKS = 12  # Most recent weeks listed in the week facet
+
+
+def _week_of(day):
+    """The Monday of the week a 'YYYY-MM-DD' falls in, as 'YYYY-MM-DD' (None if it isn't a date)."""
+    try:
+        day = datetime.strptime(day, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+    return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+
+
+def faceted_search(search_term, filters=None, limit=30):
+    """
+    Search with counts to narrow it by: how many matches are in each
+    category, source type (news/reddit/podcast), source and week.
+
+    filters maps SEARCH_FACETS names to one value each, e.g.
+    {"category": "privacy", "week": "2026-10-12"}. The results and the total
+    honour all of them; each facet's counts honour all the others, so with
+    one category picked the other categories still show what they'd give.
+
+    ONE PASS: a single GROUP BY over the full-text matches counts them by
+    (category, source type, source, day) — a few thousand groups even for
+    a million matches — and every facet, with or without each filter, is
+    added up from those groups here. Only the page of results is read in full.
+
+    Returns:
+        dict: {"articles": [...], "total": int,
+               "facets": {"category": [(value, count), ...], ...}}
+               (by count, most first; weeks newest first)
     """
+    filters = {name: value for name, value in (filters or {}).items()
+               if name in SEARCH_FACETS and value}
+    if "week" in filters:
+        filters["week"] = _week_of(filters["week"])
+        if filters["week"] is None:
+            del filters["week"]
+    facets = {name: {} for name in SEARCH_FACETS}
+    total = 0
+    words = re.findall(r"\w+", search_term.lower())
+    if not words:
+        return {"articles": [], "total": 0, "facets": {name: [] for name in SEARCH_FACETS}}
+
+    def group_query(matches):
+        return lambda db: f"""
+            SELECT category, source_type, source_name, substr(published_date, 1, 10) AS day,
+                   COUNT(*) AS count
+            FROM {db}.articles WHERE {matches(db)}
+            GROUP BY category, source_type, source_name, day
+        """
+
+    # The page of results: every filter, as plain column conditions
+    conditions, filter_params = [], []
+    for name, column in (("category", "category"), ("type", "source_type"),
+                         ("source", "source_name")):
+        if name in filters:
+            conditions.append(f"{column} = ?")
+            filter_params.append(filters[name])
+    if "week" in filters:
+        next_week = (datetime.strptime(filters["week"], "%Y-%m-%d") + timedelta(days=7))
+        conditions.append("published_date >= ? AND published_date < ?")
+        filter_params += [filters["week"], next_week.strftime("%Y-%m-%d")]
+
+    def page_query(matches):
+        return lambda db: f"""
+            SELECT {LISTING_COLUMNS} FROM {db}.articles
+            WHERE {matches(db)} {"".join(" AND " + c for c in conditions)}
+            ORDER BY published_date DESC
+            LIMIT ?
+        """
+
+    # Each word quoted, so nothing the user types is read as FTS syntax
+    match = " ".join(f'"{word}"' for word in words) + "*"
+    fts = lambda db: f"id IN (SELECT rowid FROM {db}.articles_fts WHERE articles_fts MATCH ?)"
+    like = lambda db: "(title LIKE ? OR description LIKE ?)"
+
     conn = get_connection()
     cursor = conn.cursor()
+    matches, match_params = fts, [match]
+    try:
+        cursor.execute(group_query(matches)("main"), match_params)
+    except sqlite3.OperationalError:
+        # No FTS5: reads every article, like search_articles
+        matches, match_params = like, [f"%{search_term}%"] * 2
+        cursor.execute(group_query(matches)("main"), match_params)
+    groups = cursor.fetchall()
+    partitions = _online_partitions(conn)
+    for found in _in_partitions(conn, partitions, group_query(matches), match_params,
+                                lambda conn: conn.cursor()):
+        groups += found
 
-    cursor.execute("""
-        SELECT * FROM articles 
-        WHERE title LIKE ? OR description LIKE ?
-        ORDER BY published_date DESC 
-        LIMIT ?
-    """, (f"%{search_term}%", f"%{search_term}%", limit))
+    weeks = {}
+    for category, source_type, source_name, day, count in groups:
+        if day not in weeks:
+            weeks[day] = _week_of(day)
+        values = {"category": category, "type": source_type, "source": source_name,
+                  "week": weeks[day]}
+        missed = [name for name, value in filters.items() if values[name] != value]
+        if len(missed) > 1:
+            continue
+        # Matches every filter: counts everywhere. Misses just one: it still
+        # counts for that facet, which is what choosing another value there gives.
+        for name in missed or SEARCH_FACETS:
+            if values[name] is not None:
+                facets[name][values[name]] = facets[name].get(values[name], 0) + count
+        if not missed:
+            total += count
+
+    if "week" in filters:
+        # Older months can only hold that week if it's theirs
+        partitions = [p for p in partitions
+                      if filters["week"][:7] <= p["month"] <= next_week.strftime("%Y-%m")]
+    params = match_params + filter_params + [limit]
+    page = _article_cursor(conn).execute(page_query(matches)("main"), params).fetchall()
+    articles = _newest_first(conn, partitions, page_query(matches), params, page, limit)
+    conn.close()
+
+    ordered = {name: sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+               for name, counts in facets.items()}
+    ordered["week"] = sorted(facets["week"].items(), reverse=True)[:FACET_WEEKS]
+    return {"articles": articles, "total": total, "facets": ordered}
+
+
+def get_article(article_id):
+    """Gets one article (every column) by its id, or None if it doesn't exist."""
+    conn = get_connection()
+    cursor = _article_cursor(conn)
+    cursor.execute(f"SELECT {FULL_COLUMNS} FROM articles WHERE id = ?", (article_id,))
+    article = cursor.fetchone()
+    if article is None:
+        # An archived article: only the partitions whose id range covers it
+        partitions = _online_partitions(conn, "AND min_id <= ? AND max_id >= ?",
+                                        (article_id, article_id))
+        for rows in _in_partitions(conn, partitions,
+                                   lambda db: f"SELECT {FULL_COLUMNS} FROM {db}.articles WHERE id = ?",
+                                   (article_id,)):
+            if rows:
+                article = rows[0]
+                break
+    conn.close()
+    return article
+
+
+def get_articles_in_id_range(start_id, end_id, full=False):
+    """
+    Gets articles with start_id <= id < end_id, oldest first.
+    Used for sitemap shards, archive pages and the static export —
+    a primary-key range, so no scan. Pass full=True for every column.
+    """
+    def query(db):
+        return f"""
+            SELECT {FULL_COLUMNS if full else LISTING_COLUMNS} FROM {db}.articles
+            WHERE id >= ? AND id < ?
+            ORDER BY id
+        """
 
-    articles = [dict(row) for row in cursor.fetchall()]
+    conn = get_connection()
+    cursor = _article_cursor(conn)
+    cursor.execute(query("main"), (start_id, end_id))
+    articles = cursor.fetchall()
+    partitions = _online_partitions(conn, "AND max_id >= ? AND min_id < ?", (start_id, end_id))
+    if partitions:
+        for rows in _in_partitions(conn, partitions, query, (start_id, end_id)):
+            articles += rows
+        articles.sort(key=lambda article: article.id)
     conn.close()
     return articles
 
 
+def iter_articles(after_id=0, end_id=None, full=True, batch_size=1000, archived=True):
+    """
+    Yields articles with after_id < id (< end_id), oldest first, one at a time.
+
+    For jobs that walk the whole table (exports, backfills): rows are read
+    batch_size at a time by id, so memory stays the same whether there are
+    a thousand articles or ten million, and no read stays open between batches.
+    archived=False leaves out the partition files — for jobs that change
+    what they read, since archived articles are read-only.
+    """
+    def query(db):
+        return (f"SELECT {FULL_COLUMNS if full else LISTING_COLUMNS} FROM {db}.articles "
+                f"WHERE id > ? AND id < ? ORDER BY id LIMIT ?")
+
+    conn = get_connection()
+    try:
+        last_id = after_id
+        while True:
+            batch = _next_by_id(conn, query, last_id, end_id, batch_size, archived=archived)
+            if not batch:
+                return
+            yield from batch
+            last_id = batch[-1].id
+    finally:
+        conn.close()
+
+
+def iter_article_batches(after_id=0, batch_size=10000):
+    """
+    Yields every article after after_id, oldest first, as lists of plain
+    rows: the ARTICLE_COLUMNS plus "month" (the YYYY-MM it's counted under
+    in trends and partitions).
+
+    For bulk exports that turn columns into arrays (export_parquet.py):
+    no Article object per row, and columns come out of a batch with zip(*rows).
+    """
+    def query(db):
+        return (f"SELECT {FULL_COLUMNS}, {_MONTH_SQL} AS month FROM {db}.articles "
+                f"WHERE id > ? AND id < ? ORDER BY id LIMIT ?")
+
+    conn = get_connection()
+    try:
+        last_id = after_id
+        while True:
+            batch = _next_by_id(conn, query, last_id, None, batch_size,
+                                cursor_factory=lambda conn: conn.cursor())
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1]["id"]
+    finally:
+        conn.close()
+
+
+def get_max_article_id():
+    """Returns the highest article id (0 for an empty database)."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    # The newest articles can only be archived if nothing newer came in since,
+    # so the catalog's ids count too
+    cursor.execute("""
+        SELECT MAX(COALESCE((SELECT MAX(id) FROM articles), 0),
+                   COALESCE((SELECT MAX(max_id) FROM partitions), 0)) AS max_id
+    """)
+    result = cursor.fetchone()
+    conn.close()
+    return result["max_id"] or 0
+
+
+def get_titles_after_id(after_id, limit=5000):
+    """Returns (id, title) pairs for articles after after_id, oldest first (for suggest.py)."""
+    conn = get_connection()
+    rows = _next_by_id(conn,
+                       lambda db: f"SELECT id, title FROM {db}.articles "
+                                  f"WHERE id > ? AND id < ? ORDER BY id LIMIT ?",
+                       after_id, None, limit, cursor_factory=lambda conn: conn.cursor())
+    conn.close()
+    return [tuple(row) for row in rows]
+
+
 def get_article_count():
-    """Returns the total number of articles in the database."""
+    """Returns the total number of articles (summed from the daily rollups — no table scan)."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) as count FROM articles")
+    cursor.execute("SELECT COALESCE(SUM(count), 0) as count FROM rollup_daily")
     result = cursor.fetchone()
     conn.close()
     return result["count"]
 
 
-def get_articles_by_date_range(start_date, end_date):
+def iter_articles_by_date_range(start_date, end_date, full=False, batch_size=1000):
     """
-    Gets articles within a date range — useful for the trends dashboard.
-    Dates should be in 'YYYY-MM-DD' format.
+    Yields articles within a date range, newest first, without loading the
+    whole range into memory. Dates should be in 'YYYY-MM-DD' format.
+    (For counts over time, use get_trend_series() — it doesn't touch articles.)
+
+    Only the partitions of months inside the range are read. Each one (and
+    the live file) is read a batch at a time, carrying on after the last
+    row it gave, and the streams are merged back into one.
     """
+    def query(db):
+        return f"""
+            SELECT {FULL_COLUMNS if full else LISTING_COLUMNS} FROM {db}.articles 
+            WHERE published_date BETWEEN ? AND ?
+              AND (published_date < ? OR (published_date = ? AND id > ?))
+            ORDER BY published_date DESC, id
+            LIMIT ?
+        """
+
+    def stream(partition):
+        last_date, last_id = "\uffff", 0  # "\uffff" sorts after any date
+        while True:
+            params = (start_date, end_date, last_date, last_date, last_id, batch_size)
+            if partition is None:
+                batch = _article_cursor(conn).execute(query("main"), params).fetchall()
+            else:
+                batch = next(_in_partitions(conn, [partition], query, params))
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            last_date, last_id = batch[-1].published_date, batch[-1].id
+
     conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        partitions = _online_partitions(conn, "AND month BETWEEN ? AND ?",
+                                        (start_date[:7], end_date[:7]))
+        streams = [stream(None)] + [stream(partition) for partition in partitions]
+        yield from heapq.merge(*streams, key=lambda a: (a.published_date, -a.id), reverse=True)
+    finally:
+        conn.close()
 
-    cursor.execute("""
-        SELECT * FROM articles 
-        WHERE published_date BETWEEN ? AND ?
-        ORDER BY published_date DESC
-    """, (start_date, end_date))
 
-    articles = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return articles
+def get_articles_by_date_range(start_date, end_date):
+    """
+    Gets articles within a date range as a list. Prefer iter_articles_by_date_range
+    for big ranges — or, for analysis over months or years, the Parquet files
+    export_parquet.py writes.
+    """
+    return list(iter_articles_by_date_range(start_date, end_date))
 
 
 def get_category_counts():
@@ -245,15 +1116,19 @@ def get_category_counts():
     Useful for the sidebar/navigation showing article counts.
     
     GROUP BY = groups rows with the same category together
-    COUNT(*) = counts how many are in each group
+    SUM(count) = adds up the daily counts in each group
+    
+    Reads the daily rollup table (one row per day/category/source) instead
+    of counting through every article on each page view.
     """
     conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
-        SELECT category, COUNT(*) as count 
-        FROM articles 
+        SELECT category, SUM(count) as count 
+        FROM rollup_daily 
         GROUP BY category 
+        HAVING count > 0
         ORDER BY count DESC
     """)
 
@@ -263,17 +1138,1193 @@ def get_category_counts():
 
 
 def get_source_counts():
-    """Returns how many articles came from each source."""
+    """Returns how many articles came from each source (from the daily rollups)."""
     conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
-        SELECT source_name, COUNT(*) as count 
-        FROM articles 
+        SELECT source_name, SUM(count) as count 
+        FROM rollup_daily 
         GROUP BY source_name 
+        HAVING count > 0
         ORDER BY count DESC
     """)
 
     counts = {row["source_name"]: row["count"] for row in cursor.fetchall()}
     conn.close()
     return counts
+
+
+# ============================================================
+# PROSPECTING — company mentions and trigger events
+# ============================================================
+
+def _insert_entities(cursor, article_id, entities, published_date):
+    """Writes (entity, trigger_type) matches for one article using an open cursor."""
+    if not entities:
+        return
+    cursor.executemany("""
+        INSERT OR IGNORE INTO article_entities
+        (article_id, entity, trigger_type, published_date)
+        VALUES (?, ?, ?, ?)
+    """, [(article_id, entity, trigger or "", published_date)
+          for entity, trigger in entities])
+
+
+def replace_article_entities(matches_by_article):
+    """
+    Replaces the entity rows for a batch of articles in one transaction.
+    Used by the backfill, so re-running it after editing the prospect
+    list drops stale matches instead of piling up duplicates.
+
+    Parameters:
+        matches_by_article (list): (article_id, published_date, entities) tuples
+    """
+    write(_replace_entities, matches_by_article)
+
+
+def _replace_entities(cursor, matches_by_article):
+    """Write job for replace_article_entities()."""
+    cursor.executemany(
+        "DELETE FROM article_entities WHERE article_id = ?",
+        [(article_id,) for article_id, _, _ in matches_by_article],
+    )
+    for article_id, published_date, entities in matches_by_article:
+        _insert_entities(cursor, article_id, entities, published_date)
+
+
+def get_articles_after_id(last_id, limit=500, archived=True):
+    """
+    Returns the next batch of articles with id > last_id, oldest first.
+    Walking the table by id (instead of OFFSET) keeps every batch an index lookup.
+    archived=False: only articles in the live file (see iter_articles).
+    """
+    conn = get_connection()
+    articles = _next_by_id(conn,
+                           lambda db: f"SELECT {FULL_COLUMNS} FROM {db}.articles "
+                                      f"WHERE id > ? AND id < ? ORDER BY id LIMIT ?",
+                           last_id, None, limit, archived=archived)
+    conn.close()
+    return articles
+
+
+def get_entity_mentions(entity, since_date=None, limit=100):
+    """
+    Gets articles that mention a company, newest first.
+    Uses idx_entities_entity_date, so it only reads that company's rows.
+
+    Example: get_entity_mentions("The Trade Desk", since_date="2026-10-01")
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    since = " AND e.published_date >= ?" if since_date else ""
+    params = [entity] + ([since_date] if since_date else []) + [limit]
+
+    def query(db):
+        return f"""
+            SELECT a.*, GROUP_CONCAT(NULLIF(e.trigger_type, '')) AS triggers
+            FROM {db}.article_entities e
+            JOIN {db}.articles a ON a.id = e.article_id
+            WHERE e.entity = ?{since}
+            GROUP BY e.article_id ORDER BY e.published_date DESC LIMIT ?
+        """
+
+    cursor.execute(query("main"), params)
+    rows = cursor.fetchall()
+    if len(rows) < limit:
+        # Archived months from since_date on, newest first
+        partitions = (_online_partitions(conn, "AND month >= ?", (since_date[:7],))
+                      if since_date else _online_partitions(conn))
+        for found in _in_partitions(conn, partitions, query, params,
+                                    cursor_factory=lambda conn: conn.cursor()):
+            rows += found
+            if len(rows) >= limit:
+                break
+        rows.sort(key=lambda row: row["published_date"] or "", reverse=True)
+    articles = [dict(row) for row in rows[:limit]]
+    conn.close()
+    return articles
+
+
+def get_trigger_events_since(last_article_id, trigger_types=None):
+    """
+    Gets trigger events (funding, hire, rfp, launch...) for articles newer
+    than last_article_id. Article ids only go up, so the id of the last
+    exported article works as a bookmark for "new since last export".
+
+    Returns:
+        list: dicts with article_id, entity, trigger_type, published_date,
+              title, link and source_name — oldest first
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    trigger_types = list(trigger_types or TRIGGER_KEYWORDS)
+    placeholders = ", ".join("?" for _ in trigger_types)
+
+    # trigger_type IN (...) AND article_id > ? is a range scan per trigger
+    # on idx_entities_trigger
+    def query(db):
+        return f"""
+            SELECT e.article_id, e.entity, e.trigger_type, e.published_date,
+                   a.title, a.link, a.source_name
+            FROM {db}.article_entities e
+            JOIN {db}.articles a ON a.id = e.article_id
+            WHERE e.trigger_type IN ({placeholders}) AND e.article_id > ?
+            ORDER BY e.article_id
+        """
+
+    params = trigger_types + [last_article_id]
+    cursor.execute(query("main"), params)
+    rows = cursor.fetchall()
+    partitions = _online_partitions(conn, "AND max_id > ?", (last_article_id,))
+    if partitions:
+        for found in _in_partitions(conn, partitions, query, params,
+                                    cursor_factory=lambda conn: conn.cursor()):
+            rows += found
+        rows.sort(key=lambda row: row["article_id"])
+
+    events = [dict(row) for row in rows]
+    conn.close()
+    return events
+
+
+def get_state(key, default=None):
+    """Reads a value from the app_state key/value table."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT value FROM app_state WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    conn.close()
+    return row["value"] if row else default
+
+
+def set_state(key, value):
+    """Writes a value to the app_state key/value table."""
+    write(_set_state, key, value)
+
+
+def _set_state(cursor, key, value):
+    """Write job for set_state()."""
+    cursor.execute("""
+        INSERT INTO app_state (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    """, (key, str(value)))
+
+
+# ============================================================
+# FEED SNAPSHOTS — raw feed history (files live in snapshots/)
+# ============================================================
+
+def record_snapshots(snapshots):
+    """
+    Adds feed bodies to the history, in one transaction.
+
+    Parameters:
+        snapshots (list): dicts with feed_url, sha256, size, source_name,
+            category, content_type, and http_content_type (the response's
+            Content-Type header, or None)
+    """
+    write(_record_snapshots, snapshots, datetime.now().isoformat(timespec="seconds"))
+
+
+def _record_snapshots(cursor, snapshots, fetched_at):
+    """Write job for record_snapshots()."""
+    cursor.executemany("""
+        INSERT INTO feed_snapshots
+        (feed_url, sha256, fetched_at, size, source_name, category, content_type,
+         http_content_type)
+        VALUES (:feed_url, :sha256, :fetched_at, :size, :source_name, :category, :content_type,
+                :http_content_type)
+    """, [dict({"http_content_type": None}, **snapshot, fetched_at=fetched_at)
+          for snapshot in snapshots])
+
+
+def get_latest_snapshot_hashes():
+    """Returns {feed_url: sha256 of its latest snapshot}."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT feed_url, sha256 FROM feed_snapshots
+        WHERE id IN (SELECT MAX(id) FROM feed_snapshots GROUP BY feed_url)
+    """)
+    hashes = {row["feed_url"]: row["sha256"] for row in cursor.fetchall()}
+    conn.close()
+    return hashes
+
+
+def get_snapshots(since=None, until=None, feed_url=None):
+    """
+    Snapshot history rows, oldest first.
+
+    Parameters:
+        since, until (str): 'YYYY-MM-DD' (or full timestamps), both optional
+        feed_url (str): only this feed
+    """
+    query = "SELECT * FROM feed_snapshots WHERE 1=1"
+    params = []
+    if since:
+        query += " AND fetched_at >= ?"
+        params.append(since)
+    if until:
+        query += " AND fetched_at < ?"
+        params.append(until)
+    if feed_url:
+        query += " AND feed_url = ?"
+        params.append(feed_url)
+    query += " ORDER BY id"
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    snapshots = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return snapshots
+
+
+# ============================================================
+# WEBSUB SUBSCRIPTIONS — feeds that push (see websub.py)
+# ============================================================
+
+# Columns websub.py may change on a subscription
+_WEBSUB_COLUMNS = ("state", "lease_seconds", "expires_at", "requested_at", "verified_at",
+                   "last_push_at")
+
+
+def record_websub_hubs(hubs):
+    """
+    Remembers the hubs found while parsing feeds, in one transaction.
+    A feed seen before keeps its subscription — unless its hub or topic
+    changed, which starts it over as 'new'.
+
+    Parameters:
+        hubs (list): dicts with feed_url, hub, topic, callback_id, secret
+            (callback_id and secret are only used for feeds not seen before)
+    """
+    if hubs:
+        write(_record_websub_hubs, hubs)
+
+
+def _record_websub_hubs(cursor, hubs):
+    """Write job for record_websub_hubs()."""
+    cursor.executemany("""
+        INSERT INTO websub_subscriptions (feed_url, hub, topic, callback_id, secret)
+        VALUES (:feed_url, :hub, :topic, :callback_id, :secret)
+        ON CONFLICT(feed_url) DO UPDATE SET
+            hub = excluded.hub, topic = excluded.topic, state = 'new',
+            expires_at = NULL, requested_at = NULL
+        WHERE hub != excluded.hub OR topic != excluded.topic
+    """, hubs)
+
+
+def get_websub_subscriptions():
+    """Every known subscription, as dicts."""
+    conn = get_connection()
+    rows = [dict(row) for row in conn.execute("SELECT * FROM websub_subscriptions")]
+    conn.close()
+    return rows
+
+
+def get_websub_subscription(callback_id):
+    """The subscription a callback URL belongs to (a dict), or None."""
+    conn = get_connection()
+    row = conn.execute("SELECT * FROM websub_subscriptions WHERE callback_id = ?",
+                       (callback_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def update_websub_subscription(feed_url, **changes):
+    """Sets _WEBSUB_COLUMNS of one subscription, e.g. state="active"."""
+    write(_update_websub_subscription, feed_url, changes)
+
+
+def _update_websub_subscription(cursor, feed_url, changes):
+    """Write job for update_websub_subscription()."""
+    unknown = set(changes) - set(_WEBSUB_COLUMNS)
+    if unknown:
+        raise ValueError(f"can't update websub columns {sorted(unknown)}")
+    assignments = ", ".join(f"{column} = ?" for column in changes)
+    cursor.execute(f"UPDATE websub_subscriptions SET {assignments} WHERE feed_url = ?",
+                   (*changes.values(), feed_url))
+
+
+def delete_websub_subscription(feed_url):
+    """Forgets a subscription (after unsubscribing)."""
+    write(_delete_websub_subscription, feed_url)
+
+
+def _delete_websub_subscription(cursor, feed_url):
+    """Write job for delete_websub_subscription()."""
+    cursor.execute("DELETE FROM websub_subscriptions WHERE feed_url = ?", (feed_url,))
+
+
+# ============================================================
+# SAVED SEARCHES & ALERTS — standing queries (see alerts.py)
+# ============================================================
+
+def add_saved_search(name, query):
+    """Saves a standing query. Returns its id."""
+    return write(_add_saved_search, name, query)
+
+
+def _add_saved_search(cursor, name, query):
+    """Write job for add_saved_search()."""
+    now = datetime.now().isoformat()
+    cursor.execute("""
+        INSERT INTO saved_searches (name, query, created_at, updated_at) VALUES (?, ?, ?, ?)
+    """, (name, query, now, now))
+    return cursor.lastrowid
+
+
+def set_saved_search_active(search_id, active):
+    """Pauses (False) or resumes (True) a saved search. Returns whether it exists."""
+    return write(_set_saved_search_active, search_id, active)
+
+
+def _set_saved_search_active(cursor, search_id, active):
+    """Write job for set_saved_search_active()."""
+    cursor.execute("UPDATE saved_searches SET active = ?, updated_at = ? WHERE id = ?",
+                   (int(bool(active)), datetime.now().isoformat(), search_id))
+    return cursor.rowcount > 0
+
+
+def delete_saved_search(search_id):
+    """Deletes a saved search and its alerts. Returns whether it existed."""
+    return write(_delete_saved_search, search_id)
+
+
+def _delete_saved_search(cursor, search_id):
+    """Write job for delete_saved_search()."""
+    cursor.execute("DELETE FROM alerts WHERE search_id = ?", (search_id,))
+    cursor.execute("DELETE FROM saved_searches WHERE id = ?", (search_id,))
+    return cursor.rowcount > 0
+
+
+def get_saved_searches():
+    """
+    Every saved search as a dict, oldest first, with how many alerts it has
+    raised (alerts) and when it last did (last_alert_at).
+    """
+    conn = get_connection()
+    rows = conn.execute("""
+        SELECT s.*, COUNT(a.id) AS alerts, MAX(a.created_at) AS last_alert_at
+        FROM saved_searches s LEFT JOIN alerts a ON a.search_id = s.id
+        GROUP BY s.id
+        ORDER BY s.id
+    """).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def get_active_saved_searches():
+    """The saved searches new articles are checked against: dicts with id, name and query."""
+    conn = get_connection()
+    rows = conn.execute("SELECT id, name, query FROM saved_searches WHERE active = 1 ORDER BY id")
+    searches = [dict(row) for row in rows]
+    conn.close()
+    return searches
+
+
+def record_alerts(alerts):
+    """
+    Stores matches between saved searches and articles, in one transaction.
+    A match already recorded is skipped.
+
+    Parameters:
+        alerts (list): dicts with search_id, article_id, title, link,
+            source_name, published_date
+
+    Returns:
+        int: how many were new
+    """
+    return write(_record_alerts, alerts) if alerts else 0
+
+
+def _record_alerts(cursor, alerts):
+    """Write job for record_alerts()."""
+    before = cursor.connection.total_changes
+    now = datetime.now().isoformat()
+    cursor.executemany("""
+        INSERT OR IGNORE INTO alerts (search_id, article_id, title, link, source_name,
+                                      published_date, created_at)
+        VALUES (:search_id, :article_id, :title, :link, :source_name, :published_date, :now)
+    """, [dict(alert, now=now) for alert in alerts])
+    return cursor.connection.total_changes - before
+
+
+def get_alerts(search_id=None, after_id=0, limit=100, newest_first=True):
+    """
+    Alerts as dicts, with the saved search's name (search_name).
+
+    Newest first for the admin page; oldest first (newest_first=False) with
+    after_id to walk them for an export, the way get_articles_after_id does.
+    """
+    conn = get_connection()
+    rows = conn.execute(f"""
+        SELECT a.*, s.name AS search_name
+        FROM alerts a JOIN saved_searches s ON s.id = a.search_id
+        WHERE a.id > ? {"AND a.search_id = ?" if search_id else ""}
+        ORDER BY a.id {"DESC" if newest_first else ""}
+        LIMIT ?
+    """, (after_id, search_id, limit) if search_id else (after_id, limit)).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+# ============================================================
+# RE-ENRICHMENT — update saved articles from a fresh parse
+# ============================================================
+
+def reenrich_articles(articles):
+    """
+    Updates already-saved articles with freshly parsed values (description,
+    category, published date, prospect matches) and saves the ones we never
+    had. Rollups and the search index are kept in step.
+
+    Parameters:
+        articles (list): article_data dicts, as parse_feed_body() makes them
+
+    Archived articles are read-only: they're counted, not changed.
+
+    Returns:
+        dict: {"inserted": n, "updated": n, "unchanged": n, "archived": n,
+               "moved": {(old_category, new_category): n}}
+    """
+    return write(_reenrich_articles, articles)
+
+
+def _reenrich_articles(cursor, articles):
+    """Write job for reenrich_articles()."""
+    report = {"inserted": 0, "updated": 0, "unchanged": 0, "archived": 0, "moved": {}}
+    for article in articles:
+        old = _article_for_update(cursor, "link", article.get("link", ""))
+        if old is None:
+            # Not in the live file: new, unless it's in a partition by now
+            if _insert_article(cursor, article):
+                report["inserted"] += 1
+            else:
+                report["archived"] += 1
+            continue
+
+        new = dict(old,
+                   description=article.get("description", old["description"]),
+                   category=article.get("category", old["category"]),
+                   published_date=article.get("published_date", old["published_date"]))
+        if "entities" in article:
+            cursor.execute("DELETE FROM article_entities WHERE article_id = ?", (old["id"],))
+            _insert_entities(cursor, old["id"], article["entities"], new["published_date"])
+
+        if new == old:
+            report["unchanged"] += 1
+            continue
+        _update_article(cursor, old, new)
+        report["updated"] += 1
+        if new["category"] != old["category"]:
+            key = (old["category"], new["category"])
+            report["moved"][key] = report["moved"].get(key, 0) + 1
+    return report
+
+
+# What _update_article() needs to know about an article
+_UPDATE_COLUMNS = ("id", "description", "source_name", "source_type", "category",
+                   "published_date", "fetched_date")
+
+
+def _article_for_update(cursor, column, value):
+    """The _UPDATE_COLUMNS of the article whose id or link is value, as a dict (or None)."""
+    cursor.execute(f"SELECT {', '.join(_UPDATE_COLUMNS)} FROM articles WHERE {column} = ?",
+                   (value,))
+    row = cursor.fetchone()
+    return dict(zip(_UPDATE_COLUMNS, row)) if row else None
+
+
+def _update_article(cursor, old, new):
+    """
+    Writes changed description/category/published_date for one article and
+    moves its count in the rollups if its category or hour changed.
+    old/new are dicts with those columns plus id, source_name, source_type, fetched_date.
+    """
+    cursor.execute("""
+        UPDATE articles SET description = ?, category = ?, published_date = ?
+        WHERE id = ?
+    """, (new["description"], new["category"], new["published_date"], old["id"]))
+    if new["category"] != old["category"] or hour_bucket(new) != hour_bucket(old):
+        _bump_rollups(cursor, old, -1)
+        _bump_rollups(cursor, new, 1)
+
+
+def recategorize_articles(changes, checkpoint_key=None, checkpoint=None):
+    """
+    Moves articles to new categories (rollups follow) in one transaction.
+
+    If checkpoint_key is given, the checkpoint dict is saved under it in
+    app_state in the SAME transaction, with this batch's moves added to its
+    "moved" counts — so after a crash the saved progress and the articles
+    always agree, and no move is counted twice.
+
+    Parameters:
+        changes (list): (article_id, new_category) pairs
+        checkpoint_key (str): app_state key for the checkpoint, optional
+        checkpoint (dict): progress to save, e.g. {"last_id": 5000, "moved": {}}
+
+    Returns:
+        dict: {"old → new": n} for this batch
+    """
+    return write(_recategorize_articles, changes, checkpoint_key, checkpoint)
+
+
+def _recategorize_articles(cursor, changes, checkpoint_key, checkpoint):
+    """Write job for recategorize_articles()."""
+    moved = {}
+    for article_id, category in changes:
+        old = _article_for_update(cursor, "id", article_id)
+        if old is None or old["category"] == category:
+            continue  # deleted, or already moved since it was read
+        _update_article(cursor, old, dict(old, category=category))
+        key = f"{old['category']} → {category}"
+        moved[key] = moved.get(key, 0) + 1
+
+    if checkpoint_key:
+        total = checkpoint.setdefault("moved", {})
+        for key, count in moved.items():
+            total[key] = total.get(key, 0) + count
+        _set_state(cursor, checkpoint_key, json.dumps(checkpoint))
+    return moved
+
+
+# ============================================================
+# RELATED ARTICLES — TF-IDF index + precomputed neighbors (see related.py)
+# ============================================================
+
+def index_related_articles(docs, top_k=5, min_score=0.1, query_terms=12, max_df_share=0.05):
+    """
+    Adds articles to the TF-IDF index and stores each one's closest matches.
+    Also offers each new article to its matches' own lists, so older
+    articles pick up newer related stories too. One transaction.
+
+    Parameters:
+        docs (list): dicts with id, published_date and terms ({word: term frequency})
+        top_k (int): related articles kept per article
+        min_score (float): lowest cosine similarity that counts as related
+        query_terms (int): how many of an article's most telling words are looked up
+        max_df_share (float): words in more than this share of articles aren't
+            looked up (they say little and have huge postings lists)
+
+    Returns:
+        int: how many articles were indexed (already indexed ones are skipped)
+    """
+    return write(_index_related_articles, docs, top_k, min_score, query_terms, max_df_share)
+
+
+def _index_related_articles(cursor, docs, top_k, min_score, query_terms, max_df_share):
+    """Write job for index_related_articles()."""
+    total = cursor.execute("SELECT COUNT(*) FROM term_docs").fetchone()[0]
+    indexed = 0
+    for doc in docs:
+        terms = doc["terms"]
+        if not terms or cursor.execute("SELECT 1 FROM term_docs WHERE article_id = ?",
+                                       (doc["id"],)).fetchone():
+            continue
+        total += 1
+        cursor.execute(f"SELECT term, df FROM term_stats WHERE term IN ({', '.join('?' * len(terms))})",
+                       list(terms))
+        df = dict(cursor.fetchall())
+        idf = {term: math.log((total + 1) / (df.get(term, 0) + 1)) + 1 for term in terms}
+        norm = math.sqrt(sum((tf * idf[term]) ** 2 for term, tf in terms.items()))
+
+        # Cosine similarity: sum over shared words of (tf·idf here) × (tf·idf there),
+        # divided by both lengths. Postings store tf only, so idf² goes on our side.
+        max_df = max(50, int(total * max_df_share))
+        lookup = sorted((term for term in terms if 0 < df.get(term, 0) <= max_df),
+                        key=lambda term: terms[term] * idf[term], reverse=True)[:query_terms]
+        neighbors = []
+        if lookup:
+            cursor.execute(f"""
+                WITH q(term, w) AS (VALUES {', '.join(['(?, ?)'] * len(lookup))})
+                SELECT p.article_id, SUM(p.weight * q.w) / d.norm AS score
+                FROM q
+                JOIN article_terms p ON p.term = q.term
+                JOIN term_docs d ON d.article_id = p.article_id
+                GROUP BY p.article_id
+                ORDER BY score DESC
+                LIMIT ?
+            """, [v for term in lookup for v in (term, terms[term] * idf[term] ** 2)] + [top_k])
+            neighbors = [(related_id, score / norm) for related_id, score in cursor.fetchall()
+                         if score / norm >= min_score]
+
+        cursor.executemany("INSERT INTO article_terms (term, article_id, weight) VALUES (?, ?, ?)",
+                           [(term, doc["id"], tf) for term, tf in terms.items()])
+        cursor.executemany("""
+            INSERT INTO term_stats (term, df) VALUES (?, 1)
+            ON CONFLICT(term) DO UPDATE SET df = df + 1
+        """, [(term,) for term in terms])
+        cursor.execute("INSERT INTO term_docs (article_id, published_date, norm) VALUES (?, ?, ?)",
+                       (doc["id"], doc.get("published_date"), norm))
+
+        _store_related(cursor, doc["id"], neighbors)
+        for related_id, score in neighbors:
+            _offer_related(cursor, related_id, doc["id"], score, top_k)
+        indexed += 1
+    return indexed
+
+
+def _store_related(cursor, article_id, neighbors):
+    """Replaces an article's related list with neighbors [(related_id, score)], best first."""
+    cursor.execute("DELETE FROM related_articles WHERE article_id = ?", (article_id,))
+    cursor.executemany("""
+        INSERT INTO related_articles (article_id, rank, related_id, score) VALUES (?, ?, ?, ?)
+    """, [(article_id, rank, related_id, score)
+          for rank, (related_id, score) in enumerate(neighbors, 1)])
+
+
+def _offer_related(cursor, article_id, candidate_id, score, top_k):
+    """Adds candidate_id to an article's related list if it beats what's there."""
+    cursor.execute("""
+        SELECT related_id, score FROM related_articles WHERE article_id = ? ORDER BY rank
+    """, (article_id,))
+    current = cursor.fetchall()
+    if len(current) >= top_k and score <= current[-1][1]:
+        return
+    merged = sorted(current + [(candidate_id, score)], key=lambda pair: -pair[1])[:top_k]
+    _store_related(cursor, article_id, merged)
+
+
+def prune_related_index(before_date, limit=2000):
+    """
+    Takes up to `limit` articles published before before_date out of the
+    TF-IDF index, so it only holds recent articles. Their related lists stay
+    (the pages still show them); they just aren't suggested for new articles.
+
+    Returns:
+        int: how many were removed — call again until it's 0
+    """
+    return write(_prune_related_index, before_date, limit)
+
+
+def _prune_related_index(cursor, before_date, limit):
+    """Write job for prune_related_index()."""
+    cursor.execute("SELECT article_id FROM term_docs WHERE published_date < ? LIMIT ?",
+                   (before_date, limit))
+    ids = [row[0] for row in cursor.fetchall()]
+    if not ids:
+        return 0
+    marks = ", ".join("?" * len(ids))
+    cursor.execute(f"""
+        SELECT term, COUNT(*) FROM article_terms WHERE article_id IN ({marks}) GROUP BY term
+    """, ids)
+    cursor.executemany("UPDATE term_stats SET df = df - ? WHERE term = ?",
+                       [(count, term) for term, count in cursor.fetchall()])
+    cursor.execute("DELETE FROM term_stats WHERE df <= 0")
+    cursor.execute(f"DELETE FROM article_terms WHERE article_id IN ({marks})", ids)
+    cursor.execute(f"DELETE FROM term_docs WHERE article_id IN ({marks})", ids)
+    return len(ids)
+
+
+def clear_related_index():
+    """Empties the TF-IDF index and every related list (before a rebuild)."""
+    write(_clear_related_index)
+
+
+def _clear_related_index(cursor):
+    """Write job for clear_related_index()."""
+    for table in ("related_articles", "article_terms", "term_stats", "term_docs"):
+        cursor.execute(f"DELETE FROM {table}")
+
+
+def get_related_articles(article_id, limit=5):
+    """
+    The articles stored as related to this one, best match first (listing
+    columns). Related lists outlive archiving, so ids missing from the live
+    file are looked up in the partitions; retired ones are skipped.
+    """
+    conn = get_connection()
+    ranked = [row[0] for row in conn.execute("""
+        SELECT related_id FROM related_articles WHERE article_id = ? ORDER BY rank
+    """, (article_id,))]
+    if not ranked:
+        conn.close()
+        return []
+
+    marks = ", ".join("?" * len(ranked))
+    query = lambda db: f"SELECT {LISTING_COLUMNS} FROM {db}.articles WHERE id IN ({marks})"
+    found = {article["id"]: article
+             for article in _article_cursor(conn).execute(query("main"), ranked)}
+    missing = [related_id for related_id in ranked if related_id not in found]
+    if missing:
+        partitions = _online_partitions(conn, "AND min_id <= ? AND max_id >= ?",
+                                        (max(missing), min(missing)))
+        for rows in _in_partitions(conn, partitions, query, ranked):
+            found.update((article["id"], article) for article in rows)
+    conn.close()
+    return [found[related_id] for related_id in ranked if related_id in found][:limit]
+
+
+def iter_related_ids():
+    """Yields (article_id, 'id,id,...') for every article with related links, in id order."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT article_id, group_concat(related_id) FROM (
+                SELECT article_id, related_id FROM related_articles ORDER BY article_id, rank
+            )
+            GROUP BY article_id
+            ORDER BY article_id
+        """)
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            yield from (tuple(row) for row in rows)
+    finally:
+        conn.close()
+
+
+# ============================================================
+# TRENDS — hourly/daily rollups for the dashboard
+# ============================================================
+
+# Dates we store look like "2026-02-16 14:05:00". Some feeds give us
+# something unparseable instead; those are counted under the time we fetched them.
+_BUCKETABLE_DATE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}")
+
+# The same rule in SQL, for rebuilding the rollups from the articles table
+_HOUR_BUCKET_SQL = """
+    CASE WHEN published_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]*'
+         THEN substr(published_date, 1, 13)
+         ELSE replace(substr(fetched_date, 1, 13), 'T', ' ') END
+"""
+
+# Columns a trend series can be split by
+TREND_GROUPS = ("category", "source_type", "source_name")
+TREND_MAX_DAYS = 3660     # Longest range a trend series may cover (~10 years)
+TREND_HOURLY_DAYS = 31    # Longer ranges are counted per day, even if hours were asked for
+
+
+def hour_bucket(article):
+    """'2026-02-16 14:05:00' → '2026-02-16 14' (daily bucket = first 10 characters)"""
+    published = article.get("published_date") or ""
+    if _BUCKETABLE_DATE.match(published):
+        return published[:13]
+    return (article.get("fetched_date") or datetime.now().isoformat())[:13].replace("T", " ")
+
+
+def _bump_rollups(cursor, article, delta):
+    """Adds delta (+1 when saved, -1 when removed) to the article's hour and day buckets."""
+    hour = hour_bucket(article)
+    key = (article.get("category") or "general", article.get("source_type") or "news",
+           article.get("source_name") or "")
+    for table, bucket in (("rollup_hourly", hour), ("rollup_daily", hour[:10])):
+        cursor.execute(f"""
+            INSERT INTO {table} (bucket, category, source_type, source_name, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(bucket, category, source_type, source_name)
+            DO UPDATE SET count = count + excluded.count
+        """, (bucket, *key, delta))
+
+
+def _rebuild_rollups(cursor):
+    """
+    Recounts both rollup tables from scratch (one pass over articles).
+    Archived months keep the counts they have — their articles aren't in
+    this file to be counted.
+    """
+    archived = "substr(bucket, 1, 7) IN (SELECT month FROM partitions)"
+    cursor.execute(f"DELETE FROM rollup_hourly WHERE NOT {archived}")
+    cursor.execute(f"DELETE FROM rollup_daily WHERE NOT {archived}")
+    cursor.execute(f"""
+        INSERT INTO rollup_hourly (bucket, category, source_type, source_name, count)
+        SELECT bucket, category, source_type, source_name, count FROM (
+            SELECT {_HOUR_BUCKET_SQL} AS bucket, COALESCE(category, 'general') AS category,
+                   COALESCE(source_type, 'news') AS source_type,
+                   COALESCE(source_name, '') AS source_name, COUNT(*) AS count
+            FROM articles GROUP BY 1, 2, 3, 4
+        ) WHERE NOT {archived}
+    """)
+    cursor.execute(f"""
+        INSERT INTO rollup_daily (bucket, category, source_type, source_name, count)
+        SELECT substr(bucket, 1, 10), category, source_type, source_name, SUM(count)
+        FROM rollup_hourly WHERE NOT {archived} GROUP BY 1, 2, 3, 4
+    """)
+
+
+def rebuild_rollups():
+    """Recounts the trend rollups — only needed if articles were changed by hand."""
+    write(_rebuild_rollups)
+
+
+def get_trend_series(start_date, end_date, group_by="category", granularity="auto",
+                     category=None, source_type=None, max_points=120):
+    """
+    Article counts over time, ready for a Chart.js line chart.
+
+    Parameters:
+        start_date, end_date (str): 'YYYY-MM-DD' (both included)
+        group_by (str): one line per 'category', 'source_type' or 'source_name'
+        granularity (str): 'hour', 'day', or 'auto' (hours for ranges up to 3 days).
+            Ranges over TREND_HOURLY_DAYS are always counted per day.
+        category, source_type (str): optional filters
+        max_points (int): long ranges are merged into fewer, wider buckets
+
+    Returns:
+        dict: {"labels": [...], "series": {"privacy": [3, 0, 5, ...], ...},
+               "granularity": "day", "bucket_size": 1}
+        Every series has one number per label, zeros included.
+    Raises:
+        ValueError: unknown group_by, unreadable dates, or a range that's
+            backwards or longer than TREND_MAX_DAYS
+    """
+    if group_by not in TREND_GROUPS:
+        raise ValueError(f"group_by must be one of {TREND_GROUPS}")
+
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    span_days = (end - start).days + 1
+    if not 1 <= span_days <= TREND_MAX_DAYS:
+        raise ValueError(f"the range must be 1 to {TREND_MAX_DAYS} days")
+    if granularity == "auto":
+        granularity = "hour" if span_days <= 4 else "day"
+    elif granularity == "hour" and span_days > TREND_HOURLY_DAYS:
+        granularity = "day"
+
+    if granularity == "hour":
+        table, step, fmt = "rollup_hourly", timedelta(hours=1), "%Y-%m-%d %H"
+        end = end + timedelta(hours=23)
+    else:
+        table, step, fmt = "rollup_daily", timedelta(days=1), "%Y-%m-%d"
+
+    # Downsample: every `size` steps are merged into one bucket so charts stay
+    # readable. A row's bucket is worked out from its time, so only the
+    # merged buckets are ever listed.
+    steps = (end - start) // step + 1
+    size = max(1, -(-steps // max_points)) if max_points else 1
+    labels = [(start + i * size * step).strftime(fmt) for i in range(-(-steps // size))]
+    positions = {}
+
+    def position(bucket):
+        if bucket not in positions:
+            positions[bucket] = (datetime.strptime(bucket, fmt) - start) // step // size
+        return positions[bucket]
+
+    query = f"""
+        SELECT bucket, {group_by} AS name, SUM(count) AS count
+        FROM {table}
+        WHERE bucket BETWEEN ? AND ?
+    """
+    params = [start.strftime(fmt), end.strftime(fmt)]
+    if category:
+        query += " AND category = ?"
+        params.append(category)
+    if source_type:
+        query += " AND source_type = ?"
+        params.append(source_type)
+    query += " GROUP BY bucket, name"
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    series = {}
+    for row in cursor.fetchall():
+        values = series.setdefault(row["name"], [0] * len(labels))
+        values[position(row["bucket"])] += row["count"]
+    conn.close()
+
+    return {"labels": labels, "series": series, "granularity": granularity, "bucket_size": size}
+
+
+# ============================================================
+# PARTITION FILES — archiving, retiring and compressing months
+# ============================================================
+
+# The month an article belongs to: the first 7 characters of its trend bucket
+_MONTH_SQL = f"substr({_HOUR_BUCKET_SQL}, 1, 7)"
+
+
+def _link_hash(link):
+    """A link as a signed 64-bit integer, for archived_links."""
+    return int.from_bytes(hashlib.sha1(link.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+def _create_partition_schema(cursor):
+    """The tables and indexes of a partition file — the article-reading half of init_db()."""
+    cursor.execute("""
+        CREATE TABLE articles (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            link TEXT UNIQUE NOT NULL,
+            description TEXT,
+            source_name TEXT,
+            source_type TEXT DEFAULT 'news',
+            category TEXT DEFAULT 'general',
+            published_date TEXT,
+            fetched_date TEXT,
+            audio_url TEXT,
+            audio_duration TEXT,
+            sentiment_score REAL DEFAULT 0.0,
+            is_trending INTEGER DEFAULT 0
+        )
+    """)
+    cursor.execute("CREATE INDEX idx_published ON articles(published_date DESC)")
+    cursor.execute("CREATE INDEX idx_category_published ON articles(category, published_date DESC)")
+    cursor.execute("CREATE INDEX idx_type_published ON articles(source_type, published_date DESC)")
+    cursor.execute("""
+        CREATE TABLE article_entities (
+            article_id INTEGER NOT NULL,
+            entity TEXT NOT NULL,
+            trigger_type TEXT NOT NULL DEFAULT '',
+            published_date TEXT,
+            PRIMARY KEY (article_id, entity, trigger_type)
+        )
+    """)
+    cursor.execute("CREATE INDEX idx_entities_entity_date ON article_entities(entity, published_date)")
+    cursor.execute("CREATE INDEX idx_entities_trigger ON article_entities(trigger_type, article_id)")
+
+
+ARCHIVE_ATTEMPTS = 3  # Copies of a month made before giving up (see archive_month)
+
+
+def _month_fingerprint(cursor, month):
+    """
+    A hash of everything archive_month() copies for a month — its articles
+    and their prospect tags — plus the (id, link) pairs. The same month
+    gives the same hash in the live file and in its partition copy.
+    """
+    digest = hashlib.sha256()
+    rows = []
+    for row in cursor.execute(f"""
+        SELECT {FULL_COLUMNS} FROM articles WHERE {_MONTH_SQL} = ? ORDER BY id
+    """, (month,)):
+        digest.update(repr(tuple(row)).encode("utf-8"))
+        rows.append((row["id"], row["link"]))
+    for row in cursor.execute(f"""
+        SELECT * FROM article_entities WHERE article_id IN (
+            SELECT id FROM articles WHERE {_MONTH_SQL} = ?
+        ) ORDER BY article_id, entity, trigger_type
+    """, (month,)):
+        digest.update(repr(tuple(row)).encode("utf-8"))
+    return digest.hexdigest(), rows
+
+
+def archive_month(month):
+    """
+    Moves one month ('2026-03') out of the live database into
+    partitions/2026-03.db.
+
+    1. The month's articles and prospect tags are copied into a new file
+       (with its own search index), which is then made read-only and
+       renamed into place — a crash never leaves half a partition.
+    2. One write transaction checks the month hasn't changed since the copy,
+       removes it from the live file, records its links in archived_links
+       and adds the month to the partitions table. Until that commits,
+       readers see the month in the live file as before.
+
+    The copy is made outside the writer, so a write can land in between
+    (recategorize.py, a snapshots.py reparse). Then the copy is stale: it's
+    thrown away and made again, up to ARCHIVE_ATTEMPTS times.
+
+    Trend rollups are left alone: archived articles still count.
+    Step 2 is one transaction so no reader ever sees the month twice or not
+    at all; for a busy month it holds the writer for a few seconds.
+    Returns the number of articles archived (0 if none, or already archived).
+    """
+    conn = get_connection()
+    done = conn.execute("SELECT 1 FROM partitions WHERE month = ?", (month,)).fetchone()
+    conn.close()
+    if done:
+        return 0
+
+    os.makedirs(partition_dir(), exist_ok=True)
+    file_name = f"{month}.db"
+    path = os.path.join(partition_dir(), file_name)
+    for _ in range(ARCHIVE_ATTEMPTS):
+        fingerprint, rows = _copy_month(month, path + ".tmp")
+        if not rows:
+            os.unlink(path + ".tmp")
+            return 0
+        os.chmod(path + ".tmp", 0o444)
+        os.replace(path + ".tmp", path)
+        if write(_archive_month, month, file_name, fingerprint, rows):
+            return len(rows)
+        os.chmod(path, 0o644)  # changed meanwhile: copy it again
+        os.unlink(path)
+    raise RuntimeError(f"{month} kept changing while it was being archived; try again later")
+
+
+def _copy_month(month, tmp_path):
+    """Step 1 of archive_month(). Returns the month's _month_fingerprint() in the copy."""
+    if os.path.exists(tmp_path):
+        if not os.access(tmp_path, os.W_OK):
+            os.chmod(tmp_path, 0o644)
+        os.unlink(tmp_path)  # left over from a run that crashed
+
+    part = sqlite3.connect(tmp_path)
+    part.row_factory = sqlite3.Row
+    try:
+        cursor = part.cursor()
+        _create_partition_schema(cursor)
+        cursor.execute("ATTACH DATABASE ? AS live", (DB_PATH,))
+        # A scan of the live file — but it only holds the last few months,
+        # and this runs once a month
+        cursor.execute(f"""
+            INSERT INTO main.articles SELECT {FULL_COLUMNS} FROM live.articles
+            WHERE {_MONTH_SQL} = ?
+        """, (month,))
+        cursor.execute("""
+            INSERT INTO main.article_entities SELECT * FROM live.article_entities
+            WHERE article_id IN (SELECT id FROM main.articles)
+        """)
+        part.commit()
+        cursor.execute("DETACH DATABASE live")
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE articles_fts
+                USING fts5(title, description, content='articles', content_rowid='id')
+            """)
+            cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            pass  # no FTS5: search falls back to LIKE here too
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        part.commit()
+        return _month_fingerprint(cursor, month)
+    finally:
+        part.close()
+
+
+def _archive_month(cursor, month, file_name, fingerprint, rows):
+    """
+    Write job for archive_month(): rows are the (id, link) pairs now in the
+    partition file. Returns False, changing nothing, if the live month no
+    longer matches the copy's fingerprint.
+    """
+    if _month_fingerprint(cursor, month)[0] != fingerprint:
+        return False
+    # Related lists to and from these articles stay: archived pages still
+    # show theirs (get_related_articles looks in the partitions). The delete
+    # trigger would take them out along with the TF-IDF index entries.
+    related = cursor.execute(f"""
+        SELECT article_id, rank, related_id, score FROM related_articles
+        WHERE article_id IN (SELECT id FROM articles WHERE {_MONTH_SQL} = ?)
+           OR related_id IN (SELECT id FROM articles WHERE {_MONTH_SQL} = ?)
+    """, (month, month)).fetchall()
+    ids = [(article_id,) for article_id, _ in rows]
+    cursor.executemany("DELETE FROM article_entities WHERE article_id = ?", ids)
+    cursor.executemany("DELETE FROM articles WHERE id = ?", ids)
+    cursor.executemany("""
+        INSERT OR IGNORE INTO related_articles (article_id, rank, related_id, score)
+        VALUES (?, ?, ?, ?)
+    """, [tuple(row) for row in related])
+    cursor.executemany("INSERT OR IGNORE INTO archived_links (link_hash) VALUES (?)",
+                       [(_link_hash(link),) for _, link in rows])
+    cursor.execute("""
+        INSERT INTO partitions (month, file, state, articles, min_id, max_id, archived_at)
+        VALUES (?, ?, 'online', ?, ?, ?, ?)
+    """, (month, file_name, len(rows), rows[0][0], rows[-1][0], datetime.now().isoformat()))
+    return True
+
+
+def archive_old_months(keep_months=ARCHIVE_AFTER_MONTHS):
+    """
+    Archives every month older than the last keep_months (the current month
+    never counts as old). Cheap when there's nothing to do — the months are
+    read from the daily rollups.
+
+    Returns:
+        dict: {month: articles archived}
+    """
+    today = datetime.now()
+    months_back = today.year * 12 + today.month - 1 - keep_months
+    cutoff = f"{months_back // 12:04d}-{months_back % 12 + 1:02d}"
+    conn = get_connection()
+    months = [row[0] for row in conn.execute("""
+        SELECT DISTINCT substr(bucket, 1, 7) FROM rollup_daily
+        WHERE bucket < ? AND count > 0
+          AND substr(bucket, 1, 7) NOT IN (SELECT month FROM partitions)
+        ORDER BY 1
+    """, (cutoff,))]
+    conn.close()
+    return {month: archive_month(month) for month in months}
+
+
+def list_partitions():
+    """Every archived month, oldest first, as dicts (the partitions table)."""
+    conn = get_connection()
+    rows = [dict(row) for row in conn.execute("SELECT * FROM partitions ORDER BY month")]
+    conn.close()
+    return rows
+
+
+def _get_partition(month):
+    conn = get_connection()
+    row = conn.execute("SELECT * FROM partitions WHERE month = ?", (month,)).fetchone()
+    conn.close()
+    if row is None:
+        raise ValueError(f"{month} is not an archived month")
+    return dict(row)
+
+
+def retire_month(month):
+    """
+    Deletes an archived month for good: its file goes, and its trend
+    counts (plus any late arrivals for it still in the live file) with it.
+    Returns the number of articles the file held.
+    """
+    partition = _get_partition(month)
+    write(_retire_month, month)
+    os.unlink(os.path.join(partition_dir(), partition["file"]))
+    return partition["articles"]
+
+
+def _retire_month(cursor, month):
+    """Write job for retire_month()."""
+    for table in ("rollup_hourly", "rollup_daily"):
+        cursor.execute(f"DELETE FROM {table} WHERE bucket >= ? AND bucket < ?",
+                       (month, month + "~"))
+    # Articles saved after the month was archived (a feed that was late)
+    cursor.execute(f"SELECT id FROM articles WHERE {_MONTH_SQL} = ?", (month,))
+    ids = [(row[0],) for row in cursor.fetchall()]
+    cursor.executemany("DELETE FROM article_entities WHERE article_id = ?", ids)
+    cursor.executemany("DELETE FROM articles WHERE id = ?", ids)
+    cursor.execute("DELETE FROM partitions WHERE month = ?", (month,))
+
+
+def _set_partition_file(cursor, month, file_name, state):
+    """Write job: points a month's catalog row at another file."""
+    cursor.execute("UPDATE partitions SET file = ?, state = ? WHERE month = ?",
+                   (file_name, state, month))
+
+
+def compress_month(month):
+    """
+    Gzips an archived month's file (usually to a third of its size or less).
+    Its articles drop out of every page and search until restore_month();
+    counts and trend charts still include them. Returns the new file size.
+    """
+    partition = _get_partition(month)
+    if partition["state"] == "compressed":
+        return os.path.getsize(os.path.join(partition_dir(), partition["file"]))
+    path = os.path.join(partition_dir(), partition["file"])
+    gz_path = path + ".gz"
+    with open(path, "rb") as src, gzip.open(gz_path + ".tmp", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(gz_path + ".tmp", gz_path)
+    # Readers stop opening the .db before it's deleted
+    write(_set_partition_file, month, partition["file"] + ".gz", "compressed")
+    os.unlink(path)
+    return os.path.getsize(gz_path)
+
+
+def restore_month(month):
+    """Un-gzips a compressed month so queries read it again."""
+    partition = _get_partition(month)
+    if partition["state"] != "compressed":
+        return
+    gz_path = os.path.join(partition_dir(), partition["file"])
+    path = gz_path[:-len(".gz")]
+    with gzip.open(gz_path, "rb") as src, open(path + ".tmp", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.chmod(path + ".tmp", 0o444)
+    os.replace(path + ".tmp", path)
+    write(_set_partition_file, month, os.path.basename(path), "online")
+    os.unlink(gz_path)
@@ -0,0 +1,176 @@
+# db_writer.py — One thread that does ALL the database writing
+# ==============================================================
+# SQLite lets many connections READ at once, but only ONE can WRITE at a time.
+# When ingestion, the /refresh route and backfill jobs each open their own
+# connection and write whenever they like, they trip over each other and
+# SQLite answers with "database is locked".
+#
+# The fix is to stop competing: every write is handed to a single writer
+# thread that owns the only write connection. Other code puts a small
+# "write job" on a queue and gets back a Future — a ticket it can wait on
+# for the job's result (or its error).
+#
+# GROUP COMMIT:
+# Committing is the slow part of a write (SQLite waits for the disk).
+# So the writer grabs every job that's waiting in line (up to a limit, and
+# for at most a few milliseconds) and commits them together in ONE
+# transaction. Each job runs inside its own SAVEPOINT, so a job that fails
+# is rolled back on its own without spoiling the rest of the group.
+#
+# Reads don't go through here — with WAL mode turned on (see init_db),
+# readers keep using their own connections and never wait for the writer.
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+
+# --- WRITER SETTINGS ---
+MAX_BATCH = 256        # Most jobs committed in one transaction
+MAX_LATENCY = 0.01     # Most seconds spent gathering one group before committing
+QUEUE_SIZE = 10000     # Jobs waiting in line before producers have to wait
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """
+    Owns the single write connection and runs write jobs from a queue.
+
+    A write job is a function that takes a cursor as its first argument:
+
+        def _mark_trending(cursor, article_id):
+            cursor.execute("UPDATE articles SET is_trending = 1 WHERE id = ?", (article_id,))
+
+        future = writer.submit(_mark_trending, 42)
+        future.result()   # waits until it's committed
+    """
+
+    def __init__(self, db_path, max_batch=MAX_BATCH, max_latency=MAX_LATENCY,
+                 factory=sqlite3.Connection):
+        self.db_path = db_path
+        self.factory = factory  # connection class (sql_profiler swaps in a timed one)
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.jobs = queue.Queue(maxsize=QUEUE_SIZE)
+        self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queues a write job and returns a Future for its result."""
+        future = Future()
+        self.jobs.put((future, fn, args, kwargs))
+        return future
+
+    def stop(self):
+        """Finishes the jobs already queued, then closes the connection."""
+        if self.thread.is_alive():
+            self.jobs.put(_STOP)
+            self.thread.join()
+
+    def _connect(self):
+        # isolation_level=None means "don't start transactions for me" —
+        # the writer runs BEGIN/COMMIT itself so it controls the grouping.
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False,
+                               factory=self.factory)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, much faster commits
+        conn.execute("PRAGMA busy_timeout=30000")  # other processes may still write
+        return conn
+
+    def _next_group(self):
+        """
+        Waits for one job, then takes every job that's already waiting —
+        up to MAX_BATCH, and for no longer than MAX_LATENCY. Jobs that arrive
+        while a group is committing simply pile up and form the next group,
+        so busy periods get big groups and quiet periods aren't delayed at all.
+        """
+        group = [self.jobs.get()]
+        if group[0] is _STOP:
+            return group
+
+        deadline = time.monotonic() + self.max_latency
+        while len(group) < self.max_batch and time.monotonic() < deadline:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            group.append(job)
+            if job is _STOP:
+                break
+        return group
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                group = self._next_group()
+                stopping = group[-1] is _STOP
+                jobs = [job for job in group if job is not _STOP]
+                if jobs:
+                    self._commit_group(conn, jobs)
+                if stopping:
+                    return
+        finally:
+            conn.close()
+
+    def _commit_group(self, conn, jobs):
+        """Runs a group of jobs in one transaction, one SAVEPOINT per job."""
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, fn, args, kwargs in jobs:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT job")
+                try:
+                    outcomes.append((future, fn(conn.cursor(), *args, **kwargs), None))
+                    conn.execute("RELEASE job")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    outcomes.append((future, None, e))
+            conn.execute("COMMIT")
+
+        except Exception as e:
+            # The transaction itself failed (disk full, locked by another process...)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, _, _, _ in jobs:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Only report results once they're safely committed
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# --- THE SHARED WRITER ---
+# One writer per database file per process, started the first time it's needed.
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path, factory=sqlite3.Connection):
+    """Returns the running DatabaseWriter for db_path, starting it if needed."""
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None or not writer.thread.is_alive():
+            writer = DatabaseWriter(db_path, factory=factory)
+            _writers[db_path] = writer
+        return writer
+
+
+@atexit.register
+def stop_writers():
+    """Flushes queued writes when the program exits."""
+    for writer in list(_writers.values()):
+        writer.stop()
@@ -0,0 +1,261 @@
+# export_parquet.py — The article archive as Parquet files, for analysis
+# =======================================================================
+# Pulling years of articles into pandas through database.py builds a Python
+# object per row and takes minutes. This writes them out once as Parquet —
+# a columnar file format pandas, polars, DuckDB and Spark all read directly:
+#
+#   analytics/articles/month=2026-09/part-0000412345.parquet
+#   analytics/articles/month=2026-10/part-0000468001.parquet
+#   analytics/articles/_export.json      ← how far we got (last article id)
+#
+# COLUMNAR: each column is stored on its own, compressed (zstd), so reading
+# just category and published (column pruning) skips the titles and
+# descriptions entirely.
+#
+# DICTIONARY-ENCODED: category, source_type and source_name have a few
+# dozen distinct values across millions of rows. They're stored once per
+# file, plus a small integer per row — and load as pandas categoricals.
+#
+# TIME-PARTITIONED: one folder per month (the same month trends and
+# partitions.py use), so "last quarter" only opens three folders.
+#
+# INCREMENTAL: each run appends only articles saved since the last one
+# (new part files; existing files are never rewritten). A month that has
+# collected COMPACT_AFTER part files is merged back into one. Rows are read
+# and written CHUNK_ROWS at a time, so memory stays flat however big the
+# archive is.
+#
+# Existing rows aren't updated: after recategorize.py or retiring a month,
+# run with --full to write everything again. Compressed months
+# (partitions.py compress) are skipped until restored.
+#
+# Needs pyarrow (pip install pyarrow — optional, only for this script).
+#
+# TO RUN (from the project folder; e.g. after every fetch, or nightly):
+#   python export_parquet.py              # append new articles
+#   python export_parquet.py --full       # start over
+#   python export_parquet.py --out /data/adtech
+#
+# THEN, in pandas:
+#   pd.read_parquet("analytics/articles", columns=["published", "category"],
+#                   filters=[("month", ">=", "2026-01")])
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+try:
+    import pyarrow as pa  # optional: pip install pyarrow
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from database import init_db, iter_article_batches
+
+
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics", "articles")
+STATE_FILE = "_export.json"   # Readers skip files starting with "_"
+FORMAT_VERSION = 1            # Bump when the columns change: the next run starts over
+CHUNK_ROWS = 20000            # Articles read and converted at a time
+MAX_OPEN_FILES = 16           # Months written to at once (an old month reopens as a new part)
+COMPACT_AFTER = 8             # Merge a month's part files once it has this many
+COMPRESSION = "zstd"
+
+# Columns with few distinct values, stored as dictionaries
+DICTIONARY_COLUMNS = ["category", "source_type", "source_name"]
+
+
+def schema():
+    text = pa.string()
+    codes = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.int64()),
+        ("published", pa.timestamp("s")),
+        ("fetched", pa.timestamp("s")),
+        ("category", codes),
+        ("source_type", codes),
+        ("source_name", codes),
+        ("title", text),
+        ("link", text),
+        ("description", text),
+        ("audio_duration", text),
+        ("sentiment_score", pa.float64()),
+        ("is_trending", pa.bool_()),
+    ])
+
+
+def _timestamps(values):
+    """'2026-09-18 08:55:55' or '2026-09-18T09:49:55.123' → timestamps (null if unreadable)."""
+    text = pc.utf8_slice_codeunits(pa.array(values, pa.string()), 0, 19)
+    text = pc.replace_substring(text, "T", " ")
+    return pc.strptime(text, format="%Y-%m-%d %H:%M:%S", unit="s", error_is_null=True)
+
+
+def to_table(rows):
+    """One batch of rows from iter_article_batches() → (Arrow table, month of each row)."""
+    columns = dict(zip(rows[0].keys(), zip(*rows)))
+    arrays = [
+        pa.array(columns["id"], pa.int64()),
+        _timestamps(columns["published_date"]),
+        _timestamps(columns["fetched_date"]),
+        *(pa.array(columns[name], pa.string()).dictionary_encode() for name in DICTIONARY_COLUMNS),
+        pa.array(columns["title"], pa.string()),
+        pa.array(columns["link"], pa.string()),
+        pa.array(columns["description"], pa.string()),
+        pa.array([None if d is None else str(d) for d in columns["audio_duration"]], pa.string()),
+        pa.array(columns["sentiment_score"], pa.float64()),
+        pa.array([None if t is None else bool(t) for t in columns["is_trending"]], pa.bool_()),
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema()), pa.array(columns["month"], pa.string())
+
+
+class PartWriters:
+    """
+    One open Parquet file per month being written. Files are written as
+    .tmp and only get their real names in commit(), so a run that dies
+    leaves nothing a reader would pick up.
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.open = {}      # month → (writer, tmp path); oldest-used first
+        self.written = []   # tmp paths, closed or not
+
+    def write(self, month, table):
+        if month in self.open:
+            self.open[month] = self.open.pop(month)  # now the most recently used
+        else:
+            if len(self.open) >= MAX_OPEN_FILES:
+                oldest = next(iter(self.open))
+                self.open.pop(oldest)[0].close()
+            folder = os.path.join(self.out_dir, f"month={month}")
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"part-{table['id'][0].as_py():010d}.parquet.tmp")
+            writer = pq.ParquetWriter(path, schema(), compression=COMPRESSION,
+                                      use_dictionary=DICTIONARY_COLUMNS)
+            self.open[month] = (writer, path)
+            self.written.append(path)
+        self.open[month][0].write_table(table)
+
+    def close(self):
+        for writer, _ in self.open.values():
+            writer.close()
+        self.open.clear()
+
+    def commit(self):
+        """Closes every file and gives it its real name. Returns the month folders touched."""
+        self.close()
+        for path in self.written:
+            os.replace(path, path[:-len(".tmp")])
+        return {os.path.dirname(path) for path in self.written}
+
+
+def read_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, STATE_FILE)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("format") == FORMAT_VERSION else None
+
+
+def write_state(out_dir, last_id, rows):
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"format": FORMAT_VERSION, "last_id": last_id, "rows": rows,
+                   "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, f)
+    os.replace(path + ".tmp", path)
+
+
+def clear(out_dir):
+    """Deletes a previous export (only our own files — out_dir may hold others)."""
+    if not os.path.isdir(out_dir):
+        return
+    for name in os.listdir(out_dir):
+        if name.startswith("month="):
+            shutil.rmtree(os.path.join(out_dir, name))
+    if os.path.exists(os.path.join(out_dir, STATE_FILE)):
+        os.remove(os.path.join(out_dir, STATE_FILE))
+
+
+def remove_leftovers(out_dir):
+    """Deletes .tmp files from a run that didn't finish."""
+    for folder, _, files in os.walk(out_dir):
+        for name in files:
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(folder, name))
+
+
+def compact(folder):
+    """Merges a month's part files into one, a row group at a time."""
+    parts = sorted(name for name in os.listdir(folder) if name.endswith(".parquet"))
+    if len(parts) < 2:
+        return
+    merged = os.path.join(folder, parts[0] + ".tmp")
+    with pq.ParquetWriter(merged, schema(), compression=COMPRESSION,
+                          use_dictionary=DICTIONARY_COLUMNS) as writer:
+        for name in parts:
+            part = pq.ParquetFile(os.path.join(folder, name))
+            for group in range(part.num_row_groups):
+                writer.write_table(part.read_row_group(group).cast(schema()))
+    os.replace(merged, os.path.join(folder, parts[0]))
+    for name in parts[1:]:
+        os.remove(os.path.join(folder, name))
+
+
+def export(out_dir=EXPORT_DIR, full=False):
+    """
+    Appends every article saved since the last export to out_dir.
+
+    Returns:
+        dict: rows written this run and in total, and the last article id
+    """
+    state = None if full else read_state(out_dir)
+    if state is None:
+        clear(out_dir)  # --full, or nothing (readable) there yet: start over
+    os.makedirs(out_dir, exist_ok=True)
+    remove_leftovers(out_dir)
+
+    last_id = state["last_id"] if state else 0
+    total = state["rows"] if state else 0
+    written = 0
+    writers = PartWriters(out_dir)
+    try:
+        for rows in iter_article_batches(last_id, batch_size=CHUNK_ROWS):
+            table, months = to_table(rows)
+            for month in pc.unique(months).to_pylist():
+                writers.write(month or "unknown", table.filter(pc.equal(months, month)))
+            written += len(rows)
+            last_id = rows[-1]["id"]
+    except BaseException:
+        writers.close()
+        remove_leftovers(out_dir)
+        raise
+
+    for folder in writers.commit():
+        if sum(name.endswith(".parquet") for name in os.listdir(folder)) >= COMPACT_AFTER:
+            compact(folder)
+    write_state(out_dir, last_id, total + written)
+    return {"written": written, "total": total + written, "last_id": last_id}
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export articles as Parquet for analysis")
+    parser.add_argument("--out", default=EXPORT_DIR, help="output folder")
+    parser.add_argument("--full", action="store_true", help="start over instead of appending")
+    args = parser.parse_args()
+
+    if pa is None:
+        print("Parquet export needs pyarrow: pip install pyarrow")
+        sys.exit(1)
+
+    init_db()
+    started = time.time()
+    result = export(args.out, full=args.full)
+    print(f"Exported {result['written']} new articles in {time.time() - started:.1f}s "
+          f"({result['total']} in {args.out}, up to id {result['last_id']})")
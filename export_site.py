@@ -0,0 +1,351 @@
+# export_site.py — Export the whole site as plain files (no Flask needed to host it)
+# ===================================================================================
+# Free static hosts and CDNs (GitHub Pages, Netlify, Cloudflare Pages...) can
+# serve plain HTML files to any number of visitors for nothing. This script
+# renders every page with the same templates the live site uses and writes
+# them into site/:
+#
+#   site/index.html                      ← /
+#   site/category/<name>/index.html      ← /category/<name>  (+ feed.xml, atom.xml)
+#   site/podcasts/index.html, site/about/index.html, site/search/index.html
+#   site/archive/index.html              ← /archive  (the newest page)
+#   site/archive/<n>/index.html          ← /archive/<n>
+#   site/article/<id>/index.html         ← /article/<id>
+#   site/search-index/...                ← small JSON files for in-browser search
+#   site/assets/, site/static/           ← CSS/JS
+#
+# INCREMENTAL:
+# A manifest (site/.export-manifest.json) remembers, for every page, a
+# fingerprint of the database rows it shows and a hash of the HTML we wrote.
+# On the next run, pages whose rows haven't changed aren't rendered at all,
+# and pages that render to the same HTML aren't rewritten — so after an
+# ingest only the homepage, a few topic pages, the newest archive page and
+# the new article pages get touched.
+#
+# Article and archive pages are rendered in parallel, one process per core.
+#
+# TO RUN (from the project folder):
+#   python export_site.py                 # incremental
+#   python export_site.py --full          # ignore the manifest, rebuild everything
+#   python export_site.py --out public --workers 4
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import request
+from app import app, ARCHIVE_PAGE_SIZE
+from assets import DIST_DIR
+from config import APP_NAME, APP_TAGLINE, CATEGORIES, STOP_WORDS
+from database import (iter_articles, get_articles_in_id_range, get_category_counts,
+                      get_related_articles, iter_related_ids)
+from outbound import OUTPUT_DIR, generated_path, write_atomic
+
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPORT_DIR = os.path.join(PROJECT_DIR, "site")
+MANIFEST_NAME = ".export-manifest.json"
+
+SCAN_BATCH = 2000          # Articles read from the database at a time
+RENDER_CHUNK = 500         # Pages handed to a worker process at a time
+SEARCH_POSTINGS = 500      # Newest matching articles kept per search word
+SEARCH_DOC_BLOCK = 1000    # Articles per search-index/docs/<n>.json file
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Lets templates leave out what only works on the live site (e.g. /refresh)
+app.jinja_env.globals["static_site"] = True
+
+
+def page_file(url):
+    """/category/privacy → category/privacy/index.html"""
+    return os.path.join(url.strip("/"), "index.html") if url != "/" else "index.html"
+
+
+def fingerprint(*parts):
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def row_fingerprint(article):
+    """Everything an article page or archive card shows about one row."""
+    return fingerprint(article["title"], article["description"], article["category"],
+                       article["source_name"], article["source_type"],
+                       article["published_date"], article["link"], article["audio_duration"])
+
+
+# ============================================================
+# RENDERING
+# ============================================================
+
+_base_context = None
+
+
+def render(url, template, **context):
+    """
+    Renders one template as if the page at url had been requested.
+    Skips Flask's per-request context processor (which counts categories on
+    every call) — we compute those globals once per process instead.
+    """
+    global _base_context
+    if _base_context is None:
+        _base_context = {
+            "app_name": APP_NAME,
+            "app_tagline": APP_TAGLINE,
+            "categories": CATEGORIES,
+            "category_counts": get_category_counts(),
+        }
+    with app.test_request_context(url):
+        return app.jinja_env.get_template(template).render(
+            **_base_context, request=request, **context
+        )
+
+
+def write_page(out_dir, relative_path, html, old_hash):
+    """Writes a page only if its HTML changed. Returns the new content hash."""
+    content_hash = hashlib.sha1(html.encode("utf-8")).hexdigest()
+    path = os.path.join(out_dir, relative_path)
+    if content_hash != old_hash or not os.path.exists(path):
+        write_atomic(path, html)
+    return content_hash
+
+
+def _render_article_chunk(out_dir, ids, old_hashes):
+    """Worker: renders article pages for a list of ids. Returns {path: hash}."""
+    wanted = set(ids)
+    written = {}
+    for article in iter_articles(min(ids) - 1, max(ids) + 1):
+        if article["id"] not in wanted:
+            continue
+        url = f"/article/{article['id']}"
+        html = render(url, "article.html", article=article,
+                      related=get_related_articles(article["id"]), page_title=article["title"])
+        written[page_file(url)] = write_page(out_dir, page_file(url), html, old_hashes.get(page_file(url)))
+    return written
+
+
+def _render_archive_chunk(out_dir, pages, last_page, old_hashes):
+    """Worker: renders archive pages. Returns {path: hash}."""
+    written = {}
+    for page in pages:
+        start = (page - 1) * ARCHIVE_PAGE_SIZE + 1
+        articles = get_articles_in_id_range(start, start + ARCHIVE_PAGE_SIZE)
+        articles.reverse()
+        url = f"/archive/{page}"
+        html = render(url, "archive.html", articles=articles, page=page, last_page=last_page,
+                      page_title=f"Archive — page {page}")
+        written[page_file(url)] = write_page(out_dir, page_file(url), html, old_hashes.get(page_file(url)))
+    return written
+
+
+# ============================================================
+# THE EXPORT
+# ============================================================
+
+def scan_articles():
+    """
+    One pass over the whole table (in id order, SCAN_BATCH rows at a time)
+    that collects everything the export needs without holding full rows:
+    a fingerprint per article, a fingerprint per archive page, and the
+    in-browser search index.
+    """
+    article_sigs = {}
+    archive_hashers = {}
+    postings = {}
+    docs = {}
+    # Read alongside the articles (both in id order): an article page also
+    # shows its related links, so they're part of its fingerprint
+    related = iter_related_ids()
+    next_related = next(related, None)
+
+    for a in iter_articles(batch_size=SCAN_BATCH):
+        sig = row_fingerprint(a)
+        while next_related and next_related[0] < a.id:
+            next_related = next(related, None)
+        if next_related and next_related[0] == a.id:
+            article_sigs[a.id] = fingerprint(sig, next_related[1])
+        else:
+            article_sigs[a.id] = sig
+        page = (a.id - 1) // ARCHIVE_PAGE_SIZE + 1
+        archive_hashers.setdefault(page, hashlib.sha1()).update(f"{a.id}:{sig};".encode())
+
+        docs.setdefault(a.id // SEARCH_DOC_BLOCK, {})[a.id] = [
+            a.title, a.link, a.source_name, a.source_type,
+            (a.published_date or "")[:10], a.category,
+        ]
+        words = set(WORD_PATTERN.findall(f"{a.title} {a.description or ''}".lower()))
+        for word in words - STOP_WORDS:
+            if len(word) < 2:
+                continue
+            ids = postings.setdefault(word, [])
+            ids.append(a.id)
+            if len(ids) > 2 * SEARCH_POSTINGS:
+                del ids[:-SEARCH_POSTINGS]
+
+    archive_sigs = {page: h.hexdigest() for page, h in archive_hashers.items()}
+    return article_sigs, archive_sigs, postings, docs
+
+
+def write_search_index(out_dir, postings, docs, old_hashes, new_hashes):
+    """
+    Writes the in-browser search index:
+      search-index/terms/<first 2 letters>.json  {word: [article ids, newest first]}
+      search-index/docs/<block>.json             {id: [title, link, source, type, date, category]}
+    Files whose content didn't change are left alone.
+    """
+    shards = {}
+    for word, ids in postings.items():
+        shards.setdefault(word[:2], {})[word] = ids[-SEARCH_POSTINGS:][::-1]
+
+    files = {f"search-index/terms/{prefix}.json": shard for prefix, shard in shards.items()}
+    files.update({f"search-index/docs/{block}.json": block_docs for block, block_docs in docs.items()})
+    for relative_path, data in files.items():
+        text = json.dumps(data, separators=(",", ":"))
+        new_hashes[relative_path] = write_page(out_dir, relative_path, text,
+                                               old_hashes.get(relative_path))
+
+
+def copy_static_files(out_dir):
+    """CSS/JS, plus our RSS/Atom feeds and sitemap from generated/."""
+    shutil.copytree(os.path.join(PROJECT_DIR, "static"), os.path.join(out_dir, "static"),
+                    dirs_exist_ok=True, ignore=shutil.ignore_patterns("dist"))
+    if os.path.isdir(DIST_DIR):
+        shutil.copytree(DIST_DIR, os.path.join(out_dir, "assets"), dirs_exist_ok=True)
+
+    generated_path("sitemap.xml")  # builds the outbound files if they don't exist yet
+    copies = {"feed.xml": "feed.xml", "atom.xml": "atom.xml", "sitemap.xml": "sitemap.xml"}
+    for key in CATEGORIES:
+        copies[f"category/{key}.xml"] = f"category/{key}/feed.xml"
+        copies[f"category/{key}.atom.xml"] = f"category/{key}/atom.xml"
+    for source, target in copies.items():
+        if os.path.exists(os.path.join(OUTPUT_DIR, source)):
+            os.makedirs(os.path.dirname(os.path.join(out_dir, target)), exist_ok=True)
+            shutil.copy2(os.path.join(OUTPUT_DIR, source), os.path.join(out_dir, target))
+    shutil.copytree(os.path.join(OUTPUT_DIR, "sitemaps"), os.path.join(out_dir, "sitemaps"),
+                    dirs_exist_ok=True)
+
+
+def export(out_dir=EXPORT_DIR, full=False, workers=None):
+    """
+    Exports the site to out_dir. Returns {"rendered": n, "skipped": n, "removed": n}.
+    """
+    started = time.perf_counter()
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    old = {"pages": {}}
+    if not full and os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            old = json.load(f)
+    old_pages = old["pages"]          # {path: {"sig": ..., "hash": ...}}
+    old_hashes = {path: entry["hash"] for path, entry in old_pages.items()}
+    new_pages = {}
+
+    article_sigs, archive_sigs, postings, docs = scan_articles()
+    last_page = max(archive_sigs, default=1)
+
+    # --- The handful of top-level pages: always rendered (cheap), rewritten only if changed ---
+    client = app.test_client()
+    # /archive is the newest archive page, as on the live site (the footer links to it)
+    top_pages = (["/", "/podcasts", "/about", "/archive"]
+                 + [f"/category/{key}" for key in CATEGORIES])
+    for url in top_pages:
+        html = client.get(url).get_data(as_text=True)
+        path = page_file(url)
+        new_pages[path] = {"sig": None, "hash": write_page(out_dir, path, html, old_hashes.get(path))}
+    html = render("/search", "search.html", query="", results=[], page_title="Search",
+                  static_search=True)
+    new_pages["search/index.html"] = {
+        "sig": None, "hash": write_page(out_dir, "search/index.html", html, old_hashes.get("search/index.html")),
+    }
+
+    # --- Article and archive pages: only the ones whose rows changed ---
+    def unchanged(path, sig):
+        entry = old_pages.get(path)
+        return entry and entry["sig"] == sig and os.path.exists(os.path.join(out_dir, path))
+
+    article_todo, archive_todo = [], []
+    for article_id, sig in article_sigs.items():
+        path = page_file(f"/article/{article_id}")
+        if unchanged(path, sig):
+            new_pages[path] = old_pages[path]
+        else:
+            article_todo.append(article_id)
+    for page, sig in archive_sigs.items():
+        # The newest page also shows "page X of Y", so it changes when Y does
+        sig = fingerprint(sig, last_page) if page >= last_page - 1 else sig
+        archive_sigs[page] = sig
+        path = page_file(f"/archive/{page}")
+        if unchanged(path, sig):
+            new_pages[path] = old_pages[path]
+        else:
+            archive_todo.append(page)
+
+    def hashes_for(urls):
+        # Each worker only gets the old hashes for its own pages
+        return {page_file(url): old_hashes[page_file(url)] for url in urls
+                if page_file(url) in old_hashes}
+
+    jobs = []
+    for i in range(0, len(article_todo), RENDER_CHUNK):
+        ids = article_todo[i:i + RENDER_CHUNK]
+        jobs.append((_render_article_chunk,
+                     (out_dir, ids, hashes_for(f"/article/{n}" for n in ids))))
+    for i in range(0, len(archive_todo), RENDER_CHUNK):
+        pages = archive_todo[i:i + RENDER_CHUNK]
+        jobs.append((_render_archive_chunk,
+                     (out_dir, pages, last_page, hashes_for(f"/archive/{n}" for n in pages))))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_job, jobs))
+    else:
+        results = [_run_job(job) for job in jobs]
+
+    sigs_by_path = {page_file(f"/article/{i}"): s for i, s in article_sigs.items()}
+    sigs_by_path.update({page_file(f"/archive/{p}"): s for p, s in archive_sigs.items()})
+    for written in results:
+        for path, content_hash in written.items():
+            new_pages[path] = {"sig": sigs_by_path[path], "hash": content_hash}
+
+    # --- Search index, static files ---
+    search_hashes = {}
+    write_search_index(out_dir, postings, docs, old_hashes, search_hashes)
+    for path, content_hash in search_hashes.items():
+        new_pages[path] = {"sig": None, "hash": content_hash}
+    copy_static_files(out_dir)
+
+    # --- Remove pages for articles that no longer exist ---
+    removed = 0
+    for path in set(old_pages) - set(new_pages):
+        try:
+            os.remove(os.path.join(out_dir, path))
+            removed += 1
+        except FileNotFoundError:
+            pass
+
+    write_atomic(manifest_path, json.dumps({"pages": new_pages}, separators=(",", ":")))
+
+    rendered = len(article_todo) + len(archive_todo) + len(top_pages) + 1
+    stats = {"rendered": rendered, "skipped": len(new_pages) - rendered - len(search_hashes),
+             "removed": removed, "seconds": round(time.perf_counter() - started, 2)}
+    print(f"Exported to {out_dir}: {stats['rendered']} pages rendered, {stats['skipped']} unchanged, "
+          f"{stats['removed']} removed in {stats['seconds']}s")
+    return stats
+
+
+def _run_job(job):
+    fn, args = job
+    return fn(*args)
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export AdTech Pulse as a static site")
+    parser.add_argument("--out", default=EXPORT_DIR, help="output folder (default: site/)")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and rebuild everything")
+    parser.add_argument("--workers", type=int, help="render processes (default: one per core)")
+    args = parser.parse_args()
+    export(os.path.abspath(args.out), full=args.full, workers=args.workers)
@@ -4,7 +4,7 @@
 # It goes out to the internet, grabs RSS feeds from ad industry sites,
 # parses the content, categorizes it, and saves it to the database.
 #
-# UPDATED: Now uses ALL_FEEDS from config.py which combines news, podcasts,
+# UPDATED: Now uses ALL_FEEDS from sources.py which combines news, podcasts,
 # Reddit, Bluesky, Mastodon, Hacker News, and Substack into one list.
 # Each feed has a content_type field so we know where it came from.
 #
@@ -15,12 +15,17 @@
 # - We run this periodically (every hour) to keep content fresh
 
 import feedparser
+import json
 import re
 import socket
 socket.setdefaulttimeout(15)
 from datetime import datetime
-from database import save_article
-from config import ALL_FEEDS, NEWS_FEEDS, PODCAST_FEEDS, CATEGORIES
+from database import save_article, get_state, set_state
+from config import CATEGORIES
+from sources import ALL_FEEDS, NEWS_FEEDS, PODCAST_FEEDS
+from prospects import match_article
+from fetch_client import get_client
+from websub import discover_hub
 
 
 # =============================================
@@ -31,6 +36,9 @@ from config import ALL_FEEDS, NEWS_FEEDS, PODCAST_FEEDS, CATEGORIES
 # This identifies us as a legitimate feed reader.
 USER_AGENT = "AdTechPulse/1.0 (RSS Aggregator; +https://github.com/Inicio-89/adtech-pulse)"
 
+# Give up on a feed if the server hasn't answered in this many seconds
+FETCH_TIMEOUT = 15
+
 
 def categorize_article(title, description):
     """
@@ -63,10 +71,11 @@ def categorize_article(title, description):
     return best_category
 
 
-def parse_date(entry):
+def parse_date(entry, fallback=None):
     """
     Extracts and normalizes the publication date from a feed entry.
     RSS feeds store dates in various formats. This handles the mess.
+    Entries with no date get `fallback` (when the feed was fetched) — or now.
     """
     try:
         if hasattr(entry, 'published_parsed') and entry.published_parsed:
@@ -80,7 +89,7 @@ def parse_date(entry):
     except Exception:
         pass
 
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return (fallback or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
 
 
 def clean_html(text):
@@ -111,149 +120,191 @@ def clean_html(text):
     return clean
 
 
-def fetch_feed(feed_info):
+def download_feed(feed_info):
     """
-    Fetches a single feed and returns a list of article dicts ready for saving.
+    Downloads a feed's raw XML bytes — the I/O half of fetching.
+    No parsing happens here, so many downloads can run in threads
+    at once while they mostly wait on the network.
+
+    Uses the shared keep-alive client in fetch_client.py: feeds on the same
+    host re-use one connection, responses come compressed, and permanent
+    redirects are remembered.
+
+    Returns:
+        tuple: (body_bytes, response_headers_dict)
+    """
+    # Reddit (and some other sites) block the default Python user-agent
+    result = get_client(USER_AGENT, timeout=FETCH_TIMEOUT).get(feed_info["url"])
+    return result.body, result.headers
+
+
+def parse_feed_body(feed_info, body, headers=None, fetched_at=None):
+    """
+    Turns downloaded feed bytes into a list of article dicts ready for saving.
+    This is the CPU half of fetching: XML parsing, dates, HTML cleanup,
+    categorizing and prospect tagging. It only uses its arguments (no
+    network, no database), so it can run in a separate process.
     
-    This is the unified fetch function that handles ALL feed types:
+    This handles ALL feed types:
     news, podcast, reddit, bluesky, mastodon, hackernews, substack.
     
-    The content_type from config.py tells us what kind of source it is,
+    The content_type from sources.py tells us what kind of source it is,
     which helps the UI display it differently (e.g., label Reddit posts
     as "Community" rather than "News").
     
     Parameters:
-        feed_info (dict): Feed configuration from config.py with keys:
+        feed_info (dict): Feed configuration from sources.py with keys:
             name, url, category, content_type
+        body (bytes): The raw feed XML from download_feed()
+        headers (dict): Response headers (helps feedparser pick the charset)
+        fetched_at (datetime): when the body was downloaded, for entries
+            without a date (default: now). Re-parsing a snapshot passes the
+            snapshot's time, so the result is the same every time.
     
     Returns:
-        tuple: (articles_list, stats_dict)
+        tuple: (articles_list, stats_dict) — stats has "websub": (hub, topic)
+            when the feed advertises a WebSub hub (see websub.py)
     """
     feed_name = feed_info["name"]
-    feed_url = feed_info["url"]
     default_category = feed_info.get("category", "general")
     content_type = feed_info.get("content_type", "news")
     
     articles = []
-    
-    try:
-        # feedparser.parse() does the heavy lifting:
-        # - Makes an HTTP request to the URL
-        # - Downloads the XML content
-        # - Parses it into a Python object with .entries, .feed, etc.
-        #
-        # We pass a custom user-agent because Reddit (and some other sites)
-        # block requests from the default Python user-agent.
-        feed = feedparser.parse(
-            feed_url,
-            agent=USER_AGENT
+
+    # feedparser.parse() reads the XML into a Python object with .entries, .feed, etc.
+    feed = feedparser.parse(body, response_headers=headers or {})
+
+    if feed.bozo and not feed.entries:
+        print(f"  WARNING: Feed error for {feed_name} — skipping")
+        return [], {"fetched": 0, "errors": 1}
+
+    for entry in feed.entries:
+        # Extract core data from the feed entry
+        title = entry.get("title", "").strip()
+        link = entry.get("link", "").strip()
+        description = clean_html(
+            entry.get("summary", "") or entry.get("description", "")
         )
 
-        if feed.bozo and not feed.entries:
-            print(f"  WARNING: Feed error for {feed_name} — skipping")
-            return [], {"fetched": 0, "errors": 1}
-
-        for entry in feed.entries:
-            # Extract core data from the feed entry
-            title = entry.get("title", "").strip()
-            link = entry.get("link", "").strip()
-            description = clean_html(
-                entry.get("summary", "") or entry.get("description", "")
-            )
-
-            # Skip entries without a title or link
-            if not title or not link:
-                continue
-
-            # Auto-categorize based on content keywords
-            category = categorize_article(title, description)
-            if category == "general":
-                category = default_category
-
-            # Build the article data dictionary
-            article_data = {
-                "title": title,
-                "link": link,
-                "description": description,
-                "source_name": feed_name,
-                "source_type": content_type,  # <-- This is the key change
-                "category": category,
-                "published_date": parse_date(entry),
-            }
-
-            # Podcast-specific: extract audio URL and duration
-            if content_type == "podcast":
-                audio_url = None
-                if hasattr(entry, 'enclosures') and entry.enclosures:
-                    audio_url = entry.enclosures[0].get("href", "")
-                article_data["audio_url"] = audio_url
-                article_data["audio_duration"] = entry.get("itunes_duration", "")
-
-            articles.append(article_data)
-        
-        return articles, {"fetched": len(articles), "errors": 0}
+        # Skip entries without a title or link
+        if not title or not link:
+            continue
+
+        # Auto-categorize based on content keywords
+        category = categorize_article(title, description)
+        if category == "general":
+            category = default_category
+
+        # Build the article data dictionary
+        article_data = {
+            "title": title,
+            "link": link,
+            "description": description,
+            "source_name": feed_name,
+            "source_type": content_type,  # <-- This is the key change
+            "category": category,
+            "published_date": parse_date(entry, fetched_at),
+            # Prospect companies + trigger events, saved alongside the article
+            "entities": match_article(title, description),
+        }
+
+        # Podcast-specific: extract audio URL and duration
+        if content_type == "podcast":
+            audio_url = None
+            if hasattr(entry, 'enclosures') and entry.enclosures:
+                audio_url = entry.enclosures[0].get("href", "")
+            article_data["audio_url"] = audio_url
+            article_data["audio_duration"] = entry.get("itunes_duration", "")
+
+        articles.append(article_data)
+    
+    stats = {"fetched": len(articles), "errors": 0}
+    hub = discover_hub(feed, headers, feed_info["url"])
+    if hub:
+        stats["websub"] = hub
+    return articles, stats
+
+
+def fetch_feed(feed_info):
+    """
+    Fetches a single feed and returns a list of article dicts ready for saving.
+    Downloads and parses in one call — handy for testing a single source.
+    fetch_all_feeds() uses the staged pipeline in pipeline.py instead.
+    
+    Returns:
+        tuple: (articles_list, stats_dict)
+    """
+    try:
+        body, headers = download_feed(feed_info)
+        return parse_feed_body(feed_info, body, headers)
 
     except Exception as e:
-        print(f"  ERROR fetching {feed_name}: {e}")
+        print(f"  ERROR fetching {feed_info['name']}: {e}")
         return [], {"fetched": 0, "errors": 1}
 
 
 def fetch_all_feeds():
     """
-    Master function — fetches ALL feeds from config.py's ALL_FEEDS list.
+    Master function — fetches ALL feeds from sources.py's ALL_FEEDS list.
     
     This replaces the old separate fetch_news_feeds() and fetch_podcast_feeds().
-    Now it loops through every feed in ALL_FEEDS (news, podcasts, reddit,
-    bluesky, mastodon, hackernews, substack) in one pass.
+    Now it runs every feed in ALL_FEEDS (news, podcasts, reddit, bluesky,
+    mastodon, hackernews, substack) through the download → parse → save
+    pipeline in pipeline.py, so downloads overlap and parsing uses every core.
     """
-    total_fetched = 0
-    total_saved = 0
-    total_errors = 0
-    source_count = len(ALL_FEEDS)
+    from pipeline import run_pipeline
+    from websub import polled_feeds
 
     print(f"\n{'='*60}")
-    print(f"Fetching {source_count} feeds at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Fetching {len(ALL_FEEDS)} feeds at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}")
 
-    # Group feeds by content_type for cleaner logging
-    feed_types = {}
-    for feed in ALL_FEEDS:
-        ct = feed.get("content_type", "news")
-        feed_types.setdefault(ct, []).append(feed)
-
-    for content_type, feeds in feed_types.items():
-        print(f"\n--- {content_type.upper()} ({len(feeds)} sources) ---")
-        
-        for feed_info in feeds:
-            feed_name = feed_info["name"]
-            print(f"  Fetching: {feed_name}...", end=" ")
-            
-            articles, stats = fetch_feed(feed_info)
-            total_fetched += stats["fetched"]
-            total_errors += stats["errors"]
-            
-            if stats["errors"]:
-                continue
-            
-            # Save each article to database
-            saved_count = 0
-            for article_data in articles:
-                if save_article(article_data):
-                    saved_count += 1
-            
-            total_saved += saved_count
-            print(f"found {stats['fetched']}, saved {saved_count} new")
+    # Permanent redirects found on earlier runs, so we skip those hops
+    client = get_client(USER_AGENT, timeout=FETCH_TIMEOUT)
+    known_redirects = json.loads(get_state("permanent_redirects", "{}"))
+    client.permanent_redirects.update(known_redirects)
+
+    # Feeds that push their new entries to us (websub.py) are skipped
+    feeds = polled_feeds(ALL_FEEDS)
+    if len(feeds) < len(ALL_FEEDS):
+        print(f"{len(ALL_FEEDS) - len(feeds)} feeds arrive by WebSub push — not polling them")
+
+    new_articles = []
+    result = run_pipeline(feeds, on_saved=new_articles.extend)
+    if client.permanent_redirects != known_redirects:
+        set_state("permanent_redirects", json.dumps(client.permanent_redirects, sort_keys=True))
+    # The background scheduler uses this to decide when feeds are stale
+    set_state("last_fetch_at", datetime.now().isoformat())
+    after_ingest(new_articles)
 
     print(f"\n{'='*60}")
-    print(f"Fetch complete: {total_fetched} checked, {total_saved} new saved, {total_errors} errors")
+    print(f"Fetch complete: {result['total_fetched']} checked, "
+          f"{result['new_saved']} new saved, {result['errors']} errors")
+    stats = client.stats
+    print(f"Network: {stats['wire_bytes'] / 1e6:.1f} MB downloaded "
+          f"({stats['body_bytes'] / 1e6:.1f} MB uncompressed), "
+          f"{stats['connections_opened']} connections opened, {stats['connections_reused']} re-used")
     print(f"{'='*60}")
 
-    return {
-        "total_fetched": total_fetched,
-        "new_saved": total_saved,
-        "sources_checked": source_count,
-        "errors": total_errors,
-    }
+    return result
+
+
+def after_ingest(new_articles):
+    """
+    Runs the follow-up jobs that depend on what was just saved.
+    Each job only looks at the new articles, so a quiet fetch costs nothing.
+    A failing job is reported but never undoes the fetch itself.
+    """
+    from alerts import check_new_articles
+    from outbound import regenerate
+    from related import update_related
+
+    # related first: the pages regenerate() builds show each article's links
+    for job in (update_related, regenerate, check_new_articles):
+        try:
+            job(new_articles)
+        except Exception as e:
+            print(f"  ERROR in {job.__module__}.{job.__name__}: {e}")
 
 
 # =============================================
@@ -0,0 +1,282 @@
+# live.py — New articles pushed to open pages (server-sent events)
+# ===================================================================
+# To see new stories, readers reload the homepage — and every reload runs
+# the homepage queries again. With this, a page that's open gets each new
+# article the moment it's saved, and main.js adds its card at the top.
+#
+# SERVER-SENT EVENTS (SSE): the browser opens one long HTTP request
+# (EventSource) and the server writes a small message down it whenever
+# there's news:
+#
+#   id: 48213
+#   event: article
+#   data: {"id": 48213, "title": "...", "category": "privacy", ...}
+#
+# If the connection drops, the browser reconnects by itself and sends the
+# last id it got (Last-Event-ID), so we re-send what it missed.
+#
+# ONE THREAD FOR EVERYONE: a page keeps its connection open for as long as
+# it's open, so a thread per connection (how Flask serves requests) would
+# run out long before we run out of readers. This is a separate little
+# asyncio server: every connection is a few KB waiting in one event loop,
+# so thousands of idle pages cost next to nothing. One loop also does the
+# only database work: one "anything after id N?" query when something was
+# saved, shared by every connection.
+#
+# HOW IT HEARS ABOUT NEW ARTICLES: whoever saves them (the pipeline, a
+# WebSub push) calls notify(), which sends a one-byte UDP message to
+# LIVE_PORT on this machine. It also checks every POLL_SECONDS anyway, in
+# case a message got lost or came from another machine.
+#
+# TO RUN:
+#   python live.py [PORT]           # listens on LIVE_PORT (config.py)
+# and have your proxy send /live to it, with ADTECH_PULSE_LIVE_URL=/live.
+# ("python app.py" runs it for you on LIVE_PORT in development.)
+#
+# Filters: /live?category=privacy, /live?type=news, /live?source=AdExchanger
+
+import asyncio
+import json
+import socket
+import sys
+import threading
+import urllib.parse
+
+from config import CATEGORIES, LIVE_PORT
+from database import get_articles_after_id, get_max_article_id
+
+
+LIVE_PATH = "/live"
+HEARTBEAT_SECONDS = 15    # A comment line this often keeps proxies from closing idle connections
+POLL_SECONDS = 2          # Look for new articles this often even without a notify()
+RETRY_MS = 3000           # How long browsers wait before reconnecting
+REPLAY_LIMIT = 50         # Most missed articles re-sent to a reconnecting page
+REPLAY_SCAN = 2000        # ...looked for among at most this many recent ids
+MAX_BUFFER = 256 * 1024   # A client this far behind (bytes unsent) is dropped
+BATCH = 500               # Articles read per query
+
+
+def notify(port=LIVE_PORT):
+    """Tells the live server that articles were just saved. Never fails or blocks."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b"!", ("127.0.0.1", port))
+    except OSError:
+        pass
+
+
+def summary(article):
+    """What a card needs — the event's data."""
+    category = article["category"]
+    return {
+        "id": article["id"],
+        "title": article["title"],
+        "link": article["link"],
+        "description": (article["description"] or "")[:200],
+        "source_name": article["source_name"],
+        "source_type": article["source_type"],
+        "category": category,
+        "category_name": CATEGORIES.get(category, {}).get("display_name", category),
+        "published_date": (article["published_date"] or "")[:10],
+    }
+
+
+def format_event(article):
+    data = json.dumps(summary(article), separators=(",", ":"))
+    return f"id: {article['id']}\nevent: article\ndata: {data}\n\n".encode("utf-8")
+
+
+class Client:
+    """One open page: its connection and what it asked to see."""
+    __slots__ = ("writer", "category", "source_type", "source_name", "backlog")
+
+    def __init__(self, writer, query):
+        self.writer = writer
+        self.category = query.get("category")
+        self.source_type = query.get("type")
+        self.source_name = query.get("source")
+        self.backlog = []  # events that arrive while we're still replaying
+
+    def wants(self, article):
+        return ((not self.category or article["category"] == self.category)
+                and (not self.source_type or article["source_type"] == self.source_type)
+                and (not self.source_name or article["source_name"] == self.source_name))
+
+    def send(self, data):
+        """Queues bytes for the client; False if it's gone or too far behind."""
+        if self.backlog is not None:
+            self.backlog.append(data)
+            return True
+        if self.writer.is_closing():
+            return False
+        if self.writer.transport.get_write_buffer_size() > MAX_BUFFER:
+            self.writer.close()
+            return False
+        self.writer.write(data)
+        return True
+
+
+class LiveHub:
+    """Watches for new articles and fans each one out to every client that wants it."""
+
+    def __init__(self):
+        self.clients = set()
+        self.last_id = 0
+        self.wake = None
+        self.stats = {"connected": 0, "sent": 0, "dropped": 0}
+
+    # --- WATCHING THE DATABASE ---
+
+    async def watch(self):
+        loop = asyncio.get_running_loop()
+        self.wake = asyncio.Event()
+        self.last_id = await loop.run_in_executor(None, get_max_article_id)
+        while True:
+            try:
+                await asyncio.wait_for(self.wake.wait(), POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            if not self.clients:
+                # Nobody listening: just keep up, so nothing old is sent later
+                self.last_id = await loop.run_in_executor(None, get_max_article_id)
+                continue
+            try:
+                while True:
+                    articles = await loop.run_in_executor(None, get_articles_after_id,
+                                                          self.last_id, BATCH)
+                    if not articles:
+                        break
+                    self.publish(articles)
+                    if len(articles) < BATCH:
+                        break
+            except Exception as e:
+                print(f"Live: reading new articles failed: {e}")
+
+    def publish(self, articles):
+        # last_id moves before anything is sent, so a client joining now
+        # replays up to here and gets the rest from the broadcast
+        self.last_id = articles[-1]["id"]
+        for article in articles:
+            event = format_event(article)
+            for client in list(self.clients):
+                if not client.wants(article):
+                    continue
+                if client.send(event):
+                    self.stats["sent"] += 1
+                else:
+                    self.clients.discard(client)
+                    self.stats["dropped"] += 1
+
+    # --- CONNECTIONS ---
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 10)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 10)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+
+        parts = request_line.decode("latin-1").split()
+        url = urllib.parse.urlsplit(parts[1] if len(parts) > 1 else "")
+        if not parts or parts[0] != "GET" or url.path != LIVE_PATH:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            writer.close()
+            return
+
+        query = {key: values[0] for key, values in urllib.parse.parse_qs(url.query).items()}
+        client = Client(writer, query)
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\n"
+                     b"X-Accel-Buffering: no\r\n"         # nginx: don't hold events back
+                     b"Access-Control-Allow-Origin: *\r\n"
+                     b"\r\n" + f"retry: {RETRY_MS}\n\n".encode())
+
+        # Join the broadcast first (events are held in client.backlog), then
+        # replay what the page missed: ids after its last one, up to last_id
+        self.clients.add(client)
+        self.stats["connected"] += 1
+        upto = self.last_id
+        try:
+            after = int(headers.get("last-event-id") or query.get("last_event_id") or upto)
+        except ValueError:
+            after = upto
+        after = max(after, upto - REPLAY_SCAN)
+        try:
+            if after < upto:
+                missed = await asyncio.get_running_loop().run_in_executor(
+                    None, get_articles_after_id, after, upto - after)
+                missed = [a for a in missed if a["id"] <= upto and client.wants(a)]
+                for article in missed[-REPLAY_LIMIT:]:
+                    writer.write(format_event(article))
+            for data in client.backlog:
+                writer.write(data)
+            client.backlog = None
+
+            # Wait for the page to go away, with a heartbeat now and then
+            while True:
+                try:
+                    if not await asyncio.wait_for(reader.read(1024), HEARTBEAT_SECONDS):
+                        break  # the browser closed the connection
+                except asyncio.TimeoutError:
+                    if not client.send(b": ping\n\n"):
+                        break
+                    await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+
+class _NotifyProtocol(asyncio.DatagramProtocol):
+    def __init__(self, hub):
+        self.hub = hub
+
+    def datagram_received(self, data, addr):
+        if self.hub.wake is not None:
+            self.hub.wake.set()
+
+
+async def serve(host="0.0.0.0", port=LIVE_PORT, hub=None):
+    """Runs the live server until cancelled."""
+    hub = hub or LiveHub()
+    loop = asyncio.get_running_loop()
+    server = await asyncio.start_server(hub.handle, host, port, backlog=1024)
+    transport, _ = await loop.create_datagram_endpoint(lambda: _NotifyProtocol(hub),
+                                                       local_addr=("127.0.0.1", port))
+    try:
+        async with server:
+            await asyncio.gather(server.serve_forever(), hub.watch())
+    finally:
+        transport.close()
+
+
+def start_in_thread(host="127.0.0.1", port=LIVE_PORT):
+    """Runs the live server in a background thread (for python app.py)."""
+    def run():
+        try:
+            asyncio.run(serve(host, port))
+        except OSError as e:
+            print(f"Live updates off: {e}")
+
+    threading.Thread(target=run, name="live-server", daemon=True).start()
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else LIVE_PORT
+    print(f"Live updates on http://0.0.0.0:{port}{LIVE_PATH} (Ctrl+C to stop)")
+    try:
+        asyncio.run(serve(port=port))
+    except KeyboardInterrupt:
+        pass
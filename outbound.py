@@ -0,0 +1,216 @@
+# outbound.py — Our own RSS/Atom feeds and sitemap.xml
+# ======================================================
+# Feed readers and search engine crawlers poll these files all day.
+# Building them from the database on every poll would mean reading the
+# articles table over and over, so instead we build them as plain files
+# right after each ingest — and only the ones that actually changed:
+#
+#   generated/feed.xml, generated/atom.xml              ← everything
+#   generated/category/<name>.xml and <name>.atom.xml   ← one topic
+#   generated/sitemap.xml                                ← the sitemap INDEX
+#   generated/sitemaps/pages.xml                         ← home, topics, about...
+#   generated/sitemaps/articles-<n>.xml                  ← article pages, in shards
+#
+# SITEMAP SHARDS:
+# Article ids only go up, so shard n holds articles with ids from
+# n × SITEMAP_SHARD_SIZE up to the next shard. New articles only ever land in
+# the last shard or two, so an ingest rewrites those and leaves the rest alone.
+#
+# Every file is written to a temporary name first and then renamed into place,
+# so a crawler can never download a half-written file.
+#
+# app.py serves these files with ETag and Last-Modified headers, so a reader
+# that already has the latest version gets a tiny "304 Not Modified" reply.
+#
+# TO RUN (full rebuild):
+#   python outbound.py
+
+import os
+import tempfile
+from datetime import datetime
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+from config import APP_NAME, APP_TAGLINE, CATEGORIES, SITE_URL
+from database import get_latest_articles, get_articles_in_id_range, get_max_article_id
+
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated")
+
+FEED_ITEMS = 50              # Articles in each RSS/Atom feed
+SITEMAP_SHARD_SIZE = 10000   # Article URLs per sitemap file (the limit is 50,000)
+
+
+def write_atomic(path, content):
+    """Writes a file so readers see either the old version or the new one, never half."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode("utf-8"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def article_url(article_id):
+    return f"{SITE_URL}/article/{article_id}"
+
+
+def _parse_date(article):
+    """Our stored dates are 'YYYY-MM-DD HH:MM:SS' (UTC); fall back to when we fetched it."""
+    for value in (article.get("published_date"), article.get("fetched_date")):
+        try:
+            return datetime.fromisoformat(value[:19])
+        except (TypeError, ValueError):
+            continue
+    return datetime(1970, 1, 1)
+
+
+def build_rss(title, link, description, articles):
+    items = []
+    for a in articles:
+        items.append(f"""  <item>
+    <title>{escape(a["title"])}</title>
+    <link>{escape(article_url(a["id"]))}</link>
+    <guid isPermaLink="true">{escape(article_url(a["id"]))}</guid>
+    <description>{escape(a["description"] or "")}</description>
+    <source url="{escape(a["link"], {'"': '&quot;'})}">{escape(a["source_name"] or "")}</source>
+    <category>{escape(a["category"] or "")}</category>
+    <pubDate>{format_datetime(_parse_date(a))}</pubDate>
+  </item>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+  <title>{escape(title)}</title>
+  <link>{escape(link)}</link>
+  <description>{escape(description)}</description>
+{chr(10).join(items)}
+</channel>
+</rss>
+"""
+
+
+def build_atom(title, link, feed_url, articles):
+    def stamp(a):
+        return _parse_date(a).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    entries = []
+    for a in articles:
+        entries.append(f"""  <entry>
+    <title>{escape(a["title"])}</title>
+    <link href="{escape(article_url(a["id"]))}"/>
+    <id>{escape(article_url(a["id"]))}</id>
+    <updated>{stamp(a)}</updated>
+    <summary>{escape(a["description"] or "")}</summary>
+    <author><name>{escape(a["source_name"] or APP_NAME)}</name></author>
+  </entry>""")
+    updated = stamp(articles[0]) if articles else "1970-01-01T00:00:00Z"
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>{escape(title)}</title>
+  <link href="{escape(link)}"/>
+  <link rel="self" href="{escape(feed_url)}"/>
+  <id>{escape(feed_url)}</id>
+  <updated>{updated}</updated>
+{chr(10).join(entries)}
+</feed>
+"""
+
+
+def write_feeds(category=None):
+    """Writes the RSS + Atom pair for one category (or the all-topics feed)."""
+    articles = get_latest_articles(limit=FEED_ITEMS, category=category, full=True)
+    if category:
+        name = CATEGORIES.get(category, {}).get("display_name", category)
+        title = f"{APP_NAME} — {name}"
+        link = f"{SITE_URL}/category/{category}"
+        rss_path = os.path.join(OUTPUT_DIR, "category", f"{category}.xml")
+        atom_path = os.path.join(OUTPUT_DIR, "category", f"{category}.atom.xml")
+        atom_url = f"{link}/atom.xml"
+    else:
+        title, link = APP_NAME, SITE_URL
+        rss_path = os.path.join(OUTPUT_DIR, "feed.xml")
+        atom_path = os.path.join(OUTPUT_DIR, "atom.xml")
+        atom_url = f"{SITE_URL}/atom.xml"
+
+    write_atomic(rss_path, build_rss(title, link, APP_TAGLINE, articles))
+    write_atomic(atom_path, build_atom(title, link, atom_url, articles))
+
+
+def _urlset(urls):
+    body = "\n".join(
+        f"  <url><loc>{escape(loc)}</loc>{f'<lastmod>{lastmod}</lastmod>' if lastmod else ''}</url>"
+        for loc, lastmod in urls
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{body}
+</urlset>
+"""
+
+
+def write_sitemap_shard(shard):
+    """Rewrites sitemaps/articles-<shard>.xml from one id range."""
+    start = shard * SITEMAP_SHARD_SIZE
+    articles = get_articles_in_id_range(start, start + SITEMAP_SHARD_SIZE)
+    urls = [(article_url(a["id"]), _parse_date(a).strftime("%Y-%m-%d")) for a in articles]
+    write_atomic(os.path.join(OUTPUT_DIR, "sitemaps", f"articles-{shard}.xml"), _urlset(urls))
+
+
+def write_sitemap_index():
+    """Writes sitemap.xml (the list of shards) and the small static-pages sitemap."""
+    pages = [SITE_URL + "/", f"{SITE_URL}/podcasts", f"{SITE_URL}/about"]
+    pages += [f"{SITE_URL}/category/{key}" for key in CATEGORIES]
+    write_atomic(os.path.join(OUTPUT_DIR, "sitemaps", "pages.xml"),
+                 _urlset([(url, None) for url in pages]))
+
+    shard_count = get_max_article_id() // SITEMAP_SHARD_SIZE + 1
+    names = ["pages.xml"] + [f"articles-{n}.xml" for n in range(shard_count)]
+    body = "\n".join(f"  <sitemap><loc>{SITE_URL}/sitemaps/{name}</loc></sitemap>" for name in names)
+    write_atomic(os.path.join(OUTPUT_DIR, "sitemap.xml"), f"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{body}
+</sitemapindex>
+""")
+
+
+def regenerate(new_articles=None):
+    """
+    Rebuilds the outbound files.
+
+    Parameters:
+        new_articles (list): articles saved by the last ingest (each with an
+            "id" and "category"). Only their categories and sitemap shards
+            are rebuilt. Pass None to rebuild everything.
+    """
+    if new_articles is None:
+        categories = set(CATEGORIES)
+        shards = range(get_max_article_id() // SITEMAP_SHARD_SIZE + 1)
+    else:
+        if not new_articles:
+            return
+        categories = {a["category"] for a in new_articles if a.get("category")}
+        shards = sorted({a["id"] // SITEMAP_SHARD_SIZE for a in new_articles})
+
+    write_feeds()
+    for category in sorted(categories):
+        write_feeds(category)
+    for shard in shards:
+        write_sitemap_shard(shard)
+    write_sitemap_index()
+
+
+def generated_path(relative_path):
+    """Absolute path of a generated file, building everything once if it's missing."""
+    path = os.path.join(OUTPUT_DIR, relative_path)
+    if not os.path.exists(path):
+        regenerate()
+    return path
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    print("Rebuilding outbound feeds and sitemap...")
+    regenerate()
+    print(f"Done — files are in {OUTPUT_DIR}")
@@ -0,0 +1,87 @@
+# partitions.py — Old months in their own files
+# ================================================
+# Every article used to live in adtech_pulse.db forever, so this week's
+# stories shared their indexes, page cache and VACUUM time with years of
+# archive — and the only way to drop an old month was a huge DELETE.
+#
+# Now the live database holds the last ARCHIVE_AFTER_MONTHS months (plus
+# the current one). Older months are moved out, one file each:
+#
+#   partitions/2026-03.db      ← March's articles, search index, prospect tags
+#
+# A partition file is read-only from then on. database.py keeps a list of
+# them (the partitions table) and its read functions open a month's file
+# only when they need something in it — the homepage never does; an old
+# article page, a search that runs out of recent matches or the archive
+# pages do. Nothing that calls database.py needs to know.
+#
+# What used to be a mass DELETE is now a file operation:
+#   - retire   deletes a month's file (and its trend counts)
+#   - compress gzips it — kept, but not served until it's restored
+#
+# The background ingester archives old months by itself after each fetch.
+# By hand:
+#   python partitions.py list
+#   python partitions.py archive             # every month past ARCHIVE_AFTER_MONTHS
+#   python partitions.py archive 2026-03     # one month
+#   python partitions.py compress 2026-03
+#   python partitions.py restore 2026-03
+#   python partitions.py retire 2026-03      # deletes it for good
+#
+# Archived articles are read-only: recategorize.py, snapshots.py reparse and
+# prospects.py backfill only change articles still in the live file (each
+# says how many it left alone). "More on this topic" lists to and from an
+# archived article are kept.
+
+import re
+import sys
+
+from database import (init_db, archive_month, archive_old_months, list_partitions,
+                      compress_month, restore_month, retire_month)
+
+
+MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+
+def print_partitions():
+    partitions = list_partitions()
+    if not partitions:
+        print("No archived months — everything is in the live database.")
+        return
+    for p in partitions:
+        print(f"  {p['month']}  {p['articles']:>8} articles  ids {p['min_id']}–{p['max_id']}  "
+              f"{p['state']:<10}  {p['file']}")
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    month = sys.argv[2] if len(sys.argv) > 2 else None
+
+    if month is not None and not MONTH_RE.match(month):
+        print(f"Months look like 2026-03, not {month!r}")
+        sys.exit(1)
+
+    init_db()
+    if command == "list":
+        print_partitions()
+    elif command == "archive" and month:
+        print(f"Archived {archive_month(month)} articles from {month}")
+    elif command == "archive":
+        archived = archive_old_months()
+        for archived_month, count in archived.items():
+            print(f"Archived {count} articles from {archived_month}")
+        if not archived:
+            print("Nothing to archive.")
+    elif command == "compress" and month:
+        print(f"Compressed {month}: {compress_month(month) / 1e6:.1f} MB")
+    elif command == "restore" and month:
+        restore_month(month)
+        print(f"Restored {month}")
+    elif command == "retire" and month:
+        print(f"Retired {month}: {retire_month(month)} articles deleted")
+    else:
+        print("Usage:")
+        print("  python partitions.py list")
+        print("  python partitions.py archive [YYYY-MM]")
+        print("  python partitions.py compress|restore|retire YYYY-MM")
@@ -0,0 +1,314 @@
+# pipeline.py — Staged fetch → parse → save pipeline
+# ====================================================
+# Fetching a feed is really three different jobs:
+#
+#   1. DOWNLOAD — wait on the network for the XML bytes   (I/O-bound)
+#   2. PARSE    — feedparser, dates, clean_html, keywords (CPU-bound)
+#   3. SAVE     — write new articles to SQLite            (one writer only)
+#
+# Each job gets the kind of worker it's good at:
+#   - Downloads run in THREADS. Threads are cheap and spend their time waiting.
+#   - Parsing runs in a PROCESS POOL. Python threads can't run Python code on
+#     two cores at the same time (the "GIL"), but separate processes can.
+#   - Saving happens in ONE place (the main thread), in batches. SQLite only
+#     allows one writer at a time, and one commit per batch is much faster
+#     than one commit per article.
+#
+# The stages are connected by QUEUES with a maximum size. If parsing falls
+# behind, the download queue fills up and downloaders simply wait — so a slow
+# stage can never make the others pile up unlimited data in memory.
+# This is called "backpressure".
+#
+# ERROR POLICY:
+#   - A feed that fails to download or parse is counted as an error and
+#     skipped. One bad feed never stops the others.
+#   - A database error while saving stops the whole run (after telling the
+#     other stages to stop), because continuing would silently lose articles.
+#   - Ctrl+C stops handing out new feeds, cancels queued parse jobs and
+#     saves whatever was already parsed.
+#
+# The parser processes are started with "forkserver" (or "spawn"), never by
+# forking this process: it may be the web server, with the SQLite writer,
+# the scheduler and our own download threads running — a fork copies their
+# locks mid-use.
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+from urllib.parse import urlsplit
+from database import save_articles, get_latest_snapshot_hashes, record_snapshots
+from feed_parser import download_feed, parse_feed_body
+import live
+import snapshots
+import websub
+
+
+# --- PIPELINE SETTINGS ---
+DOWNLOAD_WORKERS = 8                  # Feeds downloading at the same time
+PARSE_WORKERS = os.cpu_count() or 1   # Parser processes (one per core)
+RAW_QUEUE_SIZE = 16                   # Downloaded feeds waiting to be parsed
+WRITE_BATCH_SIZE = 200                # Articles per database transaction
+WRITE_MAX_WAIT = 1.0                  # Seconds before a partial batch is saved anyway
+
+# Marks "this stage is finished" on a queue
+_DONE = object()
+
+
+def _download_worker(feed_queue, raw_queue, stop_event, latest_hashes):
+    """
+    Stage 1: pull feeds off feed_queue, put (feed_info, body, headers, error) on raw_queue.
+
+    Each body is stored in the snapshot store (snapshots.py). If it's exactly
+    the body we parsed last time, body is None: nothing to parse.
+    """
+    while not stop_event.is_set():
+        try:
+            feed_info = feed_queue.get_nowait()
+        except queue.Empty:
+            break
+
+        try:
+            body, headers = download_feed(feed_info)
+            if latest_hashes is not None:
+                sha256 = snapshots.store(body)
+                feed_info = dict(feed_info, snapshot=sha256, snapshot_size=len(body),
+                                 snapshot_content_type=(headers or {}).get("content-type"))
+                if latest_hashes.get(feed_info["url"]) == sha256:
+                    raw_queue.put((feed_info, None, None, None))
+                    continue
+            raw_queue.put((feed_info, body, headers, None))
+        except Exception as e:
+            raw_queue.put((feed_info, None, None, e))
+
+    raw_queue.put(_DONE)
+
+
+def pool_context():
+    """
+    How to start worker processes without fork: "forkserver", or "spawn"
+    where that's unavailable. Pass it as mp_context to every
+    ProcessPoolExecutor that can run inside the web process (here,
+    recategorize.py, snapshots.py).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _parse_pool(parse_workers):
+    """The parser process pool (None on a single core), started without fork."""
+    if parse_workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=parse_workers, mp_context=pool_context())
+
+
+def _parse_dispatcher(raw_queue, parsed_queue, in_flight, download_workers,
+                      executor, stop_event):
+    """
+    Stage 2: send downloaded feeds to the parser processes (executor, or
+    this thread when it's None).
+
+    in_flight is a semaphore that caps how many feeds can be parsed-but-not-yet-saved.
+    The writer releases it after saving, so parsed results can't pile up either.
+    """
+    finished_downloaders = 0
+
+    try:
+        while finished_downloaders < download_workers:
+            item = raw_queue.get()
+            if item is _DONE:
+                finished_downloaders += 1
+                continue
+
+            feed_info, body, headers, error = item
+            while not in_flight.acquire(timeout=0.5):
+                if stop_event.is_set():
+                    break
+            if error is not None or stop_event.is_set():
+                parsed_queue.put((feed_info, None, error or RuntimeError("pipeline stopped")))
+            elif body is None:
+                # Same bytes as the last snapshot we parsed: nothing new in it
+                parsed_queue.put((feed_info, ([], {"fetched": 0, "errors": 0, "unchanged": True}), None))
+            elif executor is None:
+                # Single core: parsing in this thread avoids process overhead
+                try:
+                    parsed_queue.put((feed_info, parse_feed_body(feed_info, body, headers), None))
+                except Exception as e:
+                    parsed_queue.put((feed_info, None, e))
+            else:
+                future = executor.submit(parse_feed_body, feed_info, body, headers)
+                future.add_done_callback(
+                    lambda f, fi=feed_info: parsed_queue.put(
+                        (fi, None, f.exception()) if f.exception() else (fi, f.result(), None)
+                    )
+                )
+    finally:
+        if executor is not None:
+            # On a clean finish this waits for the last parses; on stop it drops queued ones
+            executor.shutdown(wait=True, cancel_futures=stop_event.is_set())
+        parsed_queue.put(_DONE)
+
+
+def interleave_by_host(feeds):
+    """
+    Reorders feeds so ones on the same host are spread out:
+    reddit 1, openrss 1, adexchanger, reddit 2, openrss 2...
+
+    Feeds next to each other are downloaded at the same time. Spread out,
+    a host's next feed usually starts after its previous one finished, so it
+    re-uses that keep-alive connection (fetch_client.py) instead of opening
+    another — and no single site gets hit by every download thread at once.
+    """
+    by_host = {}
+    for feed_info in feeds:
+        by_host.setdefault(urlsplit(feed_info["url"]).hostname, []).append(feed_info)
+    groups = sorted(by_host.values(), key=len, reverse=True)
+    return [feed_info for row in zip_longest(*groups) for feed_info in row if feed_info]
+
+
+def run_pipeline(feeds, download_workers=DOWNLOAD_WORKERS, parse_workers=PARSE_WORKERS,
+                 batch_size=WRITE_BATCH_SIZE, on_saved=None, use_snapshots=True):
+    """
+    Downloads, parses and saves a list of feeds through the three stages.
+
+    Parameters:
+        feeds (list): feed_info dicts like config.ALL_FEEDS
+        download_workers (int): threads downloading at once
+        parse_workers (int): parser processes (1 = parse in a thread)
+        batch_size (int): articles per database transaction
+        on_saved (function): optional, called with each list of newly saved articles
+        use_snapshots (bool): keep each body in the snapshot store and skip
+            parsing feeds whose body hasn't changed since the last run
+
+    Returns:
+        dict: the same totals fetch_all_feeds() has always returned
+    """
+    download_workers = max(1, min(download_workers, len(feeds)))
+    parse_workers = max(1, parse_workers)
+
+    feed_queue = queue.Queue()
+    for feed_info in interleave_by_host(feeds):
+        feed_queue.put(feed_info)
+    raw_queue = queue.Queue(maxsize=RAW_QUEUE_SIZE)
+    parsed_queue = queue.Queue()
+    in_flight = threading.BoundedSemaphore(parse_workers * 2)
+    stop_event = threading.Event()
+    latest_hashes = get_latest_snapshot_hashes() if use_snapshots else None
+
+    threads = [
+        threading.Thread(target=_download_worker,
+                         args=(feed_queue, raw_queue, stop_event, latest_hashes), daemon=True)
+        for _ in range(download_workers)
+    ]
+    threads.append(threading.Thread(
+        target=_parse_dispatcher,
+        args=(raw_queue, parsed_queue, in_flight, download_workers,
+              _parse_pool(parse_workers), stop_event),
+        daemon=True,
+    ))
+    for thread in threads:
+        thread.start()
+
+    totals = {"total_fetched": 0, "new_saved": 0, "sources_checked": len(feeds),
+              "errors": 0, "unchanged": 0}
+
+    # --- STAGE 3: the single writer (this thread) ---
+    batch = []
+    new_snapshots = []
+    hubs = []
+    last_write = time.monotonic()
+
+    def flush():
+        nonlocal batch, new_snapshots, last_write
+        if batch:
+            saved = save_articles(batch)
+            totals["new_saved"] += len(saved)
+            if saved:
+                live.notify()  # open pages get them now (live.py)
+            if on_saved and saved:
+                on_saved(saved)
+        # Only once its articles are saved does a body count as "parsed" —
+        # if we crash before this, the next run parses it again
+        if new_snapshots:
+            record_snapshots(new_snapshots)
+        batch = []
+        new_snapshots = []
+        last_write = time.monotonic()
+
+    try:
+        while True:
+            try:
+                item = parsed_queue.get(timeout=WRITE_MAX_WAIT)
+            except queue.Empty:
+                flush()
+                continue
+            if item is _DONE:
+                break
+
+            feed_info, result, error = item
+            in_flight.release()
+            label = f"[{feed_info.get('content_type', 'news')}] {feed_info['name']}"
+
+            if error is not None:
+                totals["errors"] += 1
+                print(f"  ERROR {label}: {error}")
+                continue
+
+            articles, stats = result
+            if stats.get("unchanged"):
+                totals["unchanged"] += 1
+                print(f"  {label}: unchanged")
+                continue
+            totals["total_fetched"] += stats["fetched"]
+            totals["errors"] += stats["errors"]
+            batch.extend(articles)
+            if "websub" in stats:
+                hubs.append((feed_info["url"], *stats["websub"]))
+            if "snapshot" in feed_info and not stats["errors"]:
+                new_snapshots.append({
+                    "feed_url": feed_info["url"], "sha256": feed_info["snapshot"],
+                    "size": feed_info["snapshot_size"], "source_name": feed_info["name"],
+                    "category": feed_info.get("category"),
+                    "content_type": feed_info.get("content_type"),
+                    "http_content_type": feed_info.get("snapshot_content_type"),
+                })
+            print(f"  {label}: found {stats['fetched']}")
+
+            if len(batch) >= batch_size or time.monotonic() - last_write >= WRITE_MAX_WAIT:
+                flush()
+
+        flush()
+        # Feeds that can push to us instead (websub.py subscribes to them)
+        websub.record_discovered(hubs)
+
+    except BaseException as e:
+        # Database error or Ctrl+C: tell the other stages to wind down, keep what we can
+        stop_event.set()
+        _drain(raw_queue)
+        if isinstance(e, KeyboardInterrupt):
+            # Save what was already parsed. (After a database error, don't:
+            # the next write would most likely fail the same way.)
+            try:
+                flush()
+            except Exception as flush_error:
+                print(f"  Could not save the last batch: {flush_error}")
+        raise
+
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    return totals
+
+
+def _drain(q):
+    """Empties a queue so producers blocked on put() can finish."""
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
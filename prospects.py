@@ -0,0 +1,239 @@
+# prospects.py — Company tagging and trigger events (private layer)
+# ===================================================================
+# Blueprint Phase 5: tag every article with the prospect companies it
+# mentions, and flag trigger events (funding, hires, RFPs, launches).
+#
+# WHY NOT A LOOP OVER COMPANIES?
+# Checking "is company X in this text?" for every company is
+# companies × articles work — fine for 10 names, painful for 5,000.
+# Instead we split the article into words ONCE, and look up each
+# 1-word, 2-word, 3-word... phrase in a dictionary of known names.
+# A dictionary lookup costs the same whether it holds 10 names or 10,000,
+# so tagging an article only depends on how long the article is.
+#
+# Splitting on words also gives us word boundaries for free:
+# "IAS" matches "IAS launches..." but not "biased".
+#
+# TO USE:
+#   python prospects.py backfill                 # tag articles already in the DB
+#   python prospects.py mentions "Magnite" 2026-10-01
+#   python prospects.py export triggers.csv      # new trigger events since last export
+
+import csv
+import os
+import re
+import sys
+from config import PROSPECT_LIST_PATH, TRIGGER_KEYWORDS
+from database import (
+    get_articles_after_id, replace_article_entities, get_entity_mentions,
+    get_trigger_events_since, get_state, set_state, list_partitions,
+)
+
+
+# Lowercase letters and digits only — "AT&T", "Disney+" and "disney"
+# all become simple word lists that compare the same way.
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Splits text into lowercase words: 'The Trade Desk!' → ['the', 'trade', 'desk']"""
+    return WORD_PATTERN.findall((text or "").lower())
+
+
+class PhraseMatcher:
+    """
+    Finds known phrases inside a piece of text in a single pass.
+
+    Phrases are stored as tuples of words, e.g. ("trade", "desk"), mapped
+    to the label we want back ("The Trade Desk"). Matching slides over the
+    text's words and checks every phrase length we know about.
+    """
+
+    def __init__(self, phrases):
+        """
+        Parameters:
+            phrases (dict): {"phrase text": "label"}
+        """
+        self.lookup = {}
+        for phrase, label in phrases.items():
+            words = tuple(tokenize(phrase))
+            if words:
+                self.lookup[words] = label
+        # Only try the lengths that actually exist in the list
+        self.lengths = sorted({len(words) for words in self.lookup}, reverse=True)
+
+    def __len__(self):
+        return len(self.lookup)
+
+    def find(self, words):
+        """Returns the set of labels whose phrase appears in the word list."""
+        found = set()
+        for start in range(len(words)):
+            for length in self.lengths:
+                label = self.lookup.get(tuple(words[start:start + length]))
+                if label is not None:
+                    found.add(label)
+                    break  # longest match at this position wins
+        return found
+
+
+class ProspectMatcher:
+    """Tags text with prospect companies and trigger types."""
+
+    def __init__(self, companies, triggers):
+        """
+        Parameters:
+            companies (dict): {"alias": "Canonical Company Name"}
+            triggers (dict): {"trigger_type": ["keyword", ...]} like config.TRIGGER_KEYWORDS
+        """
+        self.companies = PhraseMatcher(companies)
+        self.triggers = PhraseMatcher({
+            keyword: trigger_type
+            for trigger_type, keywords in triggers.items()
+            for keyword in keywords
+        })
+
+    def match(self, title, description):
+        """
+        Returns a sorted list of (entity, trigger_type) pairs for one article.
+        trigger_type is "" when the company is mentioned without a trigger.
+        """
+        if not len(self.companies):
+            return []
+
+        words = tokenize(f"{title or ''} {description or ''}")
+        entities = self.companies.find(words)
+        if not entities:
+            return []
+
+        triggers = self.triggers.find(words) or {""}
+        return sorted((entity, trigger) for entity in entities for trigger in triggers)
+
+
+def load_prospect_list(path=PROSPECT_LIST_PATH):
+    """
+    Reads the prospect list file into {"alias": "Canonical Name"}.
+    Returns an empty dict if the file doesn't exist yet.
+    """
+    companies = {}
+    if not os.path.exists(path):
+        return companies
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names = [name.strip() for name in line.split("|") if name.strip()]
+            canonical = names[0]
+            for name in names:
+                companies[name] = canonical
+    return companies
+
+
+# --- CACHED MATCHER ---
+# Building the matcher reads the prospect file, so we keep one around and
+# only rebuild it when the file changes on disk.
+_matcher = None
+_matcher_mtime = None
+
+
+def get_matcher():
+    """Returns the ProspectMatcher for the current prospect list file."""
+    global _matcher, _matcher_mtime
+
+    try:
+        mtime = os.path.getmtime(PROSPECT_LIST_PATH)
+    except OSError:
+        mtime = None
+
+    if _matcher is None or mtime != _matcher_mtime:
+        _matcher = ProspectMatcher(load_prospect_list(), TRIGGER_KEYWORDS)
+        _matcher_mtime = mtime
+    return _matcher
+
+
+def match_article(title, description):
+    """Shortcut used by the feed parser: returns (entity, trigger_type) pairs."""
+    return get_matcher().match(title, description)
+
+
+def backfill_entities(batch_size=500):
+    """
+    Re-tags every article in the live database.
+    Run this after editing the prospect list — old matches are replaced.
+    Archived months (partitions.py) are read-only and keep the tags they had.
+
+    Returns:
+        int: how many articles mention at least one prospect
+    """
+    matcher = get_matcher()
+    print(f"Backfilling entities with {len(matcher.companies)} company names...")
+
+    last_id = 0
+    tagged = 0
+    while True:
+        articles = get_articles_after_id(last_id, limit=batch_size, archived=False)
+        if not articles:
+            break
+
+        batch = []
+        for article in articles:
+            entities = matcher.match(article["title"], article["description"])
+            if entities:
+                tagged += 1
+            batch.append((article["id"], article["published_date"], entities))
+
+        replace_article_entities(batch)
+        last_id = articles[-1]["id"]
+        print(f"  ...through article {last_id}")
+
+    print(f"Backfill complete: {tagged} articles mention a prospect")
+    archived = sum(p["articles"] for p in list_partitions())
+    if archived:
+        print(f"  ({archived} archived articles keep their old tags — partition files are read-only)")
+    return tagged
+
+
+def export_trigger_events(csv_path):
+    """
+    Writes trigger events found since the last export to a CSV file
+    (ready to paste into the outreach Google Sheet), then moves the bookmark.
+
+    Returns:
+        int: how many events were exported
+    """
+    last_id = int(get_state("trigger_export_last_id", 0))
+    events = get_trigger_events_since(last_id)
+
+    fields = ["published_date", "entity", "trigger_type", "title", "link",
+              "source_name", "article_id"]
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(events)
+
+    if events:
+        set_state("trigger_export_last_id", events[-1]["article_id"])
+    print(f"Exported {len(events)} trigger events to {csv_path}")
+    return len(events)
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command == "backfill":
+        backfill_entities()
+    elif command == "mentions" and len(sys.argv) > 2:
+        since = sys.argv[3] if len(sys.argv) > 3 else None
+        for article in get_entity_mentions(sys.argv[2], since_date=since):
+            triggers = f" [{article['triggers']}]" if article["triggers"] else ""
+            print(f"{article['published_date'][:10]}  {article['title']}{triggers}")
+    elif command == "export" and len(sys.argv) > 2:
+        export_trigger_events(sys.argv[2])
+    else:
+        print("Usage:")
+        print("  python prospects.py backfill")
+        print('  python prospects.py mentions "Company Name" [YYYY-MM-DD]')
+        print("  python prospects.py export triggers.csv")
@@ -0,0 +1,172 @@
+# recategorize.py — Re-tag the whole archive after CATEGORIES changes
+# =====================================================================
+# An article's category is worked out once, when it's saved, from the
+# keywords in config.CATEGORIES. Edit those keywords and every article
+# already saved keeps its old category — topic pages and counts drift.
+#
+# This job notices the change and fixes the archive:
+#
+# - DETECTS IT: a hash of the keyword lists (and each feed's default
+#   category) is saved in app_state once the archive matches them. A
+#   different hash means the archive is out of date.
+# - IN PARALLEL: the archive is split into chunks of article ids, and
+#   several processes re-run categorize_article() on them, one chunk each.
+# - SMALL TRANSACTIONS: each chunk's changes are written in one short
+#   transaction through the single writer, so the site keeps reading (and
+#   the ingester keeps writing) while this runs.
+# - RESUMABLE: each chunk's transaction also saves how far we got. If it
+#   crashes or is stopped, running it again carries on from there.
+# - REPORTS how many articles moved from which category to which.
+#
+# The background ingester (scheduler.py) runs it automatically when it
+# starts after the keywords changed. To run it by hand:
+#   python recategorize.py            # only if the keywords changed
+#   python recategorize.py --force    # re-check every article anyway
+#   python recategorize.py status
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from config import CATEGORIES
+from database import (get_state, set_state, get_max_article_id, iter_articles,
+                      list_partitions, recategorize_articles)
+
+
+RECATEGORIZE_WORKERS = os.cpu_count() or 1
+CHUNK_SIZE = 5000   # Article ids per chunk — and per write transaction
+
+HASH_KEY = "categories_hash"                 # keywords the archive was last tagged with
+CHECKPOINT_KEY = "recategorize_checkpoint"   # progress of an unfinished run
+
+
+def _default_categories():
+    """{source name: its feed's category} — used when no keyword matches."""
+    from sources import ALL_FEEDS
+    return {feed["name"]: feed["category"] for feed in ALL_FEEDS}
+
+
+def categories_hash():
+    """
+    A fingerprint of everything that decides an article's category: each
+    category's keywords (in order — ties go to the first category) and the
+    fallback category of each feed.
+    """
+    keywords = [[key, sorted(k.lower() for k in info["keywords"])]
+                for key, info in CATEGORIES.items()]
+    data = json.dumps([keywords, sorted(_default_categories().items())])
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def is_stale():
+    """True if the archive was tagged with other keywords than config.py has now."""
+    return get_state(HASH_KEY) != categories_hash()
+
+
+def _load_checkpoint(config_hash):
+    """The saved progress of an unfinished run with these keywords, or None."""
+    saved = get_state(CHECKPOINT_KEY)
+    if not saved:
+        return None
+    checkpoint = json.loads(saved)
+    # Keywords changed again mid-run: what was done so far no longer counts
+    return checkpoint if checkpoint.get("hash") == config_hash else None
+
+
+def _recategorize_chunk(id_range):
+    """Worker: returns (article_id, new_category) for articles in the range that should move."""
+    from feed_parser import categorize_article
+
+    start_id, end_id = id_range
+    defaults = _default_categories()
+    changes = []
+    # Archived months are read-only, so only the live file is walked
+    for article in iter_articles(start_id - 1, end_id, full=True, archived=False):
+        category = categorize_article(article.title, article.description)
+        if category == "general":
+            # Same fallback as when it was saved: the feed's category. A source
+            # that's no longer in sources.py keeps whatever it has.
+            category = defaults.get(article.source_name, article.category)
+        if category != article.category:
+            changes.append((article.id, category))
+    return changes
+
+
+def recategorize(force=False, workers=RECATEGORIZE_WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    Re-categorizes the archive if the keywords changed (or force=True),
+    carrying on from the last checkpoint if a previous run didn't finish.
+
+    Returns:
+        dict: {"old → new": n} moves over the whole run (None if nothing to do)
+    """
+    config_hash = categories_hash()
+    checkpoint = _load_checkpoint(config_hash)
+    if checkpoint is None:
+        if not force and not is_stale():
+            return None
+        checkpoint = {"hash": config_hash, "last_id": 0, "moved": {}}
+    else:
+        print(f"Resuming from article {checkpoint['last_id']}...")
+
+    # Articles saved after this point are tagged by the ingester as they arrive
+    end_id = get_max_article_id() + 1
+    chunks = [(start, min(start + chunk_size, end_id))
+              for start in range(checkpoint["last_id"] + 1, end_id, chunk_size)]
+    print(f"Recategorizing articles {checkpoint['last_id'] + 1}–{end_id - 1} "
+          f"in {len(chunks)} chunks with {workers} workers...")
+
+    executor = None
+    if workers > 1 and len(chunks) > 1:
+        # Not forked: this also runs on the web process's ingest thread
+        from pipeline import pool_context
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+    try:
+        results = (executor.map(_recategorize_chunk, chunks) if executor
+                   else map(_recategorize_chunk, chunks))
+        # map() hands results back in chunk order, so the checkpoint only ever
+        # moves forward past chunks that are completely written
+        for (_, chunk_end), changes in zip(chunks, results):
+            checkpoint["last_id"] = chunk_end - 1
+            recategorize_articles(changes, CHECKPOINT_KEY, checkpoint)
+            print(f"  ...through article {chunk_end - 1}: {len(changes)} moved")
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    set_state(HASH_KEY, config_hash)
+    set_state(CHECKPOINT_KEY, "")
+
+    moved = checkpoint["moved"]
+    print(f"Recategorize complete: {sum(moved.values())} articles moved")
+    archived = sum(p["articles"] for p in list_partitions())
+    if archived:
+        print(f"  ({archived} archived articles keep their categories — partition files are read-only)")
+    for move, count in sorted(moved.items(), key=lambda item: -item[1]):
+        print(f"  {count:>6}  {move}")
+    return moved
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command in ("", "--force"):
+        from database import init_db
+        init_db()
+        if recategorize(force=command == "--force") is None:
+            print("Categories are up to date — nothing to do (--force to run anyway).")
+    elif command == "status":
+        checkpoint = _load_checkpoint(categories_hash())
+        if checkpoint:
+            print(f"Unfinished run: through article {checkpoint['last_id']}, "
+                  f"{sum(checkpoint['moved'].values())} moved so far")
+        else:
+            print("Out of date — run: python recategorize.py" if is_stale()
+                  else "Categories are up to date.")
+    else:
+        print("Usage:")
+        print("  python recategorize.py [--force]")
+        print("  python recategorize.py status")
@@ -0,0 +1,122 @@
+# related.py — "More on this topic" links, worked out once at ingest
+# ===================================================================
+# Every article page lists a few other articles about the same thing, so
+# a reader has somewhere to go next besides the source.
+#
+# Comparing an article with the whole table on every page view would be far
+# too slow, so the work happens once, when articles are saved:
+#
+# 1. Each article's words (minus STOP_WORDS) are counted — the title counts
+#    double — and added to an INVERTED INDEX in the database: word → the
+#    articles that use it, and how often.
+# 2. Its closest matches are found by TF-IDF cosine similarity: words the
+#    two articles share count for more the rarer they are overall ("trade
+#    desk" says more than "advertising"). Only the articles sharing its
+#    most telling words are looked at — not the whole table.
+# 3. The best RELATED_COUNT are stored in related_articles (and the new
+#    article is offered to those matches' lists too). An article page is
+#    then one indexed lookup.
+#
+# Only articles from the last RELATED_DAYS stay in the index; older ones
+# are pruned after every update (their pages keep the links they have).
+#
+# Runs after every fetch (feed_parser.after_ingest). By hand:
+#   python related.py update        # index anything new
+#   python related.py rebuild       # start the index over
+#   python related.py show 1234     # what's related to article 1234
+
+import math
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+
+from config import RELATED_COUNT, RELATED_DAYS, STOP_WORDS
+from database import (get_articles_after_id, get_related_articles, get_state, set_state,
+                      index_related_articles, prune_related_index, clear_related_index,
+                      get_article)
+
+
+BATCH_SIZE = 200        # Articles indexed per database transaction
+MAX_DOC_TERMS = 40      # Words kept per article (its most frequent)
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def term_frequencies(title, description):
+    """
+    {word: term frequency} for an article, damped (1 + log count) so a word
+    repeated ten times doesn't drown out everything else.
+    """
+    counts = Counter()
+    for text, times in ((title, 2), (description, 1)):
+        for word in WORD_RE.findall((text or "").lower()):
+            if len(word) > 2 and not word.isdigit() and word not in STOP_WORDS:
+                counts[word] += times
+    return {word: round(1 + math.log(count), 4) for word, count in counts.most_common(MAX_DOC_TERMS)}
+
+
+def _cutoff():
+    return (datetime.now() - timedelta(days=RELATED_DAYS)).strftime("%Y-%m-%d")
+
+
+def update_related(new_articles=None):
+    """
+    Indexes every article saved since the last run and stores its related
+    articles, then prunes articles older than RELATED_DAYS from the index.
+    (new_articles is ignored — progress is tracked in app_state, so articles
+    from a run that failed are picked up next time.)
+
+    Returns:
+        int: how many articles were indexed
+    """
+    cutoff = _cutoff()
+    last_id = int(get_state("related_last_id", 0))
+    indexed = 0
+    while True:
+        articles = get_articles_after_id(last_id, limit=BATCH_SIZE)
+        if not articles:
+            break
+        docs = [{"id": a.id, "published_date": a.published_date,
+                 "terms": term_frequencies(a.title, a.description)}
+                for a in articles if (a.published_date or "") >= cutoff]
+        if docs:
+            indexed += index_related_articles(docs, top_k=RELATED_COUNT)
+        last_id = articles[-1].id
+        set_state("related_last_id", last_id)
+
+    while prune_related_index(cutoff):
+        pass
+    if indexed:
+        print(f"  Related articles: indexed {indexed} articles")
+    return indexed
+
+
+def rebuild_related():
+    """Empties the index and indexes the last RELATED_DAYS from scratch."""
+    clear_related_index()
+    set_state("related_last_id", 0)
+    return update_related()
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command == "update":
+        update_related()
+    elif command == "rebuild":
+        print(f"Rebuilt: {rebuild_related()} articles indexed")
+    elif command == "show" and len(sys.argv) > 2:
+        article = get_article(int(sys.argv[2]))
+        if article is None:
+            print("No such article")
+        else:
+            print(article["title"])
+            for related in get_related_articles(article["id"], limit=RELATED_COUNT):
+                print(f"  → [{related.id}] {related.title}")
+    else:
+        print("Usage:")
+        print("  python related.py update")
+        print("  python related.py rebuild")
+        print("  python related.py show ARTICLE_ID")
@@ -0,0 +1,122 @@
+# scheduler.py — Fetch feeds in the background while the site keeps serving
+# ===========================================================================
+# Fetching every feed takes a minute or more. If the web server had to wait
+# for that before answering, every restart would take the site down that long.
+# Instead, the site starts serving straight away from whatever is already in
+# the database, and this background thread fetches new content — once right
+# away if the data is stale, then every FETCH_INTERVAL minutes.
+#
+# MANY WORKERS, ONE FETCHER:
+# A production server like gunicorn runs several copies ("workers") of the
+# app. Each one calls start_background_ingest(), but only the first to grab
+# a lock file actually fetches. The others skip it, so feeds are never
+# fetched four times over.
+#
+# SEPARATE INGEST WORKER:
+# To keep fetching out of the web processes entirely, start the web server
+# with ADTECH_PULSE_INGEST=0 and run "python scheduler.py" on its own.
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from config import FETCH_INTERVAL
+from database import DB_PATH, get_state
+
+try:
+    import fcntl  # Linux/macOS only — on Windows every process fetches
+except ImportError:
+    fcntl = None
+
+
+LOCK_PATH = DB_PATH + ".ingest.lock"
+
+# Keeps the lock file open (and therefore locked) for the life of the process
+_lock_file = None
+
+
+def _acquire_ingest_lock():
+    """Returns True if this process gets to be the one that fetches feeds."""
+    global _lock_file
+    if fcntl is None:
+        return True
+    lock_file = open(LOCK_PATH, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    _lock_file = lock_file
+    return True
+
+
+def _is_stale(interval_minutes):
+    """True if feeds haven't been fetched within the last interval."""
+    last_fetch = get_state("last_fetch_at")
+    if not last_fetch:
+        return True
+    return datetime.now() - datetime.fromisoformat(last_fetch) >= timedelta(minutes=interval_minutes)
+
+
+def _ingest_loop(interval_minutes):
+    # Imported here so web workers that never fetch don't pay for it
+    from feed_parser import fetch_all_feeds
+    from recategorize import recategorize
+    from database import archive_old_months
+    from websub import maintain as maintain_websub
+
+    # CATEGORIES keywords changed since the archive was tagged (or a
+    # previous run was interrupted): bring old articles in line first
+    try:
+        recategorize()
+    except Exception as e:
+        print(f"Recategorize failed: {e}")
+
+    while True:
+        if _is_stale(interval_minutes):
+            try:
+                fetch_all_feeds()
+            except Exception as e:
+                print(f"Background fetch failed: {e}")
+            # Months past ARCHIVE_AFTER_MONTHS move out to partitions/
+            # (usually nothing to do — a check of the rollups)
+            try:
+                for month, count in archive_old_months().items():
+                    print(f"Archived {count} articles from {month}")
+            except Exception as e:
+                print(f"Archiving old months failed: {e}")
+        # Subscribe to newly found WebSub hubs, renew leases about to end
+        try:
+            maintain_websub()
+        except Exception as e:
+            print(f"WebSub maintenance failed: {e}")
+        time.sleep(60)
+
+
+def start_background_ingest(interval_minutes=FETCH_INTERVAL):
+    """
+    Starts the background fetch thread (in one process only).
+    Returns True if this process is the fetcher.
+    """
+    if os.environ.get("ADTECH_PULSE_INGEST") == "0":
+        return False
+    if not _acquire_ingest_lock():
+        return False
+    thread = threading.Thread(target=_ingest_loop, args=(interval_minutes,),
+                              name="feed-ingest", daemon=True)
+    thread.start()
+    return True
+
+
+# --- RUN DIRECTLY ---
+# A dedicated ingest worker: fetches on schedule, serves no pages
+if __name__ == "__main__":
+    from database import init_db
+    init_db()
+    if not _acquire_ingest_lock():
+        print("Another process is already fetching feeds — exiting.")
+    else:
+        print(f"Fetching feeds every {FETCH_INTERVAL} minutes (Ctrl+C to stop)...")
+        _ingest_loop(FETCH_INTERVAL)
@@ -0,0 +1,192 @@
+# snapshots.py — Keep every feed we download, so we can re-parse without re-fetching
+# ====================================================================================
+# Feeds only show their latest 10–50 entries. Once an entry scrolls off, the
+# only copy we have is what we parsed at the time — so a better clean_html(),
+# new category keywords or a date-parsing fix could only ever apply to new
+# articles. Now every downloaded feed body is kept:
+#
+#   snapshots/ab/cdef0123....xml.gz     ← the body, gzipped
+#
+# The file name is the SHA-256 hash of the body ("content-addressed"):
+# the same body is only ever stored once, and a name always means the same
+# bytes. The feed_snapshots table (database.py) records which body each feed
+# served and when.
+#
+# SKIPPING UNCHANGED FEEDS:
+# If a feed's body hashes the same as its latest snapshot, nothing in it is
+# new — the pipeline skips parsing it entirely.
+#
+# RE-PARSING:
+#   python snapshots.py reparse                       # every snapshot
+#   python snapshots.py reparse 2026-10-01 2026-10-15  # fetched in that window
+# parses the stored bodies again with the current code (using every core)
+# and updates the saved articles: description, category, dates, prospect
+# tags. Entries we never saved (e.g. missed during an outage) are added.
+#
+# The store is also a fixed corpus of real feeds for benchmarks:
+#   python benchmarks/bench_parse.py --snapshots
+
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+
+REPARSE_WORKERS = os.cpu_count() or 1
+REPARSE_BATCH = 500   # Articles per database transaction while re-parsing
+
+
+def body_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+def snapshot_path(sha256):
+    """ab12... → snapshots/ab/12....xml.gz (256 folders, so none gets huge)"""
+    return os.path.join(SNAPSHOT_DIR, sha256[:2], f"{sha256[2:]}.xml.gz")
+
+
+def store(body):
+    """
+    Saves a feed body (if this exact body isn't stored yet) and returns its hash.
+    Written to a temporary file and renamed, so a crash never leaves half a file.
+    """
+    sha256 = body_hash(body)
+    path = snapshot_path(sha256)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # mtime=0: the same body always compresses to the same bytes
+                f.write(gzip.compress(body, compresslevel=6, mtime=0))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return sha256
+
+
+def load(sha256):
+    """Returns the original bytes of a stored body."""
+    with open(snapshot_path(sha256), "rb") as f:
+        return gzip.decompress(f.read())
+
+
+def iter_bodies(since=None, until=None):
+    """Yields (snapshot_row, body) oldest first — e.g. as a benchmark corpus."""
+    from database import get_snapshots
+
+    for snapshot in get_snapshots(since, until):
+        try:
+            yield snapshot, load(snapshot["sha256"])
+        except FileNotFoundError:
+            continue
+
+
+# ============================================================
+# RE-PARSE
+# ============================================================
+
+def _parse_snapshot(snapshot):
+    """Worker: loads and parses one snapshot. Returns (snapshot, articles or None)."""
+    from feed_parser import parse_feed_body
+
+    try:
+        body = load(snapshot["sha256"])
+    except FileNotFoundError:
+        return snapshot, None
+    feed_info = {
+        "name": snapshot["source_name"],
+        "url": snapshot["feed_url"],
+        "category": snapshot["category"],
+        "content_type": snapshot["content_type"],
+    }
+    # The charset may be named only in the Content-Type header it came with
+    headers = ({"content-type": snapshot["http_content_type"]}
+               if snapshot.get("http_content_type") else None)
+    articles, _ = parse_feed_body(feed_info, body, headers,
+                                  fetched_at=datetime.fromisoformat(snapshot["fetched_at"]))
+    return snapshot, articles
+
+
+def reparse(since=None, until=None, workers=REPARSE_WORKERS):
+    """
+    Re-parses stored snapshots (fetched in [since, until)) with the current
+    code and updates the articles they contain.
+
+    Snapshots are handled oldest first, so where a story appears in several,
+    the newest version wins. A story that looks the same in a later snapshot
+    isn't sent to the database again.
+
+    Returns:
+        dict: totals — snapshots, missing, inserted, updated, unchanged,
+        archived (in a partition file, so left as it is), moved
+    """
+    from database import get_snapshots, reenrich_articles
+
+    snapshots = get_snapshots(since, until)
+    print(f"Re-parsing {len(snapshots)} snapshots with {workers} workers...")
+    totals = {"snapshots": len(snapshots), "missing": 0, "inserted": 0,
+              "updated": 0, "unchanged": 0, "archived": 0, "moved": {}}
+    seen = set()
+    batch = []
+
+    def flush():
+        if batch:
+            report = reenrich_articles(batch)
+            for key in ("inserted", "updated", "unchanged", "archived"):
+                totals[key] += report[key]
+            for move, count in report["moved"].items():
+                totals["moved"][move] = totals["moved"].get(move, 0) + count
+            batch.clear()
+
+    executor = None
+    if workers > 1:
+        from pipeline import pool_context  # worker processes started without fork
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+    try:
+        results = (executor.map(_parse_snapshot, snapshots, chunksize=8) if executor
+                   else map(_parse_snapshot, snapshots))
+        for done, (snapshot, articles) in enumerate(results, 1):
+            if articles is None:
+                totals["missing"] += 1
+                continue
+            for article in articles:
+                fingerprint = hashlib.sha1(repr(sorted(article.items())).encode("utf-8")).digest()
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+                batch.append(article)
+            if len(batch) >= REPARSE_BATCH:
+                flush()
+            if done % 100 == 0:
+                print(f"  ...{done}/{len(snapshots)} snapshots")
+        flush()
+    finally:
+        if executor:
+            executor.shutdown()
+
+    print(f"Re-parse complete: {totals['updated']} updated, {totals['inserted']} added, "
+          f"{totals['unchanged']} unchanged, {totals['missing']} snapshot files missing")
+    if totals["archived"]:
+        print(f"  ({totals['archived']} stories are in archived months, which are read-only: left as they are)")
+    for (old, new), count in sorted(totals["moved"].items(), key=lambda item: -item[1]):
+        print(f"  {count:>6}  {old} → {new}")
+    return totals
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command == "reparse":
+        reparse(since=sys.argv[2] if len(sys.argv) > 2 else None,
+                until=sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        print("Usage:")
+        print("  python snapshots.py reparse [since YYYY-MM-DD] [until YYYY-MM-DD]")
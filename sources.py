@@ -0,0 +1,361 @@
+# sources.py — Every feed AdTech Pulse pulls from
+# ================================================
+# Add, remove or re-tier sources here.
+#
+# This used to live in config.py. It has its own file so the web pages
+# (which never fetch feeds) don't have to load the whole list — only the
+# feed fetcher imports it. "from config import ALL_FEEDS" still works.
+#
+# FEED TIERS:
+#   Tier 1 = Core industry news (high volume, high signal)
+#   Tier 2 = Vendor/platform blogs (prospect research + product launches)
+#   Tier 3 = Niche verticals (retail media, measurement)
+#
+# SOCIAL/COMMUNITY FEEDS:
+#   Reddit = Unfiltered practitioner opinions, real questions
+#   Bluesky = Real-time industry reaction, hot takes from key voices
+#   Mastodon = Privacy/open-web crowd, technical ad tech discussion
+#   Hacker News = Tech-forward perspective on ad tech
+#   Substack = Deep-dive analysis from independent writers
+
+
+# =============================================================
+# NEWS RSS FEEDS (24 sources)
+# =============================================================
+NEWS_FEEDS = [
+    # =====================
+    # TIER 1 — Core Industry News (9 sources)
+    # =====================
+    {
+        "name": "AdExchanger",
+        "url": "https://www.adexchanger.com/feed/",
+        "category": "programmatic"
+    },
+    {
+        "name": "Digiday",
+        "url": "https://digiday.com/feed/",
+        "category": "media"
+    },
+    {
+        "name": "AdWeek",
+        "url": "https://www.adweek.com/feed/",
+        "category": "advertising"
+    },
+    {
+        "name": "AdWeek Ad Tech",
+        "url": "https://adweek.com/category/ad-tech/feed",
+        "category": "adtech"
+    },
+    {
+        "name": "AdTech Daily",
+        "url": "https://adtechdaily.com/feed",
+        "category": "adtech"
+    },
+    {
+        "name": "VideoWeek",
+        "url": "https://videoweek.com/feed",
+        "category": "ctv"
+    },
+    {
+        "name": "ExchangeWire",
+        "url": "https://feeds.feedburner.com/Exchangewirecom",
+        "category": "adtech"
+    },
+    {
+        "name": "Marketing Dive — MarTech",
+        "url": "https://marketingdive.com/topic/marketing-technology/feed",
+        "category": "adtech"
+    },
+    {
+        "name": "TechCrunch Ad Tech",
+        "url": "https://techcrunch.com/tag/advertising-tech/feed",
+        "category": "adtech"
+    },
+
+    # =====================
+    # TIER 2 — Vendor & Platform Blogs (10 sources)
+    # Great for understanding prospect companies
+    # =====================
+    {
+        "name": "Basis Technologies",
+        "url": "https://basis.com/blog/feed",
+        "category": "programmatic"
+    },
+    {
+        "name": "Clearcode",
+        "url": "https://clearcode.cc/feed",
+        "category": "adtech"
+    },
+    {
+        "name": "OpenX",
+        "url": "https://blog.openx.com/feed",
+        "category": "programmatic"
+    },
+    {
+        "name": "Magnite",
+        "url": "https://magnite.com/blog/feed",
+        "category": "ctv"
+    },
+    {
+        "name": "Index Exchange",
+        "url": "https://indexexchange.com/blog/feed",
+        "category": "programmatic"
+    },
+    {
+        "name": "Prebid",
+        "url": "https://prebid.org/feed",
+        "category": "programmatic"
+    },
+    {
+        "name": "Equativ",
+        "url": "https://equativ.com/feed",
+        "category": "programmatic"
+    },
+    {
+        "name": "MNTN",
+        "url": "https://mountain.com/blog/feed",
+        "category": "ctv"
+    },
+    {
+        "name": "MediaRadar",
+        "url": "https://mediaradar.com/blog/rss.xml",
+        "category": "measurement"
+    },
+    {
+        "name": "Verve Group",
+        "url": "https://verve.com/feed",
+        "category": "privacy"
+    },
+
+    # =====================
+    # TIER 3 — Retail Media & Niche (5 sources)
+    # =====================
+    {
+        "name": "Retail TouchPoints",
+        "url": "https://retailtouchpoints.com/feed",
+        "category": "retail_media"
+    },
+    {
+        "name": "Tinuiti",
+        "url": "https://tinuiti.com/feed",
+        "category": "retail_media"
+    },
+    {
+        "name": "More About Advertising",
+        "url": "https://moreaboutadvertising.com/feed",
+        "category": "advertising"
+    },
+    {
+        "name": "Adtech Today",
+        "url": "https://adtechtoday.com/feed",
+        "category": "adtech"
+    },
+]
+
+
+# =============================================================
+# PODCAST RSS FEEDS (8 sources)
+# =============================================================
+PODCAST_FEEDS = [
+    # =====================
+    # TIER 1 — Must-Listen for Ad Tech (5 sources)
+    # =====================
+    {
+        "name": "AdExchanger Talks",
+        "url": "https://feeds.megaphone.fm/adexchanger",
+        "category": "programmatic"
+    },
+    {
+        "name": "Marketecture",
+        "url": "https://feeds.megaphone.fm/EAATE3740759293",
+        "category": "adtech"
+    },
+    {
+        "name": "The MadTech Podcast",
+        "url": "https://audioboom.com/channels/4976875.rss",
+        "category": "adtech"
+    },
+    {
+        "name": "Paleo Ad Tech",
+        "url": "https://paleoadtech.com/category/podcast/feed/",
+        "category": "adtech"
+    },
+    {
+        "name": "AdTechGod Pod",
+        "url": "https://feeds.buzzsprout.com/2057436.rss",
+        "category": "adtech"
+    },
+
+    # =====================
+    # TIER 2 — Niche & Valuable (3 sources)
+    # =====================
+    {
+        "name": "The CTV Podcast",
+        "url": "https://feeds.acast.com/public/shows/the-ctv-podcast",
+        "category": "ctv"
+    },
+    {
+        "name": "Retail Media Breakfast Club",
+        "url": "https://feeds.transistor.fm/retail-media-breakfast-club",
+        "category": "retail_media"
+    },
+    {
+        "name": "The Garage (Albertsons)",
+        "url": "https://feeds.acast.com/public/shows/624489e813888000165b50f5",
+        "category": "retail_media"
+    },
+]
+
+
+# =============================================================
+# SOCIAL / COMMUNITY FEEDS
+# =============================================================
+# These pull from social platforms via RSS.
+# content_type field helps the UI distinguish social posts from articles.
+
+# --- REDDIT ---
+# Native RSS: add .rss to any subreddit URL
+# Using /top/?t=week to get highest-signal posts, not noise
+REDDIT_FEEDS = [
+    {
+        "name": "r/adops",
+        "url": "https://www.reddit.com/r/adops/top/.rss?t=week",
+        "category": "adtech",
+        "content_type": "reddit"
+    },
+    {
+        "name": "r/adtech",
+        "url": "https://www.reddit.com/r/adtech/top/.rss?t=week",
+        "category": "adtech",
+        "content_type": "reddit"
+    },
+    {
+        "name": "r/programmatic",
+        "url": "https://www.reddit.com/r/programmatic/top/.rss?t=week",
+        "category": "programmatic",
+        "content_type": "reddit"
+    },
+    {
+        "name": "r/digital_marketing",
+        "url": "https://www.reddit.com/r/digital_marketing/top/.rss?t=week",
+        "category": "advertising",
+        "content_type": "reddit"
+    },
+    {
+        "name": "r/PPC",
+        "url": "https://www.reddit.com/r/PPC/top/.rss?t=week",
+        "category": "programmatic",
+        "content_type": "reddit"
+    },
+]
+
+# --- BLUESKY ---
+# Method: prepend openrss.org/ to any bsky.app profile URL
+# These are verified Bluesky handles found via search
+BLUESKY_FEEDS = [
+    # --- Publications ---
+    {
+        "name": "AdExchanger (Bluesky)",
+        "url": "https://openrss.org/bsky.app/profile/adexchanger.com",
+        "category": "programmatic",
+        "content_type": "bluesky"
+    },
+    {
+        "name": "AdWeek (Bluesky)",
+        "url": "https://openrss.org/bsky.app/profile/adweek.bsky.social",
+        "category": "advertising",
+        "content_type": "bluesky"
+    },
+    {
+        "name": "PPC Land (Bluesky)",
+        "url": "https://openrss.org/bsky.app/profile/ppc.land",
+        "category": "programmatic",
+        "content_type": "bluesky"
+    },
+
+    # --- Key Voices ---
+    {
+        "name": "Ari Paparo (Bluesky)",
+        "url": "https://openrss.org/bsky.app/profile/aripaparo.com",
+        "category": "adtech",
+        "content_type": "bluesky"
+    },
+    {
+        "name": "AdTechGod (Bluesky)",
+        "url": "https://openrss.org/bsky.app/profile/adtechgod.com",
+        "category": "adtech",
+        "content_type": "bluesky"
+    },
+
+    # --- Digiday Reporters ---
+    {
+        "name": "Kimeko McCoy — Digiday (Bluesky)",
+        "url": "https://openrss.org/bsky.app/profile/kimekom.bsky.social",
+        "category": "media",
+        "content_type": "bluesky"
+    },
+    {
+        "name": "Krystal Scanlon — Digiday (Bluesky)",
+        "url": "https://openrss.org/bsky.app/profile/krystalscanlon.bsky.social",
+        "category": "media",
+        "content_type": "bluesky"
+    },
+]
+
+# --- MASTODON ---
+# Method: append .rss to any Mastodon profile URL
+# Ad tech / privacy / open-web crowd lives here
+MASTODON_FEEDS = [
+    # Add Mastodon profiles as you discover them:
+    # {
+    #     "name": "Person Name (Mastodon)",
+    #     "url": "https://mastodon.social/@username.rss",
+    #     "category": "privacy",
+    #     "content_type": "mastodon"
+    # },
+]
+
+# --- HACKER NEWS ---
+# Filtered by keyword — only ad tech relevant posts
+HACKERNEWS_FEEDS = [
+    {
+        "name": "Hacker News — Ad Tech",
+        "url": "https://hnrss.org/newest?q=adtech+OR+advertising+OR+programmatic",
+        "category": "adtech",
+        "content_type": "hackernews"
+    },
+]
+
+# --- SUBSTACK NEWSLETTERS ---
+# Format: substackname.substack.com/feed
+SUBSTACK_FEEDS = [
+    {
+        "name": "Marketecture Newsletter",
+        "url": "https://marketecture.substack.com/feed",
+        "category": "adtech",
+        "content_type": "substack"
+    },
+    # Add more Substacks as you find them:
+    # {
+    #     "name": "Newsletter Name",
+    #     "url": "https://name.substack.com/feed",
+    #     "category": "adtech",
+    #     "content_type": "substack"
+    # },
+]
+
+
+# =============================================================
+# MASTER FEED LIST — Combine all sources for the feed parser
+# =============================================================
+# The feed parser iterates over this single list.
+# content_type defaults to "news" or "podcast" for legacy feeds.
+ALL_FEEDS = (
+    [dict(f, content_type="news") for f in NEWS_FEEDS]
+    + [dict(f, content_type="podcast") for f in PODCAST_FEEDS]
+    + REDDIT_FEEDS
+    + BLUESKY_FEEDS
+    + MASTODON_FEEDS
+    + HACKERNEWS_FEEDS
+    + SUBSTACK_FEEDS
+)
@@ -0,0 +1,253 @@
+# sql_profiler.py — Find out which queries make pages slow
+# =========================================================
+# Turn it on with SQL_PROFILE = True in config.py (or ADTECH_PULSE_SQL_PROFILE=1).
+# Every connection database.py opens then times each statement it runs:
+#
+# - STATS are grouped by the statement's "shape" — numbers and strings are
+#   replaced by ?, so "WHERE id = 5" and "WHERE id = 6" count as one query
+# - SLOW statements (over SLOW_QUERY_MS) are logged with their
+#   EXPLAIN QUERY PLAN, which shows whether SQLite used an index or had to
+#   SCAN the whole table
+# - In DEBUG mode each response gets a summary: a Server-Timing header
+#   (visible in the browser's Network tab), one log line per request, and
+#   a /debug/sql page with the totals so far
+#
+# HOW THE TIMING WORKS:
+# SQLite runs a SELECT a few rows at a time, while we fetch. So a statement's
+# time is execute() plus every fetch, and it's recorded once the rows run out,
+# the cursor runs another statement, or the connection closes. SQLite's own
+# trace callback tells us the statement text with the real values filled in,
+# which is what goes in the slow log.
+#
+# Off by default: it costs a little time on every query.
+
+import logging
+import re
+from contextlib import contextmanager
+import sqlite3
+import threading
+import time
+import weakref
+from config import SLOW_QUERY_MS
+
+
+log = logging.getLogger("adtech_pulse.sql")
+
+_lock = threading.Lock()
+_stats = {}                      # normalized sql → [calls, total_seconds, max_seconds]
+_request = threading.local()     # per-request list of (sql, seconds) while a page renders
+
+
+def normalize(sql):
+    """SELECT * FROM articles WHERE id = 5  →  SELECT * FROM articles WHERE id = ?"""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def record(sql, seconds):
+    """Adds one finished statement to the totals (and to the current request's list)."""
+    shape = normalize(sql)
+    with _lock:
+        entry = _stats.setdefault(shape, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+    queries = getattr(_request, "queries", None)
+    if queries is not None:
+        queries.append((shape, seconds))
+
+
+def explain(conn, sql, params=()):
+    """Returns SQLite's query plan as a list of lines, e.g. ['SEARCH articles USING INDEX ...']."""
+    try:
+        cursor = sqlite3.Cursor(conn)  # a plain cursor, so this isn't profiled itself
+        return [row[3] for row in cursor.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    except sqlite3.Error as e:
+        return [f"(no plan: {e})"]
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """A cursor that times each statement from execute() until its rows run out."""
+
+    _sql = None
+
+    def _start(self, sql, params):
+        self._finish()
+        self._sql, self._params = sql, params
+        self._elapsed = 0.0
+        self._traced = None
+        self.connection._open_cursors.add(self)
+
+    def _finish(self):
+        if self._sql is None:
+            return
+        sql, params, seconds = self._sql, self._params, self._elapsed
+        self._sql = None
+        self.connection._open_cursors.discard(self)
+        record(sql, seconds)
+        captured = getattr(_request, "captured", None)
+        if captured is not None:
+            captured.append((sql, params, explain(self.connection, sql, params)))
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            plan = explain(self.connection, sql, params) if sql.lstrip().upper().startswith(
+                ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")) else []
+            log.warning("slow query (%.1f ms): %s\n  plan: %s", seconds * 1000,
+                        " ".join((self._traced or sql).split()), "; ".join(plan) or "-")
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            if self._sql is not None:
+                self._elapsed += time.perf_counter() - start
+
+    def execute(self, sql, params=()):
+        self._start(sql, params)
+        self.connection._last_traced = None
+        self._timed(super().execute, sql, params)
+        self._traced = self.connection._last_traced
+        if self.description is None:      # not a SELECT: it's finished already
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._start(sql, ())
+        self._timed(super().executemany, sql, seq_of_params)
+        self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute()) are ProfiledCursors."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._open_cursors = weakref.WeakSet()
+        self._last_traced = None
+        self.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        # Skip our own EXPLAINs, the implicit BEGINs, and "-- TRIGGER" notes
+        if not statement.startswith(("EXPLAIN QUERY PLAN", "BEGIN", "--")):
+            self._last_traced = statement
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def close(self):
+        for cursor in list(self._open_cursors):
+            cursor._finish()
+        super().close()
+
+
+# ============================================================
+# REPORTS
+# ============================================================
+
+def snapshot():
+    """Totals so far, slowest first: [(sql, calls, total_ms, avg_ms, max_ms)]"""
+    with _lock:
+        items = list(_stats.items())
+    rows = [(sql, calls, total * 1000, total * 1000 / calls, worst * 1000)
+            for sql, (calls, total, worst) in items]
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def report(top=25):
+    """The totals as a plain-text table."""
+    lines = [f"{'total ms':>10} {'calls':>7} {'avg ms':>8} {'max ms':>8}  query"]
+    for sql, calls, total, avg, worst in snapshot()[:top]:
+        lines.append(f"{total:>10.1f} {calls:>7} {avg:>8.2f} {worst:>8.2f}  {sql[:200]}")
+    return "\n".join(lines)
+
+
+def begin_request():
+    _request.queries = []
+
+
+def end_request():
+    """Stops collecting for this request and returns (query_count, total_ms, slowest (sql, ms) or None)."""
+    queries = getattr(_request, "queries", None) or []
+    _request.queries = None
+    if not queries:
+        return 0, 0.0, None
+    sql, seconds = max(queries, key=lambda q: q[1])
+    return len(queries), sum(s for _, s in queries) * 1000, (sql, seconds * 1000)
+
+
+@contextmanager
+def capture_plans():
+    """
+    Collects (sql, params, query plan lines) for every statement run in this
+    thread inside the with-block. Used by benchmarks/check_query_plans.py.
+    """
+    _request.captured = captured = []
+    try:
+        yield captured
+    finally:
+        _request.captured = None
+
+
+def init_app(app, debug=False):
+    """
+    Hooks the per-request summary into a Flask app (used by app.py when
+    SQL_PROFILE is on). The summary is only added in debug mode.
+    """
+    if not debug:
+        return
+
+    from flask import request
+
+    @app.before_request
+    def _begin_sql_summary():
+        begin_request()
+
+    @app.after_request
+    def _sql_summary(response):
+        count, total_ms, slowest = end_request()
+        response.headers["Server-Timing"] = f'sql;dur={total_ms:.1f};desc="{count} queries"'
+        if slowest:
+            app.logger.info("%s %s — %d queries, %.1f ms SQL (slowest %.1f ms: %s)",
+                            request.method, request.path, count, total_ms,
+                            slowest[1], slowest[0][:120])
+        return response
+
+    @app.route("/debug/sql")
+    def debug_sql():
+        return report(), 200, {"Content-Type": "text/plain; charset=utf-8"}
@@ -23,4 +23,230 @@ document.querySelectorAll('.nav-dropdown').forEach(function(dropdown) {
     });
 });
 
+// Static-site search (only on exported sites — see export_site.py)
+// There's no server to run the search, so we download the small index
+// files for each word typed, keep the articles that contain ALL the words,
+// and build the result cards here.
+(function() {
+    const results = document.getElementById('static-search-results');
+    if (!results) return;
+
+    const query = new URLSearchParams(window.location.search).get('q') || '';
+    const words = (query.toLowerCase().match(/[a-z0-9]+/g) || []).filter(function(w) {
+        return w.length > 1;
+    });
+    const count = document.getElementById('static-search-count');
+    document.querySelector('.search-input-large').value = query;
+    if (!words.length) return;
+
+    const base = results.dataset.indexUrl;
+    function getJSON(url) {
+        return fetch(url).then(function(r) { return r.ok ? r.json() : {}; });
+    }
+
+    Promise.all(words.map(function(w) {
+        return getJSON(base + 'terms/' + w.slice(0, 2) + '.json').then(function(shard) {
+            return shard[w] || [];
+        });
+    })).then(function(lists) {
+        // Article ids that appear in every word's list, newest first
+        const ids = lists.reduce(function(a, b) {
+            const keep = new Set(b);
+            return a.filter(function(id) { return keep.has(id); });
+        }).slice(0, 30);
+
+        const blocks = Array.from(new Set(ids.map(function(id) { return Math.floor(id / 1000); })));
+        return Promise.all(blocks.map(function(b) {
+            return getJSON(base + 'docs/' + b + '.json');
+        })).then(function(docBlocks) {
+            const docs = Object.assign.apply(null, [{}].concat(docBlocks));
+            count.textContent = ids.length + ' results for "' + query + '"';
+            ids.forEach(function(id) {
+                const d = docs[id];
+                if (d) results.appendChild(buildCard(id, d));
+            });
+        });
+    });
+
+    function el(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text) node.textContent = text;
+        return node;
+    }
+
+    // d = [title, link, source, type, date, category]
+    function buildCard(id, d) {
+        const card = el('article', 'article-card');
+        const meta = el('div', 'article-meta');
+        meta.appendChild(el('span', 'article-source', d[2]));
+        meta.appendChild(el('span', 'article-type', d[3]));
+        meta.appendChild(el('span', 'article-date', d[4] || 'Recent'));
+        card.appendChild(meta);
+
+        const title = el('h3', 'article-title');
+        const link = el('a', '', d[0]);
+        link.href = '/article/' + id + '/';
+        title.appendChild(link);
+        card.appendChild(title);
+
+        const footer = el('div', 'article-footer');
+        const category = el('a', 'article-category', d[5]);
+        category.href = '/category/' + d[5] + '/';
+        footer.appendChild(category);
+        const out = el('a', 'read-more', 'Read →');
+        out.href = d[1];
+        out.target = '_blank';
+        out.rel = 'noopener';
+        footer.appendChild(out);
+        card.appendChild(footer);
+        return card;
+    }
+})();
+
+// Search-as-you-type suggestions for every search box with data-suggest-url.
+// Waits until typing pauses (debounce) before asking the server, and drops
+// answers to anything but the latest request.
+document.querySelectorAll('input[data-suggest-url]').forEach(function(input) {
+    const DEBOUNCE_MS = 150;
+    const KIND_LABELS = {category: 'topic', topic: 'topic', source: 'source', term: ''};
+    const list = document.createElement('ul');
+    list.className = 'suggest-list';
+    list.hidden = true;
+    input.parentElement.appendChild(list);
+
+    let timer = null;
+    let latest = 0;
+    let active = -1;
+    let items = [];
+
+    function close() {
+        list.hidden = true;
+        active = -1;
+    }
+
+    function show(suggestions) {
+        items = suggestions;
+        active = -1;
+        list.textContent = '';
+        suggestions.forEach(function(s, i) {
+            const li = document.createElement('li');
+            li.className = 'suggest-item';
+            li.textContent = s.text;
+            if (KIND_LABELS[s.kind]) {
+                const kind = document.createElement('span');
+                kind.className = 'suggest-kind';
+                kind.textContent = KIND_LABELS[s.kind];
+                li.appendChild(kind);
+            }
+            // mousedown, not click: it fires before the input loses focus
+            li.addEventListener('mousedown', function(event) {
+                event.preventDefault();
+                window.location.href = s.url;
+            });
+            list.appendChild(li);
+        });
+        list.hidden = !suggestions.length;
+    }
+
+    function highlight(index) {
+        const nodes = list.children;
+        if (!nodes.length) return;
+        active = (index + nodes.length) % nodes.length;
+        Array.prototype.forEach.call(nodes, function(node, i) {
+            node.classList.toggle('active', i === active);
+        });
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (query.length < 2 || !input.dataset.suggestUrl) { close(); return; }
+        timer = setTimeout(function() {
+            const request = ++latest;
+            fetch(input.dataset.suggestUrl + '?q=' + encodeURIComponent(query))
+                .then(function(r) {
+                    // No suggestion API here (e.g. the static export): stop asking
+                    if (!r.ok) { delete input.dataset.suggestUrl; throw new Error(r.status); }
+                    return r.json();
+                })
+                .then(function(data) {
+                    if (request === latest) show(data.suggestions);
+                })
+                .catch(close);
+        }, DEBOUNCE_MS);
+    });
+
+    input.addEventListener('keydown', function(event) {
+        if (list.hidden) return;
+        if (event.key === 'ArrowDown') { event.preventDefault(); highlight(active + 1); }
+        else if (event.key === 'ArrowUp') { event.preventDefault(); highlight(active - 1); }
+        else if (event.key === 'Escape') { close(); }
+        else if (event.key === 'Enter' && active >= 0) {
+            event.preventDefault();
+            window.location.href = items[active].url;
+        }
+    });
+
+    input.addEventListener('blur', close);
+});
+
+// Live updates: new articles appear at the top of the grid without a reload.
+// The page says where to connect in data-live-url (see live.py); the
+// browser reconnects by itself and resends the last id it got.
+(function() {
+    const grid = document.querySelector('.article-grid[data-live-url]');
+    if (!grid || !window.EventSource) return;
+    const MAX_CARDS = 60;
+    const seen = new Set();
+
+    function el(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text) node.textContent = text;
+        return node;
+    }
+
+    function readLink(href, className, text) {
+        const link = el('a', className, text);
+        link.href = href;
+        link.target = '_blank';
+        link.rel = 'noopener';
+        return link;
+    }
+
+    // Same markup as the cards index.html renders
+    function buildCard(a) {
+        const card = el('article', 'article-card live-new');
+        const meta = el('div', 'article-meta');
+        meta.appendChild(el('span', 'article-source', a.source_name));
+        meta.appendChild(el('span', 'article-date', a.published_date || 'Recent'));
+        card.appendChild(meta);
+
+        const title = el('h3', 'article-title');
+        title.appendChild(readLink(a.link, '', a.title));
+        card.appendChild(title);
+        card.appendChild(el('p', 'article-description',
+                            a.description + (a.description.length >= 200 ? '...' : '')));
+
+        const footer = el('div', 'article-footer');
+        const category = el('a', 'article-category', a.category_name);
+        category.href = '/category/' + encodeURIComponent(a.category);
+        footer.appendChild(category);
+        footer.appendChild(readLink(a.link, 'read-more', 'Read →'));
+        card.appendChild(footer);
+        return card;
+    }
+
+    const source = new EventSource(grid.dataset.liveUrl);
+    source.addEventListener('article', function(event) {
+        const article = JSON.parse(event.data);
+        if (seen.has(article.id)) return;
+        seen.add(article.id);
+        grid.insertBefore(buildCard(article), grid.firstChild);
+        const cards = grid.querySelectorAll('.article-card');
+        for (let i = MAX_CARDS; i < cards.length; i++) cards[i].remove();
+    });
+})();
+
 console.log('AdTech Pulse loaded.');
@@ -0,0 +1,243 @@
+# suggest.py — Search-as-you-type suggestions
+# =============================================
+# As a reader types in a search box, main.js asks /api/suggest for things
+# worth searching for: words and two-word phrases from recent headlines
+# ("Trade Desk", "DoubleVerify"), our source names and the topic keywords
+# from config.CATEGORIES.
+#
+# It all lives in memory in each web process — no database query per
+# keystroke — in two indexes:
+#
+# - A SORTED LIST of terms, for prefix matches: "doublev" → "doubleverify"
+# - A TRIGRAM INDEX (every 3-letter piece of each term → the terms that
+#   contain it), for typos: "dubleverify" still shares most of its pieces
+#   with "doubleverify", so it's found and ranked by how many it shares.
+#
+# Terms are compared without spaces or punctuation, so "Tradedesk" finds
+# "Trade Desk".
+#
+# STAYS SMALL: only the latest SUGGEST_ARTICLES headlines seed it, and once
+# it holds MAX_TERMS headline terms the rarest (oldest first) are dropped.
+# STAYS CURRENT: every REFRESH_SECONDS a request adds the headlines of
+# articles saved since (by whichever process fetched them).
+
+import bisect
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+from config import CATEGORIES, STOP_WORDS
+from database import get_max_article_id, get_source_counts, get_titles_after_id
+
+
+SUGGEST_ARTICLES = 20000   # Recent headlines the index starts from
+MAX_TERMS = 30000          # Headline terms kept (source names and topics don't count)
+REFRESH_SECONDS = 30       # How often to look for newly saved articles
+MAX_POSTINGS = 3000        # Trigrams in more terms than this are too common to help
+MIN_SIMILARITY = 0.45      # Share of trigrams a typo must have in common with a term
+PREFIX_SCAN = 300          # Prefix matches looked at per query (most popular win)
+
+WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+# Source names and topics outrank headline words that match as well
+KIND_BONUS = {"category": 4.0, "source": 3.0, "topic": 2.0, "term": 0.0}
+
+
+def compact(text):
+    """'The Trade-Desk' → 'thetradedesk' — the form terms are matched in."""
+    return "".join(WORD_RE.findall(text.lower()))
+
+
+def trigrams(key):
+    """'ctv' → {'$ct', 'ctv', 'tv$'} — the $ marks let short terms match too."""
+    padded = f"${key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SuggestIndex:
+    """
+    Prefix + trigram index over short search terms.
+
+        index = SuggestIndex()
+        index.add("The Trade Desk", kind="source")
+        index.add_title("DoubleVerify buys Scibids")
+        index.suggest("dubleverify")   # → [{"text": "DoubleVerify", "kind": "term"}]
+    """
+
+    def __init__(self, max_terms=MAX_TERMS):
+        self.max_terms = max_terms
+        self._terms = {}        # key → [display text, count, kind, last seen, extra]
+        self._keys = []         # every key, sorted (for prefix lookups)
+        self._trigrams = {}     # trigram → set of keys
+        self._seen = 0
+        self._title_terms = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._terms)
+
+    # --- ADDING ---
+
+    def add(self, text, kind="term", extra=None):
+        """Adds one term (or counts it again). extra is returned with its suggestions."""
+        key = compact(text)
+        if len(key) < 2:
+            return
+        with self._lock:
+            self._add(key, text, kind, extra)
+            if self._title_terms > self.max_terms:
+                self._prune()
+
+    def add_title(self, title):
+        """Adds the words and two-word phrases of a headline."""
+        words = WORD_RE.findall(title or "")
+        lowered = [word.lower() for word in words]
+        useful = [len(word) > 2 and not word.isdigit() and word not in STOP_WORDS
+                  for word in lowered]
+        terms = []  # (key, display text)
+        for i, word in enumerate(words):
+            if useful[i]:
+                terms.append((lowered[i], word))
+                if i + 1 < len(words) and useful[i + 1]:
+                    terms.append((lowered[i] + lowered[i + 1], f"{word} {words[i + 1]}"))
+        with self._lock:
+            for key, text in terms:
+                self._add(key, text, "term", None)
+            if self._title_terms > self.max_terms:
+                self._prune()
+
+    def _add(self, key, text, kind, extra):
+        self._seen += 1
+        entry = self._terms.get(key)
+        if entry is not None:
+            entry[1] += 1
+            entry[3] = self._seen
+            # A source name or topic beats the same words seen in a headline
+            if KIND_BONUS[kind] > KIND_BONUS[entry[2]]:
+                entry[0], entry[2], entry[4] = text, kind, extra
+            return
+        self._terms[key] = [text, 1, kind, self._seen, extra]
+        bisect.insort(self._keys, key)
+        for gram in trigrams(key):
+            self._trigrams.setdefault(gram, set()).add(key)
+        if kind == "term":
+            self._title_terms += 1
+
+    def _prune(self):
+        """Drops the rarest headline terms (oldest first) down to 75% of max_terms."""
+        title_keys = [key for key, entry in self._terms.items() if entry[2] == "term"]
+        title_keys.sort(key=lambda key: (self._terms[key][1], self._terms[key][3]))
+        drop = set(title_keys[:len(title_keys) - int(self.max_terms * 0.75)])
+        for key in drop:
+            del self._terms[key]
+            for gram in trigrams(key):
+                keys = self._trigrams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._trigrams[gram]
+        self._keys = [key for key in self._keys if key not in drop]
+        self._title_terms -= len(drop)
+
+    # --- LOOKING UP ---
+
+    def suggest(self, query, limit=8):
+        """
+        Best terms for what's been typed so far: prefix matches first, then
+        near-misses (typos), each ordered by how common the term is.
+
+        Returns:
+            list: dicts with "text", "kind" (term, topic, source, category)
+                  and "extra" (e.g. the category key)
+        """
+        q = compact(query)
+        if len(q) < 2:
+            return []
+        with self._lock:
+            scored = {}
+            # Prefix matches: a slice of the sorted keys
+            start = bisect.bisect_left(self._keys, q)
+            for key in self._keys[start:start + PREFIX_SCAN]:
+                if not key.startswith(q):
+                    break
+                scored[key] = 2.0 if key == q else 1.0
+
+            # Typos: terms sharing enough trigrams with the query
+            if len(scored) < limit and len(q) > 3:
+                grams = trigrams(q)
+                shared = Counter()
+                for gram in grams:
+                    keys = self._trigrams.get(gram)
+                    if keys and len(keys) <= MAX_POSTINGS:
+                        shared.update(keys)
+                for key, count in shared.items():
+                    # Dice coefficient: a term of n letters has about n trigrams
+                    similarity = 2 * count / (len(grams) + len(key))
+                    if similarity >= MIN_SIMILARITY and key not in scored:
+                        scored[key] = similarity
+
+            def rank(key):
+                text, count, kind, _, _ = self._terms[key]
+                return scored[key] * 10 + KIND_BONUS[kind] + math.log1p(count)
+
+            best = sorted(scored, key=rank, reverse=True)[:limit]
+            return [{"text": self._terms[key][0], "kind": self._terms[key][2],
+                     "extra": self._terms[key][4]} for key in best]
+
+
+# ============================================================
+# THE SHARED INDEX — one per web process, filled from the database
+# ============================================================
+
+_index = None
+_last_id = 0
+_last_refresh = 0.0
+_build_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def _add_new_titles(index):
+    """Adds headlines of articles saved since the last call."""
+    global _last_id
+    while True:
+        rows = get_titles_after_id(_last_id, limit=5000)
+        if not rows:
+            return
+        for _, title in rows:
+            index.add_title(title)
+        _last_id = rows[-1][0]
+
+
+def get_index():
+    """The process-wide SuggestIndex: built on first use, then topped up every REFRESH_SECONDS."""
+    global _index, _last_id, _last_refresh
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                index = SuggestIndex()
+                for key, info in CATEGORIES.items():
+                    index.add(info["display_name"], kind="category", extra=key)
+                    for keyword in info["keywords"]:
+                        index.add(keyword, kind="topic")
+                for source_name in get_source_counts():
+                    index.add(source_name, kind="source")
+                _last_id = max(0, get_max_article_id() - SUGGEST_ARTICLES)
+                _add_new_titles(index)
+                _last_refresh = time.monotonic()
+                _index = index
+
+    # One request at a time tops it up; the others don't wait for it
+    if time.monotonic() - _last_refresh > REFRESH_SECONDS and _refresh_lock.acquire(blocking=False):
+        try:
+            _add_new_titles(_index)
+            _last_refresh = time.monotonic()
+        finally:
+            _refresh_lock.release()
+    return _index
+
+
+def get_suggestions(query, limit=8):
+    """Suggestions for a search box — see SuggestIndex.suggest()."""
+    return get_index().suggest(query, limit=limit)
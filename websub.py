@@ -0,0 +1,340 @@
+# websub.py — Let feeds push new entries to us (WebSub)
+# =======================================================
+# Polling asks every feed "anything new?" every FETCH_INTERVAL minutes —
+# almost always for nothing, and a story can still wait most of an interval
+# before we see it. Many feeds (WordPress trade press, Substack, Medium,
+# Blogger...) name a WebSub "hub" that will call US the moment they publish.
+#
+# HOW IT WORKS:
+# 1. DISCOVERY — while a feed is parsed as usual, discover_hub() looks for
+#    <link rel="hub"> (or a Link: header). The pipeline records each hub in
+#    the websub_subscriptions table.
+# 2. SUBSCRIBING — maintain() asks each hub to send that feed to our
+#    callback URL, /websub/<random id>, with a secret of our own.
+# 3. VERIFYING — the hub checks we really asked: it GETs the callback with a
+#    challenge, verify_intent() answers it, and the lease starts.
+# 4. PUSHES — the hub POSTs the new entries to the callback. receive_push()
+#    checks the signature (an HMAC made with our secret) and hands the body
+#    to a worker thread, which parses and saves it exactly like a polled
+#    feed: parse_feed_body() → save_articles() → after_ingest().
+# 5. RENEWING — leases run out (usually after days), so maintain() renews
+#    each one a day before it ends.
+#
+# Feeds with a live lease are left out of polling (fetch_all_feeds asks
+# polled_feeds()). If the lease lapses, the hub stops confirming us, or a
+# feed has gone quiet for longer than SILENCE_LIMIT, it's polled again.
+#
+# The hub has to reach this site, so subscribing is off until
+# WEBSUB_ENABLED (ADTECH_PULSE_WEBSUB=1) — discovery always runs.
+# benchmarks/websub_hub.py is a stand-in hub to try it all locally.
+#
+#   python websub.py status        # every feed with a hub, and its lease
+#   python websub.py maintain      # subscribe / renew now
+
+import hashlib
+import hmac
+import queue
+import re
+import secrets
+import sys
+import threading
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+from config import WEBSUB_ENABLED, WEBSUB_CALLBACK_BASE, WEBSUB_LEASE_SECONDS
+from database import (get_websub_subscriptions, get_websub_subscription, record_websub_hubs,
+                      update_websub_subscription, delete_websub_subscription)
+
+
+RENEW_BEFORE = timedelta(hours=24)    # Renew a lease this long before it ends
+RETRY_AFTER = timedelta(hours=1)      # Ask again if a hub hasn't confirmed by then
+SILENCE_LIMIT = timedelta(hours=24)   # Poll a pushed feed anyway after this long without a push
+HUB_TIMEOUT = 15                      # Seconds to wait for a hub to answer
+PUSH_QUEUE_SIZE = 100                 # Pushes waiting to be parsed before we say "busy"
+
+LINK_HEADER_RE = re.compile(r'<([^>]+)>\s*;\s*rel="?([^";,]+)"?')
+
+# Signature algorithms hubs use (X-Hub-Signature: sha256=...)
+SIGNATURE_ALGORITHMS = {"sha1": hashlib.sha1, "sha256": hashlib.sha256,
+                        "sha384": hashlib.sha384, "sha512": hashlib.sha512}
+
+
+# ============================================================
+# DISCOVERY — runs inside parse_feed_body()
+# ============================================================
+
+def discover_hub(feed, headers, feed_url):
+    """
+    The (hub, topic) a parsed feed advertises, or None.
+    The topic is the feed's rel="self" address — what the hub knows it by.
+    """
+    links = {}
+    for rel, href in ((link.get("rel"), link.get("href"))
+                      for link in feed.feed.get("links", [])):
+        if rel and href:
+            links.setdefault(rel, href)
+    for href, rel in LINK_HEADER_RE.findall((headers or {}).get("link", "")):
+        for name in rel.split():
+            links.setdefault(name, href)
+    if "hub" not in links:
+        return None
+    return links["hub"], links.get("self", feed_url)
+
+
+def record_discovered(found):
+    """Saves (feed_url, hub, topic) triples found by the pipeline."""
+    record_websub_hubs([
+        {"feed_url": feed_url, "hub": hub, "topic": topic,
+         "callback_id": secrets.token_urlsafe(16), "secret": secrets.token_urlsafe(24)}
+        for feed_url, hub, topic in found
+    ])
+
+
+# ============================================================
+# SUBSCRIBING — run by the background ingester
+# ============================================================
+
+def callback_url(subscription):
+    return f"{WEBSUB_CALLBACK_BASE.rstrip('/')}/websub/{subscription['callback_id']}"
+
+
+def _ask_hub(subscription, mode):
+    """POSTs a subscribe/unsubscribe request. The hub answers 202 and verifies later."""
+    form = {"hub.mode": mode, "hub.topic": subscription["topic"],
+            "hub.callback": callback_url(subscription)}
+    if mode == "subscribe":
+        form["hub.secret"] = subscription["secret"]
+        form["hub.lease_seconds"] = str(WEBSUB_LEASE_SECONDS)
+    request = urllib.request.Request(
+        subscription["hub"], data=urllib.parse.urlencode(form).encode("ascii"),
+        headers={"Content-Type": "application/x-www-form-urlencoded",
+                 "User-Agent": "AdTechPulse/1.0 (WebSub subscriber)"},
+    )
+    with urllib.request.urlopen(request, timeout=HUB_TIMEOUT) as response:
+        return response.status
+
+
+def _when(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _is_due(subscription, now):
+    """True if this subscription needs asking (again) now."""
+    requested = _when(subscription["requested_at"])
+    if requested is not None and now - requested < RETRY_AFTER:
+        return False  # asked recently: give the hub time to confirm
+    if subscription["state"] == "active":
+        expires = _when(subscription["expires_at"])
+        return expires is None or expires - now < RENEW_BEFORE
+    return subscription["state"] in ("new", "pending", "denied", "unsubscribing")
+
+
+def maintain(now=None):
+    """
+    Subscribes to newly found hubs, renews leases about to end and
+    unsubscribes from feeds no longer in sources.py.
+
+    Returns:
+        dict: how many subscribe / unsubscribe requests were sent, and failed
+    """
+    from sources import ALL_FEEDS
+
+    report = {"subscribe": 0, "unsubscribe": 0, "failed": 0}
+    if not WEBSUB_ENABLED:
+        return report
+    now = now or datetime.now()
+    feed_urls = {feed["url"] for feed in ALL_FEEDS}
+    for subscription in get_websub_subscriptions():
+        if not _is_due(subscription, now):
+            continue
+        mode = "subscribe" if subscription["feed_url"] in feed_urls else "unsubscribe"
+        # Saved BEFORE asking: the hub may check with us (verify_intent)
+        # before its answer to this request even reaches us.
+        # An active lease stays active while the renewal is confirmed.
+        state = {"subscribe": subscription["state"] if subscription["state"] == "active"
+                 else "pending", "unsubscribe": "unsubscribing"}[mode]
+        update_websub_subscription(subscription["feed_url"], state=state,
+                                   requested_at=now.isoformat())
+        try:
+            _ask_hub(subscription, mode)
+        except Exception as e:
+            report["failed"] += 1
+            print(f"  WebSub {mode} failed for {subscription['feed_url']}: {e}")
+            # We never asked after all; requested_at stays, so it's retried later
+            update_websub_subscription(subscription["feed_url"], state=subscription["state"])
+            continue
+        report[mode] += 1
+    return report
+
+
+def polled_feeds(feeds, now=None):
+    """
+    The feeds that still need polling: those without a live lease, and
+    pushed ones that have been quiet for longer than SILENCE_LIMIT (a hub
+    can drop us without saying so).
+    """
+    now = now or datetime.now()
+    pushed = set()
+    for subscription in get_websub_subscriptions():
+        expires = _when(subscription["expires_at"])
+        heard = _when(subscription["last_push_at"]) or _when(subscription["verified_at"])
+        if (subscription["state"] == "active" and expires and expires > now
+                and heard and now - heard < SILENCE_LIMIT):
+            pushed.add(subscription["feed_url"])
+    return [feed for feed in feeds if feed["url"] not in pushed]
+
+
+# ============================================================
+# THE CALLBACK — called by app.py's /websub/<callback_id> route
+# ============================================================
+
+def verify_intent(callback_id, args):
+    """
+    Answers a hub's GET: "did you really ask for this?"
+
+    Returns:
+        tuple: (status, body) — 200 and the challenge if we asked, else 404
+    """
+    subscription = get_websub_subscription(callback_id)
+    mode = args.get("hub.mode")
+    if subscription is None or args.get("hub.topic") != subscription["topic"]:
+        return 404, ""
+
+    now = datetime.now()
+    if mode == "denied":
+        # The hub refused (or withdrew) the subscription: back to polling
+        update_websub_subscription(subscription["feed_url"], state="denied",
+                                   expires_at=None, requested_at=now.isoformat())
+        return 200, ""
+    if mode == "subscribe" and subscription["state"] in ("pending", "active"):
+        try:
+            lease = int(args.get("hub.lease_seconds") or WEBSUB_LEASE_SECONDS)
+        except ValueError:
+            lease = WEBSUB_LEASE_SECONDS
+        update_websub_subscription(subscription["feed_url"], state="active",
+                                   lease_seconds=lease, verified_at=now.isoformat(),
+                                   expires_at=(now + timedelta(seconds=lease)).isoformat())
+        return 200, args.get("hub.challenge", "")
+    if mode == "unsubscribe" and subscription["state"] == "unsubscribing":
+        delete_websub_subscription(subscription["feed_url"])
+        return 200, args.get("hub.challenge", "")
+    return 404, ""
+
+
+def signature_ok(secret, body, header):
+    """Checks X-Hub-Signature ("sha256=<hex HMAC of the body>")."""
+    algorithm, _, digest = (header or "").partition("=")
+    hash_fn = SIGNATURE_ALGORITHMS.get(algorithm.lower())
+    if hash_fn is None or not digest:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hash_fn).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())
+
+
+def receive_push(callback_id, body, headers):
+    """
+    Accepts a hub's POST of new entries and queues it for parsing.
+    headers: lowercase names.
+
+    Returns:
+        int: HTTP status — 202 (accepted, or ignored because the signature
+             is wrong, as WebSub asks), 404 for an unknown callback, or 503
+             when the queue is full so the hub tries again later
+    """
+    from sources import ALL_FEEDS
+
+    subscription = get_websub_subscription(callback_id)
+    if subscription is None or subscription["state"] not in ("active", "pending"):
+        return 404
+    if not signature_ok(subscription["secret"], body, headers.get("x-hub-signature")):
+        print(f"  WebSub: ignored a push for {subscription['feed_url']} with a bad signature")
+        return 202
+    feed_info = next((feed for feed in ALL_FEEDS if feed["url"] == subscription["feed_url"]), None)
+    if feed_info is None:
+        return 202
+    try:
+        _push_worker().put_nowait((subscription, feed_info, body, headers))
+    except queue.Full:
+        return 503
+    return 202
+
+
+# ============================================================
+# THE PUSH WORKER — pushes are parsed and saved like polled feeds
+# ============================================================
+
+_push_queue = None
+_push_lock = threading.Lock()
+
+
+def _push_worker():
+    """The queue of the push worker thread, started on the first push."""
+    global _push_queue
+    with _push_lock:
+        if _push_queue is None:
+            _push_queue = queue.Queue(maxsize=PUSH_QUEUE_SIZE)
+            threading.Thread(target=_process_pushes, args=(_push_queue,),
+                             name="websub-push", daemon=True).start()
+    return _push_queue
+
+
+def _process_pushes(pushes):
+    while True:
+        subscription, feed_info, body, headers = pushes.get()
+        try:
+            ingest_push(subscription, feed_info, body, headers)
+        except Exception as e:
+            print(f"  ERROR processing push for {feed_info['name']}: {e}")
+
+
+def ingest_push(subscription, feed_info, body, headers):
+    """
+    Parses and saves one pushed body the way the pipeline saves a polled
+    one: snapshot stored, articles saved, then after_ingest().
+    Returns the newly saved articles.
+    """
+    from database import save_articles, record_snapshots
+    from feed_parser import parse_feed_body, after_ingest
+    import live
+    import snapshots
+
+    sha256 = snapshots.store(body)
+    articles, stats = parse_feed_body(feed_info, body, headers)
+    saved = save_articles(articles) if articles else []
+    if not stats["errors"]:
+        record_snapshots([{
+            "feed_url": feed_info["url"], "sha256": sha256, "size": len(body),
+            "source_name": feed_info["name"], "category": feed_info.get("category"),
+            "content_type": feed_info.get("content_type"),
+            "http_content_type": headers.get("content-type"),
+        }])
+    if saved:
+        live.notify()
+    update_websub_subscription(subscription["feed_url"], last_push_at=datetime.now().isoformat())
+    print(f"  [push] {feed_info['name']}: found {stats['fetched']}, {len(saved)} new")
+    if saved:
+        after_ingest(saved)
+    return saved
+
+
+# --- RUN DIRECTLY ---
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command == "status":
+        subscriptions = get_websub_subscriptions()
+        if not subscriptions:
+            print("No feeds with a WebSub hub found yet (they're found while fetching).")
+        for s in sorted(subscriptions, key=lambda s: s["feed_url"]):
+            print(f"  {s['state']:<13} {s['expires_at'] or '':<26} {s['feed_url']}  (hub: {s['hub']})")
+        if not WEBSUB_ENABLED:
+            print("Subscribing is off — set ADTECH_PULSE_WEBSUB=1 once the site is public.")
+    elif command == "maintain":
+        from database import init_db
+        init_db()
+        print(maintain())
+    else:
+        print("Usage:")
+        print("  python websub.py status")
+        print("  python websub.py maintain")
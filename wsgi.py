@@ -0,0 +1,33 @@
+# wsgi.py — Production entry point
+# =================================
+# "python app.py" is for development: debug mode, one process, no auto-reload.
+# In production, point a real WSGI server at this file instead:
+#
+#   gunicorn -w 4 -b 0.0.0.0:8000 wsgi:app        (Linux/macOS)
+#   waitress-serve --port=8000 wsgi:app           (Windows)
+#   python wsgi.py                                (no extra install needed)
+#
+# Startup is fast on purpose:
+# 1. init_db() only checks the schema version (a few milliseconds)
+# 2. The site serves right away from the existing database
+# 3. Feeds are fetched in a background thread — in one worker only
+#    (or set ADTECH_PULSE_INGEST=0 and run "python scheduler.py" separately)
+#
+# Don't use gunicorn's --preload: the background thread has to start inside
+# each worker process, not in the parent that forks them.
+
+from app import app
+from database import init_db
+from scheduler import start_background_ingest
+
+init_db()
+start_background_ingest()
+
+
+if __name__ == "__main__":
+    # Fallback server for when gunicorn/waitress isn't installed:
+    # multi-threaded, no debugger, no reloader.
+    import os
+    port = int(os.environ.get("PORT", 8000))
+    print(f"Serving on http://0.0.0.0:{port}")
+    app.run(host="0.0.0.0", port=port, debug=False, use_reloader=False, threaded=True)